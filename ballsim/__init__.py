@@ -0,0 +1,9 @@
+"""Headless tooling around the one-shot python-ball submissions.
+
+The physics core is the ``gpt-5.py`` submission, loaded as a module and
+driven without a window. Run the tools from the repository root, e.g.
+``python -m ballsim.stress``.
+"""
+import os
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
@@ -0,0 +1,364 @@
+"""A common headless scenario API over every python-ball submission.
+
+Each adapter drives one submission's own classes and collision functions
+without a window: ``spawn()`` releases a ball at the centre the way that
+submission's mouse click does, ``step()`` advances one 1/60 s frame the way
+its main loop would (gpt-5 and horizon-alpha run two 1/120 s steps, the
+per-frame integrators one step), and ``positions()`` reads the balls back.
+Scenes are rebuilt exactly as each ``main()`` builds them, and the
+submissions' global ``random`` is seeded so spawns are reproducible.
+
+Where a submission crashes as written, its adapter patches the least that
+lets it run and its ``notes`` record the crash and the patch.
+Submissions without an adapter are the ones that cannot run as Python;
+:func:`unsupported` says why. ``deepseek`` runs its whole loop at module
+level, so its source is executed only up to the loop and the loop body is
+replayed here.
+
+    python -m ballsim.bench
+"""
+import math
+import os
+import random
+from abc import ABC, abstractmethod
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from .submission import SUBMISSION_DIR, load_submission, submission_path  # noqa: E402
+
+# Simulated time covered by one ``step()``
+FRAME_DT = 1.0 / 60.0
+
+
+def _exec_until(name, marker):
+    """Run a submission's source up to the line starting with ``marker``; return its globals."""
+    path = submission_path(name)
+    source = path.read_text(encoding="utf-8")
+    head = source[:source.index("\n" + marker) + 1]
+    namespace = {"__name__": "python_ball_" + name.replace("-", "_"), "__file__": str(path)}
+    exec(compile(head, str(path), "exec"), namespace)
+    return namespace
+
+
+class Adapter(ABC):
+    """One submission behind the shared scenario API.
+
+    Subclasses implement :meth:`spawn`, :meth:`step` and :meth:`positions`
+    and set ``size``; a missing method fails when the adapter is built.
+    """
+
+    name = None
+    engine = ""
+    # Correctness problems found by reading the submission
+    notes = ""
+
+    def __init__(self, seed=0):
+        random.seed(seed)
+
+    @abstractmethod
+    def spawn(self):
+        """Release one ball the way the submission's click does."""
+
+    @abstractmethod
+    def step(self):
+        """Advance one ``FRAME_DT`` frame the way the submission's main loop does."""
+
+    @abstractmethod
+    def positions(self):
+        """Ball centres as ``(x, y)`` tuples."""
+
+    @property
+    def ball_count(self):
+        return len(self.positions())
+
+    def lost(self):
+        """Balls that left the screen or whose position is no longer finite."""
+        w, h = self.size
+        return sum(1 for x, y in self.positions()
+                   if not (math.isfinite(x) and math.isfinite(y) and 0 <= x <= w and 0 <= y <= h))
+
+
+class Gpt5(Adapter):
+    name = "gpt-5"
+    engine = "pygame Vector2, 3 substeps"
+    notes = "ball-ball impulse applied to separating pairs (energy grows, stacks cannot rest)"
+
+    def __init__(self, seed=0):
+        from .world import STEP_DT, World
+
+        super().__init__(seed)
+        self.world = World(seed=seed, backend="python")
+        self.size = (self.world.width, self.world.height)
+        self.step_dt = STEP_DT
+        self.per_frame = round(FRAME_DT / STEP_DT)
+
+    def spawn(self):
+        self.world.spawn()
+
+    def step(self):
+        for _ in range(self.per_frame):
+            self.world.step(self.step_dt)
+
+    def positions(self):
+        return [(b.pos.x, b.pos.y) for b in self.world.balls]
+
+
+class Anthropic(Adapter):
+    name = "anthropic-claude-sonnet-4"
+    engine = "floats + NumPy per edge, dt = 1 frame"
+    notes = "five vertices, so four sides plus a closing chord instead of a hexagon minus one side"
+
+    def __init__(self, seed=0):
+        super().__init__(seed)
+        m = self.m = load_submission(self.name)
+        self.size = (m.WIDTH, m.HEIGHT)
+        self.pentagons = [
+            m.Pentagon(80, 0.02, 0),
+            m.Pentagon(140, -0.015, 0),
+            m.Pentagon(200, 0.01, 0),
+            m.Pentagon(260, -0.008, 0),
+        ]
+        self.balls = []
+
+    def spawn(self):
+        m = self.m
+        self.balls.append(m.Ball(m.CENTER_X, m.CENTER_Y, m.random_color()))
+
+    def step(self):
+        m = self.m
+        balls = self.balls
+        for pentagon in self.pentagons:
+            pentagon.update(1.0)
+        for ball in balls:
+            ball.update()
+        for i in range(len(balls)):
+            for j in range(i + 1, len(balls)):
+                m.handle_ball_collision(balls[i], balls[j])
+        for ball in balls:
+            for pentagon in self.pentagons:
+                m.handle_wall_collision(ball, pentagon)
+
+    def positions(self):
+        return [(b.x, b.y) for b in self.balls]
+
+
+class DeepSeek(Adapter):
+    name = "deepseek-deepseek-chat-v3.1"
+    engine = "floats, dt = 1 frame"
+    notes = "zero division on coincident balls; walls push but ignore their own motion"
+
+    def __init__(self, seed=0):
+        super().__init__(seed)
+        # A fresh namespace per adapter: the scene lives in module globals
+        m = self.m = _exec_until(self.name, "# 主循环")
+        self.size = (m["WIDTH"], m["HEIGHT"])
+        self.balls = m["balls"]
+        self.hexagons = m["hexagons"]
+        self.speeds = m["rotation_speeds"]
+
+    def spawn(self):
+        m = self.m
+        self.balls.append(m["Ball"](m["CENTER_X"], m["CENTER_Y"]))
+
+    def step(self):
+        m = self.m
+        check_collision, check_ball_collision = m["check_collision"], m["check_ball_collision"]
+        balls, hexagons = self.balls, self.hexagons
+        for hexagon, speed in zip(hexagons, self.speeds):
+            hexagon.rotation += speed
+            hexagon.angles = [math.pi / 2 + 2 * math.pi * i / hexagon.sides + hexagon.rotation
+                              for i in range(hexagon.sides)]
+        for ball in balls:
+            ball.update()
+            check_collision(ball, hexagons)
+        for i in range(len(balls)):
+            for j in range(i + 1, len(balls)):
+                check_ball_collision(balls[i], balls[j])
+
+    def positions(self):
+        return [(b.x, b.y) for b in self.balls]
+
+
+def _body_first_space():
+    import pymunk
+
+    class BodyFirstSpace(pymunk.Space):
+        """A space that adds a shape's body along with it, and ignores re-adding that body."""
+
+        def add(self, *objs):
+            for o in objs:
+                if isinstance(o, pymunk.Shape) and o.body.space is None:
+                    super().add(o.body)
+                if not (isinstance(o, pymunk.Body) and o.space is self):
+                    super().add(o)
+
+    return BodyFirstSpace()
+
+
+class GptOss(Adapter):
+    name = "openai-gpt-oss-120b"
+    engine = "pymunk, kinematic body per hexagon"
+    notes = ("crashes as written under pymunk 7: Vec2d() on tuples (TypeError) and each segment added "
+             "before its body (AssertionError), plus pympm.Space in main() (NameError); "
+             "runs patched by ballsim, which hands the module a tuple-accepting Vec2d and a space that "
+             "adds each shape's body with it; four same-size hexagons; angle advanced twice per step")
+
+    def __init__(self, seed=0):
+        import pymunk
+
+        super().__init__(seed)
+        m = self.m = load_submission(self.name)
+        self.size = (m.WIDTH, m.HEIGHT)
+        # pymunk 7's Vec2d takes x and y only; the submission passes tuples
+        vec2d = pymunk.Vec2d
+        m.Vec2d = lambda x, y=None: vec2d(*x) if y is None else vec2d(x, y)
+        # main() with its pympm typo fixed; everything else as written
+        # Hexagon adds its segments before their body, which pymunk 7 rejects
+        self.space = _body_first_space()
+        self.space.gravity = m.Vec2d(m.GRAVITY)
+        self.space.damping = 1.0
+        centre = (m.WIDTH // 2, m.HEIGHT // 2)
+        self.hexagons = [
+            m.Hexagon(self.space, centre, i * math.pi / 2, m.HEXAGON_ANG_VEL, clockwise=(i % 2 == 0))
+            for i in range(4)
+        ]
+        self.shapes = []
+
+    def spawn(self):
+        m = self.m
+        self.shapes.append(m.create_ball(self.space, (m.WIDTH // 2, m.HEIGHT // 2)))
+
+    def step(self):
+        for h in self.hexagons:
+            h.update(FRAME_DT)
+        self.space.step(FRAME_DT)
+
+    def positions(self):
+        return [tuple(s.body.position) for s in self.shapes]
+
+
+class HorizonAlpha(Adapter):
+    name = "openrouter-horizon-alpha"
+    engine = "pymunk, persistent kinematic hexagons"
+    notes = ("as submitted, rebuilds its segments every step and adds the same body once per segment, "
+             "which pymunk rejects at startup; patched by ballsim to one persistent kinematic body per hexagon, "
+             "built once and rotated by pymunk")
+
+    def __init__(self, seed=0):
+        import pymunk
+
+        super().__init__(seed)
+        self.pymunk = pymunk
+        m = self.m = load_submission(self.name)
+        self.size = (m.W, m.H)
+        self.space = pymunk.Space()
+        self.space.gravity = m.GRAVITY
+        self.walls = m.RotatingHexWalls(self.space, m.CENTER, m.HEX_RADII, m.OMEGAS, m.MISSING_EDGE_INDEX)
+        self.step_dt = 1.0 / m.FPS
+        self.per_frame = round(FRAME_DT / self.step_dt)
+        self.bodies = []
+
+    def spawn(self):
+        m, pymunk = self.m, self.pymunk
+        body = pymunk.Body()
+        body.position = m.CENTER
+        shape = pymunk.Circle(body, m.BALL_RADIUS)
+        shape.mass = m.BALL_MASS
+        shape.elasticity = m.BALL_ELASTICITY
+        shape.friction = m.BALL_FRICTION
+        body.moment = pymunk.moment_for_circle(m.BALL_MASS, 0, m.BALL_RADIUS)
+        self.space.add(body, shape)
+        self.bodies.append(body)
+
+    def step(self):
+        for _ in range(self.per_frame):
+            self.space.step(self.step_dt)
+
+    def positions(self):
+        return [tuple(b.position) for b in self.bodies]
+
+
+class ZAi(Adapter):
+    name = "z-ai-glm-4.5-air-free"
+    engine = "floats, dt in seconds"
+    notes = "balls released at rest on the same point stay coincident; walls ignore their own motion"
+
+    def __init__(self, seed=0):
+        super().__init__(seed)
+        m = self.m = load_submission(self.name)
+        self.size = (m.WIDTH, m.HEIGHT)
+        cx, cy = m.WIDTH // 2, m.HEIGHT // 2
+        self.hexagons = [
+            m.Hexagon(cx, cy, 150, 0.5, 0),
+            m.Hexagon(cx, cy, 200, -0.3, 3),
+            m.Hexagon(cx, cy, 250, 0.2, 1),
+            m.Hexagon(cx, cy, 300, -0.4, 4),
+        ]
+        self.balls = []
+
+    def spawn(self):
+        m = self.m
+        self.balls.append(m.Ball(m.WIDTH // 2, m.HEIGHT // 2))
+
+    def step(self):
+        m = self.m
+        balls, dt = self.balls, FRAME_DT
+        for hexagon in self.hexagons:
+            hexagon.update(dt)
+        for ball in balls:
+            ball.update(dt)
+        for ball in balls:
+            for hexagon in self.hexagons:
+                m.check_ball_hexagon_collision(ball, hexagon)
+        for i in range(len(balls)):
+            for j in range(i + 1, len(balls)):
+                m.check_ball_ball_collision(balls[i], balls[j])
+        # Screen-edge bounce, inline in main()
+        e = m.RESTITUTION
+        for ball in balls:
+            if ball.x - ball.radius < 0:
+                ball.x = ball.radius
+                ball.vx = abs(ball.vx) * e
+            elif ball.x + ball.radius > m.WIDTH:
+                ball.x = m.WIDTH - ball.radius
+                ball.vx = -abs(ball.vx) * e
+            if ball.y - ball.radius < 0:
+                ball.y = ball.radius
+                ball.vy = abs(ball.vy) * e
+            elif ball.y + ball.radius > m.HEIGHT:
+                ball.y = m.HEIGHT - ball.radius
+                ball.vy = -abs(ball.vy) * e
+
+    def positions(self):
+        return [(b.x, b.y) for b in self.balls]
+
+
+ADAPTERS = {cls.name: cls for cls in (Gpt5, Anthropic, DeepSeek, GptOss, HorizonAlpha, ZAi)}
+
+
+def make_adapter(name, seed=0):
+    """Scenario adapter for a submission file stem."""
+    try:
+        cls = ADAPTERS[name]
+    except KeyError:
+        raise ValueError(f"No adapter for '{name}', expected one of {sorted(ADAPTERS)}") from None
+    return cls(seed)
+
+
+def unsupported():
+    """Submissions without an adapter, mapped to the reason they cannot run."""
+    out = {}
+    for path in sorted(SUBMISSION_DIR.glob("*.py")):
+        if path.stem in ADAPTERS:
+            continue
+        source = path.read_text(encoding="utf-8")
+        if source.lstrip().startswith("<"):
+            out[path.stem] = "an HTML page, not a Python program"
+            continue
+        try:
+            compile(source, str(path), "exec")
+        except SyntaxError as e:
+            out[path.stem] = f"{type(e).__name__} at line {e.lineno}: {e.msg}"
+        else:
+            out[path.stem] = "no adapter"
+    return out
@@ -0,0 +1,151 @@
+"""Adaptive substepping: the substep count of each frame from a CFL bound.
+
+gpt-5 splits every frame into ``SUBSTEPS = 3``. When everything rests that
+is three passes where one would do; right after a wall flings a ball it can
+be too few, since a rim moves at up to ``|OMEGAS[3]| * HEX_RADII[3]`` =
+132 px/s and a flung ball at several times that. A ball tunnels through a
+side (or another ball) once it moves about its radius relative to it in one
+substep, so :class:`AdaptiveSubsteps` picks, before each frame,
+
+    n = ceil((v_max + v_wall + g * dt) * dt / (cfl * (r_min + thickness / 2)))
+
+clamped to ``[min_substeps, max_substeps]``, where ``v_max`` is the fastest
+ball, ``v_wall`` the fastest wall point (``|omega| * R`` of the shell) and
+``g * dt`` what gravity adds during the frame. ``thickness`` defaults to
+gpt-5's drawn ``LINE_WIDTH``. A ball is left out of ``v_max`` only when
+it cannot reach the outer hexagon's circumcircle within the frame even
+heading straight for it (distance from the centre minus ``|v| * dt`` beyond
+``R + r``). gpt-5's escaped balls, pinned to the screen clamp at 1e5 px/s,
+are therefore counted and hold their frames at ``max_substeps``, as do fast
+balls still inside when clicks come quicker than balls leave (the pair
+response pumps energy into overlapping spawns); that is what the bound
+says those frames need.
+
+On the kernel path the scan runs compiled over the arrays the kernel kept
+from the last step (:meth:`ballsim.kernels.KernelStepper.fastest`); only
+balls spawned since are read from their objects.
+
+The stepper counts the substeps it ran per frame (``histogram``) and the
+fraction saved against running ``max_substeps`` every frame (``saved``).
+
+    python -m ballsim.adaptive --balls 20 --spawn-every 120 --steps 2400
+"""
+import argparse
+import math
+import time
+from collections import Counter
+
+from .headless import run_schedule, spawn_schedule
+from .world import World, sim
+
+CFL = 0.5
+
+
+class AdaptiveSubsteps:
+    """Chooses ``World.step``'s substep count from the fastest ball each frame."""
+
+    def __init__(self, world, cfl=CFL, min_substeps=1, max_substeps=12, thickness=sim.LINE_WIDTH):
+        if not 0.0 < cfl <= 1.0:
+            raise ValueError(f"cfl must be in (0, 1], got {cfl}")
+        if not 1 <= min_substeps <= max_substeps:
+            raise ValueError(f"Need 1 <= min_substeps <= max_substeps, got {min_substeps} and {max_substeps}")
+        self.world = world
+        self.cfl = cfl
+        self.min_substeps = min_substeps
+        self.max_substeps = max_substeps
+        self.thickness = float(thickness)
+        self.histogram = Counter()
+        self.last = None
+        world.adaptive = self
+
+    def choose(self, dt):
+        """Substeps for the next frame of ``dt`` seconds (called by ``World.step``)."""
+        world = self.world
+        cx, cy = world.center.x, world.center.y
+        shell = max((hx.R for hx in world.hexes), default=0.0)
+        v_wall = max((abs(hx.omega) * hx.R for hx in world.hexes), default=0.0)
+        v2 = 0.0
+        r_min = world.ball_radius
+        balls = world.active
+        found = world.kernel.fastest(world, shell, dt) if world.kernel is not None else None
+        if found is not None:
+            # The kernel's arrays cover all but the balls spawned since its last step
+            v2, r_kernel, seen = found
+            r_min = min(r_min, r_kernel)
+            balls = balls[seen:]
+        for b in balls:
+            pos, vel, r = b.pos, b.vel, b.r
+            s2 = vel.x * vel.x + vel.y * vel.y
+            if math.hypot(pos.x - cx, pos.y - cy) - math.sqrt(s2) * dt > shell + r:
+                continue
+            if s2 > v2:
+                v2 = s2
+            if r < r_min:
+                r_min = r
+        travel = (math.sqrt(v2) + v_wall + abs(world.gravity) * dt) * dt
+        allowed = self.cfl * (r_min + 0.5 * self.thickness)
+        n = math.ceil(travel / allowed) if allowed > 0.0 else self.max_substeps
+        n = min(max(n, self.min_substeps), self.max_substeps)
+        self.histogram[n] += 1
+        self.last = n
+        return n
+
+    @property
+    def frames(self):
+        return sum(self.histogram.values())
+
+    @property
+    def substeps(self):
+        """Substeps run so far."""
+        return sum(n * count for n, count in self.histogram.items())
+
+    def saved(self):
+        """Fraction of substeps saved against ``max_substeps`` every frame."""
+        worst = self.frames * self.max_substeps
+        return 1.0 - self.substeps / worst if worst else 0.0
+
+    def summary(self):
+        hist = ", ".join(f"{n}x{self.histogram[n]}" for n in sorted(self.histogram))
+        return (f"{self.substeps / max(self.frames, 1):.2f} substeps/frame ({hist}), "
+                f"{100.0 * self.saved():.0f}% fewer than {self.max_substeps} every frame")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare adaptive substepping with fixed substep counts")
+    parser.add_argument("--balls", type=int, default=20, help="Balls released")
+    parser.add_argument("--spawn-every", type=int, default=120, help="Steps between releases")
+    parser.add_argument("--steps", type=int, default=2400, help="Physics steps to run")
+    parser.add_argument("--cfl", type=float, default=CFL, help="Allowed travel per substep, in ball radii")
+    parser.add_argument("--min-substeps", type=int, default=1)
+    parser.add_argument("--max-substeps", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    schedule = spawn_schedule(args.spawn_every, args.balls)
+    # Compile the kernels (if any) before timing anything
+    warm = World(seed=args.seed)
+    AdaptiveSubsteps(warm)
+    run_schedule(warm, 2, [0])
+
+    modes = [("fixed", args.max_substeps), ("fixed", sim.SUBSTEPS), ("adaptive", None)]
+    print(f"{'mode':<10}{'substeps':>9}{'ms/step':>9}{'inside':>8}{'vs worst':>10}{f'vs {sim.SUBSTEPS}':>8}")
+    times = []
+    for label, substeps in modes:
+        world = World(seed=args.seed, substeps=substeps)
+        stepper = AdaptiveSubsteps(world, args.cfl, args.min_substeps, args.max_substeps) if substeps is None else None
+        start = time.perf_counter()
+        run_schedule(world, args.steps, schedule)
+        elapsed = time.perf_counter() - start
+        times.append(elapsed)
+        shell = world.hexes[-1].R
+        inside = sum(1 for b in world.balls if (b.pos - world.center).length() < shell)
+        count = f"{stepper.substeps / stepper.frames:.2f}" if stepper else str(substeps)
+        vs_default = f"{times[1] / elapsed:.2f}x" if len(times) > 1 else "-"
+        print(f"{label:<10}{count:>9}{1000.0 * elapsed / args.steps:>9.2f}{inside:>8}"
+              f"{times[0] / elapsed:>9.1f}x{vs_default:>8}")
+        if stepper:
+            print(f"  {stepper.summary()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""Cross-submission benchmark: every python-ball engine on one scripted scenario.
+
+Each submission runs through its :mod:`ballsim.adapters` adapter in a fresh
+process (so peak memory is its own) with the same scenario: a seeded
+``random``, one ball released at the centre every ``--spawn-every``
+frames, and ``--frames`` timed 1/60 s frames once each ball count in
+``--counts`` is reached. Reported per submission:
+
+- ms/frame at each ball count;
+- allocation: KB of short-lived Python objects within a frame, as the
+  tracemalloc high-water above the heap at the start of the frame (mean
+  over ``--alloc-frames`` frames at the largest count). pymunk's C
+  allocations are not traced;
+- peak RSS of the process, and its growth after the scene was built;
+- lost balls (off screen or non-finite) at the end.
+
+A crash is reported with the frame and ball count it happened at.
+``--markdown`` writes the leaderboard, ranked by ms/frame at the largest
+count.
+
+    python -m ballsim.bench --counts 50 100 200 --markdown one-shot/python-ball/benchmark.md
+"""
+import argparse
+import multiprocessing
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+from .adapters import ADAPTERS, unsupported
+
+
+def _peak_rss_mb():
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024.0
+
+
+def measure(name, counts, frames, spawn_every, alloc_frames, seed):
+    """Worker entry point: run one submission through the scenario and return its row."""
+    from .adapters import make_adapter
+
+    row = {"name": name, "ms": {}, "error": None}
+    adapter = None
+    frame = 0
+    try:
+        adapter = make_adapter(name, seed)
+        row["engine"], row["notes"] = adapter.engine, adapter.notes
+        startup = _peak_rss_mb()
+        for count in sorted(counts):
+            while adapter.ball_count < count:
+                if frame % spawn_every == 0:
+                    adapter.spawn()
+                adapter.step()
+                frame += 1
+            start = time.perf_counter()
+            for _ in range(frames):
+                adapter.step()
+            row["ms"][count] = 1000.0 * (time.perf_counter() - start) / frames
+            frame += frames
+
+        tracemalloc.start()
+        churn = 0
+        for _ in range(alloc_frames):
+            tracemalloc.reset_peak()
+            live = tracemalloc.get_traced_memory()[0]
+            adapter.step()
+            churn += tracemalloc.get_traced_memory()[1] - live
+        tracemalloc.stop()
+        row["alloc_kb"] = churn / alloc_frames / 1024.0
+        row["lost"] = adapter.lost()
+        row["growth_mb"] = _peak_rss_mb() - startup
+    except Exception as e:
+        balls = adapter.ball_count if adapter is not None else 0
+        row["error"] = f"{type(e).__name__}: {e} (frame {frame}, {balls} balls)"
+        row.setdefault("engine", ADAPTERS[name].engine)
+        row.setdefault("notes", ADAPTERS[name].notes)
+    row["rss_mb"] = _peak_rss_mb()
+    return row
+
+
+def run_suite(names, counts, frames, spawn_every, alloc_frames, seed):
+    """One fresh process per submission, run one after another so timings do not interfere."""
+    ctx = multiprocessing.get_context("spawn")
+    rows = []
+    for name in names:
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+            rows.append(pool.submit(measure, name, counts, frames, spawn_every, alloc_frames, seed).result())
+    return rows
+
+
+def ranked(rows, counts):
+    """Rows that finished, fastest at the largest count first, then the crashes."""
+    top = max(counts)
+    done = sorted((r for r in rows if r["error"] is None), key=lambda r: r["ms"][top])
+    return done + [r for r in rows if r["error"] is not None]
+
+
+def format_table(rows, counts):
+    head = f"{'submission':<30}" + "".join(f"{f'{c} balls':>11}" for c in counts)
+    lines = [head + f"{'alloc KB':>10}{'RSS MB':>8}{'growth':>8}{'lost':>6}"]
+    for r in rows:
+        if r["error"] is not None:
+            lines.append(f"{r['name']:<30}crashed: {r['error']}")
+            continue
+        cells = "".join(f"{r['ms'][c]:>11.2f}" for c in counts)
+        lines.append(f"{r['name']:<30}{cells}{r['alloc_kb']:>10.1f}{r['rss_mb']:>8.0f}{r['growth_mb']:>8.1f}{r['lost']:>6}")
+    return "\n".join(lines)
+
+
+def format_markdown(rows, counts, skipped, args):
+    lines = [
+        "# python-ball 性能排行 / performance leaderboard",
+        "",
+        "Generated by `python -m ballsim.bench "
+        f"--counts {' '.join(map(str, counts))} --frames {args.frames} --spawn-every {args.spawn_every} "
+        f"--seed {args.seed}`. Each submission is driven headlessly through `ballsim/adapters.py`: "
+        "balls are released at the centre, and ms/frame is the time to advance 1/60 s of simulation. "
+        "Allocation is the tracemalloc high-water of short-lived objects within one frame at the largest count "
+        "(pymunk's C allocations are not traced); RSS growth is the peak after the scene was built. "
+        "Lost balls are off screen or non-finite at the end. Correctness notes come from reading each submission. "
+        "Rows noted 'patched by ballsim' crash as submitted and were timed with the ballsim fix, not the model's code.",
+        "",
+        "| rank | submission | engine | " + " | ".join(f"ms/frame @ {c}" for c in counts)
+        + " | alloc KB/frame | peak RSS MB | RSS growth MB | lost | correctness notes |",
+        "|---" * (8 + len(counts)) + "|",
+    ]
+    rank = 0
+    for r in rows:
+        if r["error"] is None:
+            rank += 1
+            cells = " | ".join(f"{r['ms'][c]:.2f}" for c in counts)
+            lines.append(f"| {rank} | {r['name']} | {r['engine']} | {cells} | {r['alloc_kb']:.1f} | "
+                         f"{r['rss_mb']:.0f} | {r['growth_mb']:.1f} | {r['lost']} | {r['notes']} |")
+        else:
+            cells = " | ".join("-" for _ in counts)
+            lines.append(f"| - | {r['name']} | {r['engine']} | {cells} | - | - | - | - | "
+                         f"crashed: `{r['error']}`; {r['notes']} |")
+    for name, reason in skipped.items():
+        cells = " | ".join("-" for _ in counts)
+        lines.append(f"| - | {name} | - | {cells} | - | - | - | - | does not run: {reason} |")
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every python-ball submission on one headless scenario")
+    parser.add_argument("--only", nargs="+", choices=sorted(ADAPTERS), help="Submissions to run (default: all)")
+    parser.add_argument("--counts", type=int, nargs="+", default=[50, 100, 200], help="Ball counts to time at")
+    parser.add_argument("--frames", type=int, default=30, help="Timed frames per ball count")
+    parser.add_argument("--spawn-every", type=int, default=1, help="Frames between released balls")
+    parser.add_argument("--alloc-frames", type=int, default=5, help="Frames traced for allocation")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--markdown", help="Write the leaderboard to this file")
+    args = parser.parse_args()
+
+    counts = sorted(args.counts)
+    names = args.only or list(ADAPTERS)
+    rows = ranked(run_suite(names, counts, args.frames, args.spawn_every, args.alloc_frames, args.seed), counts)
+    print(format_table(rows, counts))
+    skipped = {} if args.only else unsupported()
+    for name, reason in skipped.items():
+        print(f"{name:<30}does not run: {reason}")
+    if args.markdown:
+        with open(args.markdown, "w", encoding="utf-8") as f:
+            f.write(format_markdown(rows, counts, skipped, args))
+        print(f"Leaderboard written to {args.markdown}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,368 @@
+"""Continuous collision detection for the gpt-5 hexagon engine.
+
+Each substep is swept in time: the earliest time of impact (TOI) of any fast
+ball against a rotating wall or another ball is found, everything drifts to
+that instant, the impact is resolved, and only the balls involved are swept
+again. Substeps without such impacts cost one speed check per ball, so the
+engine can run at one substep without balls tunnelling through thin walls.
+
+Walls are swept in each hexagon's rotating frame, where the sides are static
+and the ball moves from its start to its end position (the rotation over one
+substep is a few milliradians, so the chord is an excellent approximation).
+"""
+import math
+
+from .world import sim
+
+# Sweeps shorter than this fraction of the ball radius are left to the
+# discrete pass, which already catches them.
+SWEEP_FRACTION = 0.5
+
+# Balls already touching count as an impact only when they would close in by
+# more than this fraction of the radius over the rest of the substep.
+CONTACT_SLOP = 0.01
+
+# Impacts resolved inside one substep before ball-ball sweeps are dropped;
+# wall impacts get the same budget again, since those are what let balls escape.
+MAX_EVENTS = 256
+
+# Past both budgets each ball is swept against the walls on its own, resolving
+# at most this many wall impacts per ball; a ball still bouncing after that
+# stays where its last impact left it for the rest of the substep.
+MAX_BOUNCES = 16
+
+_COS30 = math.cos(math.pi / 6.0)
+
+
+def hex_local_sides(R, missing):
+    """Sides of a hexagon of circumradius ``R`` in its own (unrotated) frame."""
+    verts = [(R * math.cos(i * math.tau / 6.0), R * math.sin(i * math.tau / 6.0)) for i in range(6)]
+    return [
+        (k, verts[k][0], verts[k][1], verts[(k + 1) % 6][0], verts[(k + 1) % 6][1])
+        for k in range(6) if k != missing
+    ]
+
+
+def sweep_circle_circle(px, py, dx, dy, r):
+    """Earliest fraction s in [0, 1] at which |(px, py) + s (dx, dy)| == r.
+
+    Returns 0 when already within ``r`` and still closing in, None when
+    moving apart or not reaching.
+    """
+    b = px * dx + py * dy
+    if b >= 0.0:
+        return None
+    p2 = px * px + py * py
+    c = p2 - r * r
+    if c <= 0.0:
+        return 0.0 if b < -CONTACT_SLOP * r * math.sqrt(p2) else None
+    a = dx * dx + dy * dy
+    disc = b * b - a * c
+    if disc < 0.0:
+        return None
+    s = (-b - math.sqrt(disc)) / a
+    if s > 1.0:
+        return None
+    return max(s, 0.0)
+
+
+def sweep_circle_segment(x0, y0, dx, dy, ax, ay, bx, by, r):
+    """Earliest fraction s in [0, 1] at which a circle moving from (x0, y0)
+    by (dx, dy) touches segment ab.
+
+    Returns 0 when already touching and still pushing into the segment, None
+    when no contact happens within the sweep.
+    """
+    ex, ey = bx - ax, by - ay
+    length = math.hypot(ex, ey)
+    tx, ty = ex / length, ey / length
+    nx, ny = -ty, tx
+
+    rx, ry = x0 - ax, y0 - ay
+    dist = rx * nx + ry * ny
+    along = rx * tx + ry * ty
+    if abs(dist) <= r and -r <= along <= length + r:
+        # Already inside the contact band; confirm against the end caps
+        u = min(max(along, 0.0), length)
+        gap2 = (along - u) ** 2 + dist * dist
+        if gap2 <= r * r:
+            if gap2 == 0.0:
+                return None
+            # Closing speed along the contact normal (closest point -> centre)
+            approach = ((along - u) * (dx * tx + dy * ty) + dist * (dx * nx + dy * ny)) / math.sqrt(gap2)
+            return 0.0 if approach < -CONTACT_SLOP * r else None
+
+    best = None
+
+    # Flat face, on whichever side the circle starts
+    side = 1.0 if dist >= 0.0 else -1.0
+    approach = (dx * nx + dy * ny) * side
+    if approach < 0.0 and abs(dist) > r:
+        s = (abs(dist) - r) / -approach
+        if s <= 1.0:
+            u = along + s * (dx * tx + dy * ty)
+            if 0.0 <= u <= length:
+                best = s
+
+    # Rounded end caps
+    for cx, cy in ((ax, ay), (bx, by)):
+        s = sweep_circle_circle(x0 - cx, y0 - cy, dx, dy, r)
+        if s is not None and (best is None or s < best):
+            best = s
+    return best
+
+
+class SweptStepper:
+    """Integrates one substep with time-of-impact splitting.
+
+    ``events`` counts impacts resolved so far and ``capped`` counts substeps
+    that hit ``MAX_EVENTS`` and left the remaining ball-ball impacts to the
+    discrete pass. ``overflowed`` counts substeps that also used up the wall
+    budget; their remaining time is swept one ball at a time against the
+    walls alone (see :meth:`_finish_walls`), so balls still cannot tunnel.
+    """
+
+    def __init__(self, center):
+        self.center = center
+        self.events = 0
+        self.capped = 0
+        self.overflowed = 0
+        self._sides = {}
+
+    def _local_sides(self, hx):
+        key = (hx.R, hx.missing)
+        sides = self._sides.get(key)
+        if sides is None:
+            sides = self._sides[key] = hex_local_sides(hx.R, hx.missing)
+        return sides
+
+    def _wall_toi(self, hexes, ball, window):
+        """Earliest (time, hex index, side index) of ``ball`` against any wall."""
+        cx, cy = self.center.x, self.center.y
+        px, py = ball.pos.x - cx, ball.pos.y - cy
+        vx, vy = ball.vel.x, ball.vel.y
+        r = ball.r
+        travel = math.hypot(vx, vy) * window
+        rho = math.hypot(px, py)
+        ex, ey = px + vx * window, py + vy * window
+
+        best = None
+        for h, hx in enumerate(hexes):
+            R = hx.R
+            # Walls live in the annulus [apothem, R]
+            if rho + travel + r < R * _COS30 or rho - travel - r > R:
+                continue
+            if travel + abs(hx.omega) * R * window < SWEEP_FRACTION * r:
+                continue
+            c0, s0 = math.cos(hx.angle), math.sin(hx.angle)
+            a1 = hx.angle + hx.omega * window
+            c1, s1 = math.cos(a1), math.sin(a1)
+            qx0, qy0 = c0 * px + s0 * py, -s0 * px + c0 * py
+            qx1, qy1 = c1 * ex + s1 * ey, -s1 * ex + c1 * ey
+            for k, ax, ay, bx, by in self._local_sides(hx):
+                s = sweep_circle_segment(qx0, qy0, qx1 - qx0, qy1 - qy0, ax, ay, bx, by, r)
+                if s is not None and (best is None or s < best[0]):
+                    best = (s, h, k)
+        if best is None:
+            return None
+        return best[0] * window, best[1], best[2]
+
+    def _pair_toi(self, balls, i, window):
+        """Earliest (time, j) at which ball ``i`` hits another ball."""
+        bi = balls[i]
+        xi, yi, vxi, vyi = bi.pos.x, bi.pos.y, bi.vel.x, bi.vel.y
+        best = None
+        for j, bj in enumerate(balls):
+            if j == i:
+                continue
+            r_sum = bi.r + bj.r
+            dx = (bj.vel.x - vxi) * window
+            dy = (bj.vel.y - vyi) * window
+            d2 = dx * dx + dy * dy
+            if d2 < (SWEEP_FRACTION * min(bi.r, bj.r)) ** 2:
+                continue
+            px, py = bj.pos.x - xi, bj.pos.y - yi
+            gap = math.hypot(px, py) - r_sum
+            if gap * gap > d2 and gap > 0.0:
+                continue
+            s = sweep_circle_circle(px, py, dx, dy, r_sum)
+            if s is not None and (best is None or s < best[0]):
+                best = (s, j)
+        if best is None:
+            return None
+        return best[0] * window, best[1]
+
+    def _scan(self, hexes, balls, i, t, dt, pairs=True):
+        """Earliest impact of ball ``i`` in [t, dt], as (abs time, kind, data)."""
+        window = dt - t
+        best = None
+        wall = self._wall_toi(hexes, balls[i], window)
+        if wall is not None:
+            best = (t + wall[0], "wall", (wall[1], wall[2]))
+        if not pairs:
+            return best
+        pair = self._pair_toi(balls, i, window)
+        if pair is not None and (best is None or t + pair[0] < best[0]):
+            best = (t + pair[0], "ball", pair[1])
+        return best
+
+    def _resolve_wall(self, hx, side, ball):
+        verts = hx.vertices()
+        p1, p2 = verts[side], verts[(side + 1) % 6]
+        cp = sim.closest_point_on_segment(p1, p2, ball.pos)
+        d = ball.pos - cp
+        if d.length_squared() == 0:
+            return
+        n = d.normalize()
+        vn = (ball.vel - hx.point_velocity(cp)).dot(n)
+        if vn < 0:
+            ball.vel -= 2.0 * vn * n
+
+    @staticmethod
+    def _resolve_pair(b1, b2):
+        delta = b2.pos - b1.pos
+        if delta.length_squared() == 0:
+            return
+        n = delta.normalize()
+        rel_n = (b1.vel - b2.vel).dot(n)
+        if rel_n > 0:
+            # Equal masses, e = 1: swap the normal components
+            b1.vel -= rel_n * n
+            b2.vel += rel_n * n
+
+    @staticmethod
+    def _drift(hexes, balls, h):
+        if h <= 0.0:
+            return
+        for hx in hexes:
+            hx.update(h)
+        for b in balls:
+            b.pos += b.vel * h
+
+    def _finish_walls(self, hexes, balls, t, dt):
+        """Move every ball from ``t`` to ``dt``, sweeping it alone against the walls.
+
+        Balls do not interact here: the discrete pass that follows the
+        substep resolves their overlaps, as it would without CCD. Each ball
+        sees the hexagons at its own time, so the walls are re-posed per
+        impact and left at ``dt`` afterwards.
+        """
+        start = [hx.angle for hx in hexes]
+
+        def pose(at):
+            for hx, angle in zip(hexes, start):
+                hx.angle = angle + hx.omega * (at - t)
+
+        events = 0
+        for b in balls:
+            tb = t
+            for _ in range(MAX_BOUNCES):
+                pose(tb)
+                hit = self._wall_toi(hexes, b, dt - tb)
+                if hit is None:
+                    break
+                th, h, k = hit
+                b.pos += b.vel * th
+                tb += th
+                pose(tb)
+                self._resolve_wall(hexes[h], k, b)
+                events += 1
+            else:
+                # Still bouncing: hold the ball at its last impact rather
+                # than drift it through a wall it has not been swept against
+                continue
+            b.pos += b.vel * (dt - tb)
+        pose(dt)
+        return events
+
+    def contain(self, hexes, balls, before):
+        """Stop the discrete pass from pushing balls through walls.
+
+        ``before`` holds each ball's (x, y) ahead of the ball-ball pass. A
+        ball that pass moved is swept from there to where it was put, against
+        the walls as they stand, and left at its first contact. Crowded balls
+        overlap deeply once the impact budget is spent, and separating them
+        can otherwise move a ball across a side.
+        """
+        cx, cy = self.center.x, self.center.y
+        for b, (x0, y0) in zip(balls, before):
+            dx, dy = b.pos.x - x0, b.pos.y - y0
+            if dx == 0.0 and dy == 0.0:
+                continue
+            r = b.r
+            px, py = x0 - cx, y0 - cy
+            rho = math.hypot(px, py)
+            push = math.hypot(dx, dy)
+            best = None
+            for hx in hexes:
+                R = hx.R
+                if rho + push + r < R * _COS30 or rho - push - r > R:
+                    continue
+                c, s = math.cos(hx.angle), math.sin(hx.angle)
+                qx, qy = c * px + s * py, -s * px + c * py
+                qdx, qdy = c * dx + s * dy, -s * dx + c * dy
+                for _, ax, ay, bx, by in self._local_sides(hx):
+                    hit = sweep_circle_segment(qx, qy, qdx, qdy, ax, ay, bx, by, r)
+                    if hit is not None and (best is None or hit < best):
+                        best = hit
+            if best is not None:
+                b.pos.x, b.pos.y = x0 + best * dx, y0 + best * dy
+
+    def advance(self, hexes, balls, dt, gravity):
+        """Rotate the hexagons and move the balls by ``dt`` without tunnelling."""
+        g = gravity * dt
+        for b in balls:
+            b.vel.y += g
+
+        # Only balls that can outrun the discrete pass are swept up front;
+        # anything touched by an impact is re-swept regardless of speed.
+        rim = max((abs(hx.omega) * hx.R for hx in hexes), default=0.0)
+        pending = {}
+        for i, b in enumerate(balls):
+            if (b.vel.length() + rim) * dt >= 0.5 * SWEEP_FRACTION * b.r:
+                hit = self._scan(hexes, balls, i, 0.0, dt)
+                if hit is not None:
+                    pending[i] = hit
+
+        t = 0.0
+        events = 0
+        pairs = True
+        while pending:
+            if events == MAX_EVENTS and pairs:
+                self.capped += 1
+                pairs = False
+                pending = {}
+                for k in range(len(balls)):
+                    hit = self._scan(hexes, balls, k, t, dt, pairs)
+                    if hit is not None:
+                        pending[k] = hit
+                continue
+            if events == 2 * MAX_EVENTS:
+                self.overflowed += 1
+                self.events += events + self._finish_walls(hexes, balls, t, dt)
+                return
+
+            i = min(pending, key=lambda k: pending[k][0])
+            t_hit, kind, data = pending.pop(i)
+            if t_hit > dt:
+                break
+
+            self._drift(hexes, balls, t_hit - t)
+            t = t_hit
+            if kind == "wall":
+                self._resolve_wall(hexes[data[0]], data[1], balls[i])
+                involved = {i}
+            else:
+                self._resolve_pair(balls[i], balls[data])
+                involved = {i, data}
+            events += 1
+
+            stale = [k for k, (_, kk, dd) in pending.items() if kk == "ball" and dd in involved]
+            for k in list(involved) + stale:
+                pending.pop(k, None)
+                hit = self._scan(hexes, balls, k, t, dt, pairs)
+                if hit is not None:
+                    pending[k] = hit
+
+        self.events += events
+        self._drift(hexes, balls, dt - t)
@@ -0,0 +1,301 @@
+"""Physics invariants on random inputs, and recorded performance budgets.
+
+Parity (:mod:`ballsim.parity`) proves the kernels match gpt-5 bit for bit;
+it cannot tell whether both are wrong. These checks state what the contact
+functions must do and try them on seeded random inputs, against gpt-5's
+reference functions and the array kernels alike, so an optimization that
+breaks elasticity or wall handling fails here:
+
+- ``closest_point_on_segment`` returns a point of the segment that is no
+  farther from ``p`` than any other sampled point of it;
+- ``resolve_ball_ball`` conserves momentum and the pair's centroid (equal
+  masses), coincident centres included;
+- ``resolve_ball_segment`` never raises the speed relative to the wall (so
+  a static wall adds no energy), and leaves the ball at least its radius
+  from the segment;
+- ``RotatingHex.point_velocity`` is ``omega x (p - CENTER)``: perpendicular
+  to the radius, ``|omega| * |p - CENTER|`` long, and the rate at which a
+  rotating vertex actually moves.
+
+A failing property prints its first counterexample. Inputs are random, and
+about one case in 20 is degenerate: coincident balls, a ball centre on
+the segment, or a zero-length segment.
+
+Performance budgets are ms/step per named scenario, recorded in
+``budgets.json`` next to this file by ``--record`` (best of ``--repeat``
+runs). A later run fails when a scenario is slower than its budget by more
+than the recorded threshold (25% by default), in a second round of runs
+as well as the first. Budgets are per machine:
+record them where the checks will run.
+
+Exits non-zero when a property or a budget fails.
+
+    python -m ballsim.checks
+    python -m ballsim.checks --record
+"""
+import argparse
+import json
+import math
+import random
+import sys
+import time
+from pathlib import Path
+
+from . import kernels
+from .headless import run_schedule, spawn_schedule
+from .parity import as_arrays, random_pair
+from .world import Vec2, World, sim
+
+BUDGETS = Path(__file__).with_name("budgets.json")
+THRESHOLD = 0.25
+EPS = 1e-9
+
+
+def _segment(rng, near=None):
+    if rng.random() < 0.05:
+        a = Vec2(rng.uniform(-50, 50), rng.uniform(-50, 50))
+        return a, Vec2(a)
+    a = (near or Vec2(0, 0)) + Vec2(rng.uniform(-20, 20), rng.uniform(-20, 20))
+    return a, a + Vec2(rng.uniform(-40, 40), rng.uniform(-40, 40))
+
+
+def _distance_to_segment(p, a, b):
+    return (p - sim.closest_point_on_segment(a, b, p)).length()
+
+
+# Implementations under test: gpt-5's functions and the array kernels, behind one signature
+
+def _ref_ball_ball(b1, b2):
+    sim.resolve_ball_ball(b1, b2)
+    return [(b.pos, b.vel) for b in (b1, b2)]
+
+
+def _kernel_ball_ball(b1, b2):
+    pos, vel, radius = as_arrays([b1, b2])
+    kernels.ball_ball(pos, vel, radius, 0, 1)
+    return [(Vec2(*pos[i]), Vec2(*vel[i])) for i in range(2)]
+
+
+def _ref_ball_segment(ball, p1, p2, u):
+    sim.resolve_ball_segment(ball, p1, p2, u)
+    return ball.pos, ball.vel
+
+
+def _kernel_ball_segment(ball, p1, p2, u):
+    pos, vel, radius = as_arrays([ball])
+    kernels.ball_segment(pos, vel, radius, 0, p1.x, p1.y, p2.x, p2.y, u.x, u.y)
+    return Vec2(*pos[0]), Vec2(*vel[0])
+
+
+IMPLEMENTATIONS = {
+    "gpt-5": dict(closest=lambda a, b, p: sim.closest_point_on_segment(a, b, p),
+                  ball_ball=_ref_ball_ball, ball_segment=_ref_ball_segment),
+    "kernels": dict(closest=lambda a, b, p: Vec2(kernels.closest_point(a.x, a.y, b.x, b.y, p.x, p.y)),
+                    ball_ball=_kernel_ball_ball, ball_segment=_kernel_ball_segment),
+}
+
+
+def prop_closest_point(impl, rng):
+    a, b = _segment(rng)
+    p = Vec2(rng.uniform(-80, 80), rng.uniform(-80, 80))
+    c = impl["closest"](a, b, p)
+    ab = b - a
+    scale = 1.0 + ab.length()
+    if abs(ab.cross(c - a)) > EPS * scale * scale or (c - a).dot(ab) < -EPS * scale or (c - b).dot(ab) > EPS * scale:
+        return f"{tuple(c)} is not on segment {tuple(a)}-{tuple(b)}"
+    best = (p - c).length()
+    for k in range(11):
+        q = a + ab * (k / 10.0)
+        if (p - q).length() < best - EPS * scale:
+            return f"{tuple(q)} is closer to {tuple(p)} than {tuple(c)}"
+    return None
+
+
+def prop_momentum(impl, rng):
+    b1, b2 = random_pair(rng)
+    momentum = b1.vel + b2.vel
+    centroid = b1.pos + b2.pos
+    (p1, v1), (p2, v2) = impl["ball_ball"](b1, b2)
+    scale = 1.0 + momentum.length() + abs(b1.vel.x) + abs(b1.vel.y)
+    if (v1 + v2 - momentum).length() > EPS * scale:
+        return f"momentum {tuple(momentum)} became {tuple(v1 + v2)}"
+    if (p1 + p2 - centroid).length() > EPS * (1.0 + centroid.length()):
+        return f"centroid moved from {tuple(centroid / 2)} to {tuple((p1 + p2) / 2)}"
+    return None
+
+
+def _wall_case(rng, moving):
+    ball = random_pair(rng)[0]
+    if rng.random() < 0.05:
+        # Centre exactly on the segment
+        p1 = Vec2(ball.pos) - Vec2(rng.uniform(1, 20), 0)
+        p2 = Vec2(ball.pos) + Vec2(rng.uniform(1, 20), 0)
+    else:
+        p1, p2 = _segment(rng, near=ball.pos)
+    u = Vec2(rng.uniform(-100, 100), rng.uniform(-100, 100)) if moving else Vec2(0, 0)
+    return ball, p1, p2, u
+
+
+def prop_no_energy_gain(impl, rng):
+    ball, p1, p2, u = _wall_case(rng, moving=rng.random() < 0.5)
+    before = (ball.vel - u).length()
+    _, vel = impl["ball_segment"](ball, p1, p2, u)
+    after = (vel - u).length()
+    if after > before * (1.0 + EPS) + EPS:
+        return f"speed relative to the wall rose from {before} to {after}"
+    return None
+
+
+def prop_outside_wall(impl, rng):
+    ball, p1, p2, u = _wall_case(rng, moving=True)
+    r = ball.r
+    pos, _ = impl["ball_segment"](ball, p1, p2, u)
+    dist = _distance_to_segment(pos, p1, p2)
+    if dist < r * (1.0 - EPS):
+        return f"ball of radius {r} left {dist} from segment {tuple(p1)}-{tuple(p2)}"
+    return None
+
+
+def prop_point_velocity(rng):
+    hx = sim.RotatingHex(rng.uniform(20, 400), rng.uniform(-3, 3), init_angle=rng.uniform(0, math.tau))
+    p = sim.CENTER + Vec2(rng.uniform(-400, 400), rng.uniform(-400, 400))
+    u = hx.point_velocity(p)
+    r = p - sim.CENTER
+    if abs(u.dot(r)) > EPS * (1.0 + r.length_squared() * abs(hx.omega)):
+        return f"velocity {tuple(u)} at {tuple(p)} is not perpendicular to the radius"
+    if abs(u.length() - abs(hx.omega) * r.length()) > EPS * (1.0 + u.length()):
+        return f"|u| = {u.length()}, expected {abs(hx.omega) * r.length()}"
+    # Central difference of a vertex over a small rotation
+    h = 1e-6
+    k = rng.randrange(6)
+    hx.update(-h)
+    before = hx.vertices()[k]
+    hx.update(2 * h)
+    after = hx.vertices()[k]
+    hx.update(-h)
+    moved = (after - before) / (2 * h)
+    expected = hx.point_velocity(hx.vertices()[k])
+    if (moved - expected).length() > 1e-4 * (1.0 + expected.length()):
+        return f"vertex {k} moves at {tuple(moved)}, point_velocity says {tuple(expected)}"
+    return None
+
+
+PROPERTIES = {
+    "closest point on segment": prop_closest_point,
+    "ball-ball momentum": prop_momentum,
+    "wall adds no energy": prop_no_energy_gain,
+    "ball outside wall": prop_outside_wall,
+}
+
+
+def check_properties(cases, seed):
+    """(name, implementation, counterexample or None) per property."""
+    results = []
+    for name, prop in PROPERTIES.items():
+        for label, impl in IMPLEMENTATIONS.items():
+            rng = random.Random(seed)
+            error = None
+            for k in range(cases):
+                error = prop(impl, rng)
+                if error is not None:
+                    error = f"case {k}: {error}"
+                    break
+            results.append((name, label, error))
+    rng = random.Random(seed)
+    error = next((f"case {k}: {e}" for k in range(cases) if (e := prop_point_velocity(rng)) is not None), None)
+    results.append(("point velocity", "gpt-5", error))
+    return results
+
+
+# Performance scenarios: each builds a world and returns (world, schedule, steps)
+
+def _clicks(**world):
+    return World(seed=0, **world), spawn_schedule(5, 60), 300
+
+
+def _pile(cached):
+    from .contacts import ContactCache
+    from .solver import box_pile
+
+    world = World(hex_radii=[], omegas=[], broadphase="sap", contact_solver="colored", backend="python")
+    if cached:
+        ContactCache(world)
+    box_pile(world, 300)
+    return world, (), 60
+
+
+SCENARIOS = {
+    "clicks-python": lambda: _clicks(backend="python"),
+    "clicks-kernels": lambda: _clicks(backend="auto"),
+    "clicks-frame-walls": lambda: _clicks(backend="python", wall_collision="frame"),
+    "pile-colored": lambda: _pile(cached=False),
+    "pile-cached": lambda: _pile(cached=True),
+}
+
+
+def measure(name, repeat):
+    """Best ms/step of ``repeat`` runs of a scenario (a first run warms up compiled kernels)."""
+    best = float("inf")
+    for k in range(repeat + 1):
+        world, schedule, steps = SCENARIOS[name]()
+        start = time.perf_counter()
+        run_schedule(world, steps, schedule)
+        elapsed = time.perf_counter() - start
+        if k:
+            best = min(best, 1000.0 * elapsed / steps)
+    return best
+
+
+def load_budgets(path=BUDGETS):
+    if not Path(path).exists():
+        return {"threshold": THRESHOLD, "ms_per_step": {}}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check physics invariants and performance budgets")
+    parser.add_argument("--cases", type=int, default=20000, help="Random cases per property")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per scenario (best counts)")
+    parser.add_argument("--budgets", type=str, default=str(BUDGETS), help="Budget file")
+    parser.add_argument("--record", action="store_true", help="Write the measured timings as the new budgets")
+    parser.add_argument("--threshold", type=float, default=None,
+                        help="Allowed slowdown over budget (default: the file's, else 0.25)")
+    parser.add_argument("--no-perf", action="store_true", help="Skip the performance budgets")
+    args = parser.parse_args()
+
+    failures = 0
+    for name, label, error in check_properties(args.cases, args.seed):
+        print(f"{name + ' (' + label + ')':<36}{'ok' if error is None else 'FAIL ' + error}")
+        failures += error is not None
+
+    if not args.no_perf:
+        budgets = load_budgets(args.budgets)
+        threshold = args.threshold if args.threshold is not None else budgets.get("threshold", THRESHOLD)
+        recorded = budgets.get("ms_per_step", {})
+        measured = {}
+        print(f"{'scenario':<24}{'ms/step':>9}{'budget':>9}{'ratio':>8}")
+        for name in SCENARIOS:
+            ms = measured[name] = measure(name, args.repeat)
+            budget = recorded.get(name)
+            if args.record or budget is None:
+                print(f"{name:<24}{ms:>9.2f}{'-':>9}{'-':>8}  {'recorded' if args.record else 'no budget'}")
+                continue
+            if ms > budget * (1.0 + threshold):
+                # One more round before failing: a busy machine makes single rounds noisy
+                ms = measured[name] = min(ms, measure(name, args.repeat))
+            over = ms > budget * (1.0 + threshold)
+            print(f"{name:<24}{ms:>9.2f}{budget:>9.2f}{ms / budget:>7.2f}x  {'FAIL' if over else 'ok'}")
+            failures += over
+        if args.record:
+            with open(args.budgets, "w", encoding="utf-8") as f:
+                json.dump({"threshold": threshold, "ms_per_step": {k: round(v, 3) for k, v in measured.items()}},
+                          f, indent=2)
+                f.write("\n")
+            print(f"Budgets written to {args.budgets}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,463 @@
+"""Persistent contacts with warm-started impulses.
+
+gpt-5 (and the ``sequential`` and ``colored`` solvers) rediscover every
+contact each substep, and gpt-5 adds a fixed positional slop (0.1 px per
+ball pair, 0.2 px per wall) to every one, so a pile is pushed apart and
+falls back every substep. A :class:`ContactCache` attached to a
+:class:`World` replaces the ball-ball and ball-wall phases:
+
+- *Detection* collects every ball pair, and every (ball, hexagon, side),
+  closer than a skin of ``skin`` times the largest radius, and keys them
+  ``(ball, ball)`` and ``(ball, hexagon, side)``. Nothing can come into
+  contact without moving the skin's width, so detection is skipped until
+  the balls have moved half the skin since the last one (pairs) or a ball
+  plus the fastest wall point have moved the skin (walls). Between
+  detections the cached contacts are solved as they are; the ones that
+  have separated get no impulse.
+- *Solving* is sequential impulses with accumulated, non-negative impulses
+  per contact, in graph-coloured batches as in :mod:`ballsim.solver`. Each
+  substep starts from the impulses of the previous one (scaled by the step
+  ratio), carried across detections by key, so a resting contact already
+  holds its load before the first iteration. A gap still open may close
+  within the substep but no further (speculative contacts), approaching
+  contacts bounce with ``restitution`` above ``RESTING_SPEED``, and overlap
+  beyond ``SLOP`` is projected out by ``BETA``, with no added slop.
+- *Narrow phase* (normal and distance per contact) is rerun only for
+  contacts with an end that has moved more than ``REUSE`` since it last
+  ran; for walls that motion is measured in the hexagon's frame, where a
+  ball resting on a turning wall stays put. A detection that finds the
+  same contacts keeps their colouring and geometry.
+
+The cache keeps ball indices, so it cannot be combined with sleeping
+islands; removals (``roster_version``) drop the cached impulses.
+
+The benchmark settles a pile on the screen floor (no hexagons), then one in
+a closed, slowly turning hexagon, which exercises the (ball, hexagon, side)
+cache; there the uncached solvers use ``frame`` walls. ``reuse`` is the
+share of contacts whose narrow phase was skipped.
+
+The cache does not win everywhere. On the settled floor pile it beats
+``colored`` (about 10 against 15 ms/step at 300 balls, 20 against 41 at
+800), with the narrow phase reused for about 90% of contacts. In the
+turning hexagon the pile never comes to rest: detection runs every sixth
+substep and almost no contact stays within ``REUSE``, so at 300 balls the
+cache is slower than ``colored`` (12-14 against 7-9 ms/step) and at 800
+only level with it (30 against 32). Skipping the narrow phase saves little
+in either case; most of a substep is the per-batch NumPy calls of the
+solver iterations and copying the ball state in and out.
+
+    python -m ballsim.contacts --balls 300
+"""
+import argparse
+import itertools
+import math
+import time
+
+import numpy as np
+
+from .hexframe import COS30, NORMALS, SECTOR
+from .solver import BETA, ITERATIONS, RESTING_SPEED, SLOP, box_pile, color_contacts, pile_stats
+from .world import STEP_DT, World
+
+SKIN = 0.3  # candidate margin, in radii of the largest ball
+REUSE = SLOP / 4  # px a contact's ends may move before its normal and gap are recomputed
+
+_NX = np.array([n[0] for n in NORMALS])
+_NY = np.array([n[1] for n in NORMALS])
+
+
+def _state(balls):
+    n = len(balls)
+    return np.fromiter(
+        itertools.chain.from_iterable((b.pos.x, b.pos.y, b.vel.x, b.vel.y, b.r) for b in balls),
+        dtype=np.float64, count=5 * n,
+    ).reshape(n, 5)
+
+
+def _store(balls, state, touched):
+    for k, (x, y, vx, vy) in zip(touched.tolist(), state[touched, :4].tolist()):
+        ball = balls[k]
+        ball.pos.update(x, y)
+        ball.vel.update(vx, vy)
+
+
+def _carry(old_keys, old_lam, keys):
+    """Impulses of ``keys`` found among the (sorted) ``old_keys``, zero for new contacts."""
+    lam = np.zeros(len(keys))
+    if len(old_keys) and len(keys):
+        idx = np.minimum(np.searchsorted(old_keys, keys), len(old_keys) - 1)
+        found = old_keys[idx] == keys
+        lam[found] = old_lam[idx[found]]
+    return lam
+
+
+def near_pairs(pos, radius, margin):
+    """Pairs ``(a < b)`` whose gap is below ``margin``, from a vectorized sweep along x."""
+    n = len(pos)
+    order = np.argsort(pos[:, 0], kind="stable")
+    x = pos[order, 0]
+    end = np.searchsorted(x, x + 2.0 * radius.max() + margin, side="right")
+    counts = end - np.arange(n) - 1
+    first = np.repeat(np.arange(n), counts)
+    step = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    a, b = order[first], order[first + 1 + step]
+    d = pos[b] - pos[a]
+    reach = radius[a] + radius[b] + margin
+    keep = np.einsum("ij,ij->i", d, d) < reach * reach
+    a, b = a[keep], b[keep]
+    return np.minimum(a, b), np.maximum(a, b)
+
+
+def near_walls(pos, radius, hexes, center, margin):
+    """(ball, hexagon, side) of every present side closer than ``margin`` to a ball."""
+    found = []
+    dx = pos[:, 0] - center.x
+    dy = pos[:, 1] - center.y
+    d2 = dx * dx + dy * dy
+    for k, hx in enumerate(hexes):
+        apothem = hx.R * COS30
+        outer = hx.R + radius + margin
+        inner = apothem - radius - margin
+        near = np.flatnonzero((d2 <= outer * outer) & ~((inner > 0.0) & (d2 < inner * inner)))
+        if not len(near):
+            continue
+        c, s = math.cos(hx.angle), math.sin(hx.angle)
+        lx = c * dx[near] + s * dy[near]
+        ly = c * dy[near] - s * dx[near]
+        sector = np.floor(np.arctan2(ly, lx) / SECTOR).astype(np.int64) % 6
+        for offset in (0, 1, 5):
+            side = (sector + offset) % 6
+            nx, ny = _NX[side], _NY[side]
+            t = np.clip(-ny * lx + nx * ly, -0.5 * hx.R, 0.5 * hx.R)
+            ex = lx - (apothem * nx - t * ny)
+            ey = ly - (apothem * ny + t * nx)
+            reach = radius[near] + margin
+            hit = (ex * ex + ey * ey < reach * reach) & (side != hx.missing)
+            found.append((near[hit], np.full(hit.sum(), k), side[hit]))
+    if not found:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty
+    return tuple(np.concatenate(column).astype(np.int64) for column in zip(*found))
+
+
+class ContactCache:
+    """Cached, warm-started ball-ball and ball-wall contacts for a :class:`World`."""
+
+    def __init__(self, world, iterations=ITERATIONS, restitution=1.0, skin=SKIN):
+        if world.sleep is not None:
+            raise ValueError("ContactCache and SleepSystem cannot be combined")
+        self.world = world
+        self.iterations = iterations
+        self.restitution = restitution
+        self.skin = skin
+        self._roster = world.roster_version
+        # Ball-ball: endpoints, sorted keys, accumulated impulses, colour batches, positions at detection
+        self.pa = self.pb = self.pair_keys = np.zeros(0, dtype=np.int64)
+        self.pair_lam = np.zeros(0)
+        self.pair_batches = []
+        self.pair_ref = None
+        self.pair_dt = None
+        # Narrow phase of the cached pairs: positions it was computed at, normals, distances
+        self.pair_geom = None
+        # Ball-wall: ball, hexagon and side per contact, likewise
+        self.wb = self.wh = self.ws = self.wall_keys = np.zeros(0, dtype=np.int64)
+        self.wall_lam = np.zeros(0)
+        self.wall_batches = []
+        self.wall_ref = None
+        self.wall_angles = None
+        self.wall_dt = None
+        # Likewise per wall contact, in its hexagon's frame: ball position, side normal, closest point, distance
+        self.wall_geom = None
+        self.solves = 0
+        self.pair_detections = 0
+        self.wall_detections = 0
+        self.narrow = 0
+        self.reused = 0
+        # Ball state the pair phase left for the wall phase to store, see solve_balls
+        self._pending = None
+        world.contacts = self
+
+    def _check_roster(self):
+        if self.world.roster_version != self._roster:
+            self._roster = self.world.roster_version
+            self.pair_keys = self.wall_keys = np.zeros(0, dtype=np.int64)
+            self.pair_ref = self.wall_ref = None
+            self.pair_geom = self.wall_geom = None
+
+    def _solve(self, a, b, normal, target, lam, batches, vel, inv_mass, wall_vel=None):
+        """Warm start, then ``iterations`` sweeps of clamped impulses along ``normal`` (from a to b).
+
+        ``batches`` are ``(contacts, ia, ib)`` per colour. For walls ``a`` and
+        ``ia`` are None and ``wall_vel`` gives the wall's velocity at each contact.
+        """
+        imp = lam[:, None] * normal
+        np.add.at(vel, b, imp)
+        if a is not None:
+            np.add.at(vel, a, -imp)
+        # Slice once per substep rather than once per iteration
+        work = [(batch, ia, ib, normal[batch], target[batch], lam[batch],
+                 None if wall_vel is None else wall_vel[batch]) for batch, ia, ib in batches]
+        for _ in range(self.iterations):
+            for _batch, ia, ib, nb, tb, lb, wb in work:
+                other = wb if ia is None else vel[ia]
+                vn = np.einsum("ij,ij->i", vel[ib] - other, nb)
+                new = np.maximum(lb + inv_mass * (tb - vn), 0.0)
+                imp = (new - lb)[:, None] * nb
+                lb[:] = new
+                vel[ib] += imp
+                if ia is not None:
+                    vel[ia] -= imp
+        for batch, _ia, _ib, _nb, _tb, lb, _wb in work:
+            lam[batch] = lb
+
+    def _target(self, sep, vn0, dt):
+        bounce = np.where(vn0 < -RESTING_SPEED, -self.restitution * vn0, 0.0)
+        return np.where(sep > 0.0, -sep / dt, bounce)
+
+    def solve_balls(self, balls, dt=None):
+        """The ball-ball phase (called by ``World.collide_balls``)."""
+        self._check_roster()
+        n = len(balls)
+        if n < 2:
+            return
+        dt = dt or STEP_DT / self.world.substeps
+        self.solves += 1
+        state = _state(balls)
+        pos, vel, radius = state[:, 0:2], state[:, 2:4], state[:, 4]
+        margin = self.skin * radius.max()
+
+        ref = self.pair_ref
+        if ref is None or len(ref) != n or np.hypot(*(pos - ref).T).max() > 0.5 * margin:
+            a, b = near_pairs(pos, radius, margin)
+            keys = (a << 32) | b
+            order = np.argsort(keys)
+            a, b, keys = a[order], b[order], keys[order]
+            # A turning pile mostly finds the contacts it had: keep their colouring and geometry
+            if not np.array_equal(keys, self.pair_keys):
+                self.pair_lam = _carry(self.pair_keys, self.pair_lam, keys)
+                self.pa, self.pb, self.pair_keys = a, b, keys
+                self.pair_batches = [(batch, a[batch], b[batch]) for batch in color_contacts(a, b, n)] if len(a) else []
+                self.pair_geom = None
+            self.pair_ref = pos.copy()
+            self.pair_detections += 1
+        a, b = self.pa, self.pb
+        if not len(a):
+            return
+        lam = self.pair_lam
+        if self.pair_dt:
+            lam *= dt / self.pair_dt
+
+        # Narrow phase only for contacts with an end moved more than REUSE since it last ran
+        geom = self.pair_geom
+        if geom is None:
+            geom = self.pair_geom = (pos.copy(), np.zeros((len(a), 2)), np.zeros(len(a)))
+            stale = np.arange(len(a))
+        else:
+            moved = np.hypot(*(pos - geom[0]).T) > REUSE
+            geom[0][moved] = pos[moved]
+            stale = np.flatnonzero(moved[a] | moved[b])
+        ref, normal, dist = geom
+        if len(stale):
+            sa, sb = a[stale], b[stale]
+            d = pos[sb] - pos[sa]
+            ds = np.hypot(d[:, 0], d[:, 1])
+            coincident = ds == 0.0
+            ns = d / np.where(coincident, 1.0, ds)[:, None]
+            ns[coincident] = (1.0, 0.0)
+            normal[stale], dist[stale] = ns, ds
+        self.narrow += len(stale)
+        self.reused += len(a) - len(stale)
+        sep = dist - radius[a] - radius[b]
+        vn0 = np.einsum("ij,ij->i", vel[b] - vel[a], normal)
+        self._solve(a, b, normal, self._target(sep, vn0, dt), lam, self.pair_batches, vel, 0.5)
+
+        # Project out overlap batch by batch, so a ball's several contacts see each other's pushes
+        if (sep < -SLOP).any():
+            for _batch, ia, ib in self.pair_batches:
+                d = pos[ib] - pos[ia]
+                dist = np.hypot(d[:, 0], d[:, 1])
+                depth = radius[ia] + radius[ib] - dist - SLOP
+                deep = (depth > 0.0) & (dist > 0.0)
+                push = (0.5 * BETA * depth[deep] / dist[deep])[:, None] * d[deep]
+                pos[ia[deep]] -= push
+                pos[ib[deep]] += push
+        self.pair_dt = dt
+        touched = np.unique(np.concatenate((a, b)))
+        world = self.world
+        if world.hexes and world.monitor is None and world.ccd is None:
+            # Nothing reads or moves the balls before the wall phase: hand it the state
+            self._pending = (balls, state, touched)
+        else:
+            _store(balls, state, touched)
+
+    def solve_walls(self, balls, hexes, center, dt=None):
+        """The ball-wall phase (called by ``World.collide_walls``)."""
+        self._check_roster()
+        n = len(balls)
+        if not n or not hexes:
+            return
+        dt = dt or STEP_DT / self.world.substeps
+        pending, self._pending = self._pending, None
+        if pending is not None and pending[0] is balls and len(pending[1]) == n:
+            state, touched = pending[1], pending[2]
+        else:
+            state, touched = _state(balls), None
+        pos, vel, radius = state[:, 0:2], state[:, 2:4], state[:, 4]
+        margin = self.skin * radius.max()
+        angles = np.array([hx.angle for hx in hexes])
+        R = np.array([hx.R for hx in hexes])
+
+        ref = self.wall_ref
+        if (ref is None or len(ref) != n or len(self.wall_angles) != len(hexes)
+                or np.hypot(*(pos - ref).T).max() + (R * np.abs(angles - self.wall_angles)).max() > margin):
+            ball, hexagon, side = near_walls(pos, radius, hexes, center, margin)
+            keys = (ball << 16) | (hexagon << 3) | side
+            order = np.argsort(keys)
+            ball, hexagon, side, keys = ball[order], hexagon[order], side[order], keys[order]
+            if not np.array_equal(keys, self.wall_keys):
+                self.wall_lam = _carry(self.wall_keys, self.wall_lam, keys)
+                self.wb, self.wh, self.ws, self.wall_keys = ball, hexagon, side, keys
+                self.wall_batches = [(batch, None, ball[batch]) for batch in color_contacts(ball, ball, n)] if len(ball) else []
+                self.wall_geom = None
+            self.wall_ref = pos.copy()
+            self.wall_angles = angles
+            self.wall_detections += 1
+        ball, hexagon, side = self.wb, self.wh, self.ws
+        if not len(ball):
+            if touched is not None:
+                _store(balls, state, touched)
+            return
+        lam = self.wall_lam
+        if self.wall_dt:
+            lam *= dt / self.wall_dt
+
+        # Closest point of each side in its hexagon's frame, as in hexframe.FrameWalls. A ball
+        # resting on a turning wall turns with it, so the frame is where it stays put.
+        c, s = np.cos(angles)[hexagon], np.sin(angles)[hexagon]
+        omega = np.array([hx.omega for hx in hexes])[hexagon]
+        dx = pos[ball, 0] - center.x
+        dy = pos[ball, 1] - center.y
+        lx, ly = c * dx + s * dy, c * dy - s * dx
+        geom = self.wall_geom
+        if geom is None:
+            geom = self.wall_geom = tuple(np.zeros(len(ball)) for _ in range(7))
+            stale = np.arange(len(ball))
+        else:
+            stale = np.flatnonzero(np.hypot(lx - geom[0], ly - geom[1]) > REUSE)
+        gx, gy, mx, my, qx, qy, dist = geom
+        if len(stale):
+            h, lxs, lys = hexagon[stale], lx[stale], ly[stale]
+            apothem, half = R[h] * COS30, 0.5 * R[h]
+            nx, ny = _NX[side[stale]], _NY[side[stale]]
+            t = np.clip(-ny * lxs + nx * lys, -half, half)
+            qxs, qys = apothem * nx - t * ny, apothem * ny + t * nx
+            ex, ey = lxs - qxs, lys - qys
+            ds = np.hypot(ex, ey)
+            on_side = ds <= 1e-6
+            safe = np.where(on_side, 1.0, ds)
+            # On the side itself gpt-5's degenerate normal points inwards
+            mx[stale] = np.where(on_side, -nx, ex / safe)
+            my[stale] = np.where(on_side, -ny, ey / safe)
+            gx[stale], gy[stale], qx[stale], qy[stale], dist[stale] = lxs, lys, qxs, qys, ds
+        self.narrow += len(stale)
+        self.reused += len(ball) - len(stale)
+        # World-space normal and wall velocity omega x q
+        normal = np.column_stack((c * mx - s * my, s * mx + c * my))
+        wx, wy = -omega * qy, omega * qx
+        wall_vel = np.column_stack((c * wx - s * wy, s * wx + c * wy))
+        sep = dist - radius[ball]
+        vn0 = np.einsum("ij,ij->i", vel[ball] - wall_vel, normal)
+        self._solve(None, ball, normal, self._target(sep, vn0, dt), lam, self.wall_batches, vel, 1.0, wall_vel)
+
+        depth = -sep - SLOP
+        deep = depth > 0.0
+        np.add.at(pos, ball[deep], (BETA * depth[deep])[:, None] * normal[deep])
+        self.wall_dt = dt
+        _store(balls, state, np.unique(ball if touched is None else np.concatenate((touched, ball))))
+
+
+def jitter(world, steps):
+    """Mean distance a ball moves per step over ``steps`` further steps."""
+    before = np.array([(b.pos.x, b.pos.y) for b in world.balls])
+    total = 0.0
+    for _ in range(steps):
+        world.step(STEP_DT)
+        after = np.array([(b.pos.x, b.pos.y) for b in world.balls])
+        total += float(np.hypot(*(after - before).T).mean())
+        before = after
+    return total / steps
+
+
+def shell_pile(world, count):
+    """Stack ``count`` balls in a hexagonal packing in the bottom of the outer hexagon, touching."""
+    r = world.ball_radius
+    pitch = 2.0 * r
+    cx, cy = world.center.x, world.center.y
+    # Inside the inscribed circle the pile clears every side whatever the angle
+    inner = world.hexes[-1].R * COS30 - r - 1.0
+    placed = row = 0
+    while placed < count:
+        y = cy + inner - row * pitch * math.sqrt(3) / 2.0
+        if y < cy - inner:
+            raise ValueError(f"{count} balls do not fit in the hexagon")
+        half = math.sqrt(inner * inner - (y - cy) ** 2)
+        x = cx - half + (r if row % 2 else 0.0)
+        while x <= cx + half and placed < count:
+            world.spawn((x, y), (0.0, 0.0))
+            x += pitch
+            placed += 1
+        row += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-substep contact discovery with the warm-started contact cache")
+    parser.add_argument("--balls", type=int, default=300, help="Balls in the pile")
+    parser.add_argument("--steps", type=int, default=240, help="Steps to settle before measuring")
+    parser.add_argument("--measure", type=int, default=120, help="Timed steps on the settled pile")
+    parser.add_argument("--shell", type=float, default=400.0, help="Radius of the closed hexagon in the shelled case")
+    parser.add_argument("--omega", type=float, default=0.2, help="Its angular velocity in rad/s")
+    args = parser.parse_args()
+
+    cases = [
+        # No hexagons: a plain pile on the screen-edge clamp, as in ballsim.solver
+        ("floor", dict(hex_radii=[], omegas=[]), box_pile),
+        (f"closed hexagon R={args.shell:g}, omega={args.omega:g}",
+         dict(hex_radii=[args.shell], omegas=[args.omega], missing=-1, wall_collision="frame"), shell_pile),
+    ]
+    for label, options, pile in cases:
+        print(label)
+        print(f"{'contacts':<12}{'ms/step':>9}{'jitter px':>11}{'rms speed':>11}{'overlap':>9}{'height':>8}"
+              f"{'detect':>8}{'walls':>8}{'reuse':>8}")
+        for name in ("sequential", "colored", "cached"):
+            world = World(broadphase="sap", contact_solver="sequential" if name == "cached" else name,
+                          backend="python", **options)
+            cache = ContactCache(world) if name == "cached" else None
+            pile(world, args.balls)
+            for _ in range(args.steps):
+                world.step(STEP_DT)
+            solves = cache.solves if cache else 0
+            detections = (cache.pair_detections, cache.wall_detections) if cache else (0, 0)
+            narrow = (cache.narrow, cache.reused) if cache else (0, 0)
+            start = time.perf_counter()
+            moved = jitter(world, args.measure)
+            per_step = (time.perf_counter() - start) / args.measure
+            rms, deepest, height = pile_stats(world)
+            if cache and world.hexes:
+                detect = f"{(cache.pair_detections - detections[0]) / (cache.solves - solves):.1%}"
+                walls = f"{(cache.wall_detections - detections[1]) / (cache.solves - solves):.1%}"
+            elif cache:
+                detect, walls = f"{(cache.pair_detections - detections[0]) / (cache.solves - solves):.1%}", "-"
+            else:
+                detect, walls = "100%", "100%" if world.hexes else "-"
+            if cache:
+                reused = cache.reused - narrow[1]
+                reuse = f"{reused / max(1, reused + cache.narrow - narrow[0]):.1%}"
+            else:
+                reuse = "-"
+            print(f"{name:<12}{1000.0 * per_step:>9.2f}{moved:>11.3f}{rms:>11.1f}{deepest:>9.2f}{height:>8.0f}"
+                  f"{detect:>8}{walls:>8}{reuse:>8}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
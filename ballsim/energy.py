@@ -0,0 +1,208 @@
+"""Energy and momentum bookkeeping for the headless engine.
+
+The monitor samples total kinetic and potential energy (unit masses, height
+measured up from the screen bottom) after every substep phase, using one
+NumPy gather of the ball state per phase (a plain loop for a handful of
+balls, where NumPy's per-call overhead would dominate). Each phase's energy change goes
+into a ledger:
+
+- ``wall_work``: kinetic energy change during the ball-wall phase. Reflection
+  off a static wall preserves speed, so this is exactly the work done by the
+  moving walls through ``RotatingHex.point_velocity``.
+- ``ledger[phase]``: every other change, i.e. energy the numerics created or
+  destroyed (integration error, positional slop, pair response, clamping).
+
+``drift`` is the sum of the ledger. A time series of energy, momentum, wall
+work and drift is kept per sampled step, and ``seconds`` accumulates the
+time spent sampling and booking.
+
+With ``every=N`` only every Nth step is sampled; the ledger, wall work and
+time series then cover those steps only, an estimate of the whole run
+rather than an account of it.
+
+On the compiled kernel path (``backend="auto"`` with Numba) the kernel
+stepper feeds the monitor from its arrays after each phase through a
+compiled reduction. Even so, a sample per phase costs a noticeable share
+of a small world's step, so the benchmark measures the overhead end to
+end: the wall time of several monitored and unmonitored runs, interleaved,
+compared by best time. Without ``--every`` it doubles the sampling interval
+until the overhead is within ``BUDGET``.
+
+    python -m ballsim.energy --steps 600 --spawn-total 100
+"""
+import argparse
+import itertools
+import time
+
+import numpy as np
+
+from .headless import run_schedule, spawn_schedule
+from .world import PHASES, World
+
+# Below this many balls a plain Python loop beats the NumPy gather
+VECTOR_MIN = 64
+
+# Allowed end-to-end slowdown of a monitored run
+BUDGET = 0.05
+
+SERIES = ("step", "balls", "kinetic", "potential", "total", "momentum_x", "momentum_y", "wall_work", "drift")
+
+
+class EnergyMonitor:
+    """Per-phase energy ledger and per-step time series for a :class:`World`, sampled every ``every`` steps."""
+
+    def __init__(self, world, every=1):
+        if every < 1:
+            raise ValueError(f"every must be at least 1, got {every}")
+        self.world = world
+        self.every = every
+        self.ledger = dict.fromkeys(PHASES, 0.0)
+        self.wall_work = 0.0
+        self._last = (0.0, 0.0, 0.0, 0.0)
+        self._rows = []
+        self.seconds = 0.0
+        world.monitor = self
+
+    def measure(self):
+        """Return (kinetic, potential, momentum x, momentum y) of the current state."""
+        start = time.perf_counter()
+        balls = self.world.balls
+        n = len(balls)
+        if n < VECTOR_MIN:
+            v2 = height = mx = my = 0.0
+            for b in balls:
+                vx, vy = b.vel.x, b.vel.y
+                v2 += vx * vx + vy * vy
+                mx += vx
+                my += vy
+                height += b.pos.y
+            result = 0.5 * v2, self.world.gravity * (n * self.world.height - height), mx, my
+        else:
+            state = np.fromiter(
+                itertools.chain.from_iterable((b.pos.y, b.vel.x, b.vel.y) for b in balls),
+                dtype=np.float64, count=3 * n,
+            ).reshape(n, 3)
+            vx, vy = state[:, 1], state[:, 2]
+            kinetic = 0.5 * (vx @ vx + vy @ vy)
+            potential = self.world.gravity * (n * self.world.height - state[:, 0].sum())
+            result = float(kinetic), float(potential), float(vx.sum()), float(vy.sum())
+        self.seconds += time.perf_counter() - start
+        return result
+
+    def measure_arrays(self, pos, vel, sums):
+        """:meth:`measure` on the kernel path's arrays; ``sums`` is the compiled
+        :func:`ballsim.kernels.energy_sums`."""
+        start = time.perf_counter()
+        v2, ys, mx, my = sums(pos, vel)
+        result = 0.5 * v2, self.world.gravity * (len(pos) * self.world.height - ys), mx, my
+        self.seconds += time.perf_counter() - start
+        return result
+
+    def due(self):
+        """Whether the world's next step is sampled."""
+        return self.world.steps % self.every == 0
+
+    def begin(self, now=None):
+        """Take the baseline at the start of a step (after any spawns)."""
+        self._last = self.measure() if now is None else now
+
+    def mark(self, phase, now=None):
+        """Attribute the energy change since the previous sample (or ``now``) to ``phase``."""
+        ke, pe, px, py = now = self.measure() if now is None else now
+        start = time.perf_counter()
+        dke = ke - self._last[0]
+        dpe = pe - self._last[1]
+        if phase == "ball_wall":
+            self.wall_work += dke
+            self.ledger[phase] += dpe
+        else:
+            self.ledger[phase] += dke + dpe
+        self._last = now
+        self.seconds += time.perf_counter() - start
+
+    def record(self):
+        """Append the end-of-step sample to the time series."""
+        ke, pe, px, py = self._last
+        self._rows.append((self.world.steps, len(self.world.balls), ke, pe, ke + pe, px, py,
+                           self.wall_work, self.drift))
+
+    @property
+    def drift(self):
+        return sum(self.ledger.values())
+
+    def series(self):
+        """Time series as a dict of NumPy arrays keyed by ``SERIES`` names."""
+        data = np.asarray(self._rows, dtype=np.float64).reshape(-1, len(SERIES))
+        return {name: data[:, i] for i, name in enumerate(SERIES)}
+
+
+def timed_runs(args, schedule, every):
+    """Best wall time of ``--repeat`` unmonitored and monitored runs, interleaved.
+
+    Returns (bare, monitored, the last monitored world).
+    """
+    times = {False: [], True: []}
+    for r in range(args.repeat):
+        # Alternate which goes first, so drift in machine load hits both alike
+        for watch in (False, True) if r % 2 == 0 else (True, False):
+            world = World(seed=args.seed, substeps=args.substeps)
+            if watch:
+                EnergyMonitor(world, every)
+                watched = world
+            start = time.perf_counter()
+            run_schedule(world, args.steps, schedule)
+            times[watch].append(time.perf_counter() - start)
+    return min(times[False]), min(times[True]), watched
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure energy drift of the gpt-5 engine")
+    parser.add_argument("--steps", type=int, default=600, help="Physics steps to run")
+    parser.add_argument("--spawn-every", type=int, default=5)
+    parser.add_argument("--spawn-total", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--substeps", type=int, default=None)
+    parser.add_argument("--every", type=int, default=None,
+                        help="Sample every N steps (default: the smallest power of two within the overhead budget)")
+    parser.add_argument("--repeat", type=int, default=5, help="Monitored and unmonitored runs each, interleaved")
+    parser.add_argument("--out", type=str, help="Save the time series to this .npz file")
+    args = parser.parse_args()
+
+    schedule = spawn_schedule(args.spawn_every, args.spawn_total)
+
+    # Compile the kernels (if any) before timing anything
+    warm = World(seed=args.seed, substeps=args.substeps)
+    EnergyMonitor(warm)
+    run_schedule(warm, 2, [0])
+
+    every = args.every or 1
+    while True:
+        bare, elapsed, world = timed_runs(args, schedule, every)
+        overhead = elapsed / bare - 1.0
+        print(f"every {every:<5} {elapsed:.3f}s monitored vs {bare:.3f}s unmonitored ({100.0 * overhead:+.1f}%)")
+        if args.every or overhead <= BUDGET or every >= args.steps:
+            break
+        every *= 2
+
+    monitor = world.monitor
+    series = monitor.series()
+    print(f"{args.steps} steps, {len(world.balls)} balls, {len(series['step'])} sampled")
+    print(f"Energy at end:   {series['total'][-1]:,.1f}  (kinetic {series['kinetic'][-1]:,.1f}, potential {series['potential'][-1]:,.1f})")
+    print(f"Momentum at end: ({series['momentum_x'][-1]:,.1f}, {series['momentum_y'][-1]:,.1f})")
+    print(f"Wall work:       {monitor.wall_work:,.1f}")
+    print(f"Drift:           {monitor.drift:,.1f}")
+    for name in PHASES:
+        print(f"  {name:<12}{monitor.ledger[name]:>16,.1f}")
+    path = "kernels" if world.kernel is not None else "reference"
+    verdict = "within" if overhead <= BUDGET else "over"
+    print(f"Overhead:        {100.0 * overhead:+.1f}% end to end, best of {args.repeat} interleaved runs, "
+          f"{path} path, sampling every {every} steps ({verdict} the {100.0 * BUDGET:.0f}% budget)")
+    print(f"Monitor time:    {monitor.seconds:.3f}s sampling and booking in the last monitored run")
+
+    if args.out:
+        np.savez(args.out, **series)
+        print(f"Saved time series to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""Offscreen export of a scripted run as a PNG sequence or raw rgb24 video.
+
+The simulation runs headlessly in this process and replays a spawn schedule
+like ``ballsim.headless``. Every exported frame is reduced to a snapshot
+(hexagon angles, float32 ball centres, the colour and radius table, the
+world's ``roster_version``) and put
+on a bounded queue; a pool of worker processes takes snapshots off it,
+draws them with :class:`ballsim.render.Renderer` on an off-screen
+``pygame.Surface`` and encodes them:
+
+- ``png``: one ``frame_NNNNNN.png`` per frame in the output directory,
+  encoded here at zlib level ``--png-level`` (pygame's ``image.save`` uses
+  libpng's default level and is about three times slower);
+- ``raw``: packed rgb24 frames in one file, each written by its worker at
+  ``index * frame_bytes``, so frames can finish out of order. Encode with
+  ``ffmpeg -f rawvideo -pix_fmt rgb24 -s 900x900 -r 120 -i out.rgb out.mp4``.
+
+When the workers fall behind, ``put`` blocks and the simulation waits, so
+memory stays at ``--queue`` snapshots whatever the clip length. The report
+compares the export time with the clip's duration.
+
+    python -m ballsim.export frames/ --seconds 60 --fps 120
+    python -m ballsim.export out.rgb --format raw --seconds 60 --fps 60
+"""
+import argparse
+import multiprocessing
+import os
+import queue
+import struct
+import time
+import zlib
+
+import numpy as np
+
+from .headless import load_schedule, run_schedule, spawn_schedule
+from .world import STEP_DT, World, sim
+
+FORMATS = ("png", "raw")
+
+# zlib level of the PNG frames: 1 is ~3x faster than pygame's default save
+PNG_LEVEL = 1
+
+
+def _png_chunk(tag, data):
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+
+
+def encode_png(rgb, size, level=PNG_LEVEL):
+    """PNG file bytes for packed rgb24 pixels, unfiltered rows at zlib ``level``."""
+    w, h = size
+    rows = np.zeros((h, 3 * w + 1), dtype=np.uint8)  # leading 0 per row: filter type None
+    rows[:, 1:] = np.frombuffer(rgb, dtype=np.uint8).reshape(h, 3 * w)
+    header = struct.pack(">IIBBBBB", w, h, 8, 2, 0, 0, 0)  # 8-bit truecolour
+    return (b"\x89PNG\r\n\x1a\n" + _png_chunk(b"IHDR", header)
+            + _png_chunk(b"IDAT", zlib.compress(rows.tobytes(), level)) + _png_chunk(b"IEND", b""))
+
+
+def snapshot(world, index):
+    """Everything a worker needs to draw the world's current state as frame ``index``."""
+    balls = world.balls
+    n = len(balls)
+    xy = np.fromiter((c for b in balls for c in (b.pos.x, b.pos.y)), dtype=np.float32, count=2 * n)
+    return (
+        index,
+        world.roster_version,
+        [hx.angle for hx in world.hexes],
+        xy.reshape(n, 2),
+        np.array([b.color for b in balls], dtype=np.uint8).reshape(n, 3),
+        np.array([b.r for b in balls], dtype=np.float32),
+    )
+
+
+def _worker(tasks, results, fmt, out, hexes, size, level):
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+
+    from .render import Renderer
+
+    pygame.init()
+    # A display mode is needed for Surface.convert(); frames are drawn off screen
+    pygame.display.set_mode((1, 1))
+    world = World(hex_radii=[R for R, _, _ in hexes], omegas=[w for _, w, _ in hexes], missing=0,
+                  backend="python")
+    for hx, (_, _, missing) in zip(world.hexes, hexes):
+        hx.missing = missing
+    surface = pygame.Surface(size).convert()
+    renderer = Renderer(surface)
+    frame_bytes = size[0] * size[1] * 3
+    raw = open(out, "r+b") if fmt == "raw" else None
+    frames = 0
+    busy = 0.0
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            start = time.perf_counter()
+            index, roster, angles, xy, colors, radii = task
+            if roster != world.roster_version:
+                # Balls were retired since this worker's last frame: rebuild the table
+                world.balls = []
+                world.roster_version = roster
+            balls = world.balls
+            for k in range(len(balls), len(xy)):
+                ball = world.spawn()
+                ball.color = tuple(int(c) for c in colors[k])
+                ball.r = float(radii[k])
+            renderer.draw(world, xy.tolist(), angles)
+            rgb = pygame.image.tobytes(surface, "RGB")
+            if raw is None:
+                with open(os.path.join(out, f"frame_{index:06d}.png"), "wb") as f:
+                    f.write(encode_png(rgb, size, level))
+            else:
+                raw.seek(index * frame_bytes)
+                raw.write(rgb)
+            frames += 1
+            busy += time.perf_counter() - start
+    finally:
+        if raw is not None:
+            raw.close()
+        pygame.quit()
+        results.put((frames, busy))
+
+
+class Exporter:
+    """Pool of render/encode processes fed through a bounded queue."""
+
+    def __init__(self, world, out, fmt="png", frames=0, workers=None, queue_size=None, level=PNG_LEVEL):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown format '{fmt}', expected one of {FORMATS}")
+        self.size = (world.width, world.height)
+        self.frames = 0
+        workers = workers or os.cpu_count() or 1
+        if fmt == "png":
+            os.makedirs(out, exist_ok=True)
+        else:
+            # Sized up front so every worker can write its frames in place
+            with open(out, "wb") as f:
+                f.truncate(frames * self.size[0] * self.size[1] * 3)
+        ctx = multiprocessing.get_context("spawn")
+        self.tasks = ctx.Queue(maxsize=queue_size or 2 * workers)
+        self.results = ctx.Queue()
+        hexes = [(hx.R, hx.omega, hx.missing) for hx in world.hexes]
+        self.procs = [
+            ctx.Process(target=_worker, daemon=True, args=(self.tasks, self.results, fmt, out, hexes, self.size, level))
+            for _ in range(workers)
+        ]
+        for proc in self.procs:
+            proc.start()
+
+    def _put(self, item):
+        while True:
+            try:
+                self.tasks.put(item, timeout=1.0)
+                return
+            except queue.Full:
+                if not all(proc.is_alive() for proc in self.procs):
+                    raise RuntimeError("an export worker died; its error was printed above") from None
+
+    def capture(self, world):
+        """Queue the world's current state as the next frame (blocks while the queue is full)."""
+        self._put(snapshot(world, self.frames))
+        self.frames += 1
+
+    def close(self):
+        """Wait for every queued frame; return the frames drawn and seconds busy, summed over workers."""
+        for _ in self.procs:
+            self._put(None)
+        done, busy = 0, 0.0
+        for _ in self.procs:
+            frames, seconds = self.results.get()
+            done += frames
+            busy += seconds
+        for proc in self.procs:
+            proc.join()
+        return done, busy
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a scripted run as a PNG sequence or raw rgb24 video")
+    parser.add_argument("out", help="Output directory (png) or file (raw)")
+    parser.add_argument("--format", choices=FORMATS, default="png")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Clip length in simulated seconds")
+    parser.add_argument("--fps", type=int, default=sim.FPS, help=f"Exported frames per second (divides {sim.FPS})")
+    parser.add_argument("--spawn-every", type=int, default=12, help="Steps between scripted clicks")
+    parser.add_argument("--spawn-total", type=int, default=300, help="Number of scripted clicks")
+    parser.add_argument("--schedule", type=str, help="JSON file with spawn steps (overrides --spawn-*)")
+    parser.add_argument("--workers", type=int, default=None, help="Render processes (default: one per CPU)")
+    parser.add_argument("--queue", type=int, default=None, help="Snapshots in flight (default: 2 per worker)")
+    parser.add_argument("--png-level", type=int, default=PNG_LEVEL, choices=range(10), metavar="0-9",
+                        help="zlib level of the PNG frames")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    every = round(1.0 / (args.fps * STEP_DT))
+    if every < 1 or abs(every * args.fps * STEP_DT - 1.0) > 1e-9:
+        parser.error(f"--fps must divide the simulation rate of {sim.FPS}")
+    steps = round(args.seconds / STEP_DT)
+    if args.schedule:
+        schedule = load_schedule(args.schedule)
+    else:
+        schedule = spawn_schedule(args.spawn_every, args.spawn_total)
+
+    world = World(seed=args.seed)
+    frames = -(-steps // every)
+    start = time.perf_counter()
+    exporter = Exporter(world, args.out, args.format, frames, args.workers, args.queue, args.png_level)
+
+    def on_step(world):
+        if (world.steps - 1) % every == 0:
+            exporter.capture(world)
+
+    run_schedule(world, steps, schedule, on_step=on_step)
+    done, busy = exporter.close()
+    elapsed = time.perf_counter() - start
+
+    clip = frames / args.fps
+    print(f"Exported {done} frames ({clip:.1f}s at {args.fps} FPS, up to {len(world.balls)} balls) "
+          f"to {args.out} with {len(exporter.procs)} workers")
+    print(f"Wall time {elapsed:.1f}s, {clip / elapsed:.2f}x real time; "
+          f"render+encode {1000.0 * busy / max(done, 1):.1f} ms/frame per worker")
+    if args.format == "raw":
+        w, h = exporter.size
+        print(f"Encode: ffmpeg -f rawvideo -pix_fmt rgb24 -s {w}x{h} -r {args.fps} -i {args.out} out.mp4")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Headless batch runs of the gpt-5 engine with throughput reporting.
+
+No window is opened and no frame pacing applies: the scripted spawn schedule
+is replayed and the physics runs as fast as it can. The report gives
+steps/sec, ball-steps/sec and the time spent in each substep phase.
+
+    python -m ballsim.headless --steps 2000 --spawn-every 5 --spawn-total 300
+    python -m ballsim.headless --steps 2000 --schedule spawns.json
+"""
+import argparse
+import json
+import time
+
+from .world import PHASES, STEP_DT, World
+
+
+def spawn_schedule(every, total, start=0):
+    """Steps at which balls are released: one every ``every`` steps, ``total`` in all."""
+    return [start + i * every for i in range(total)]
+
+
+def load_schedule(path):
+    """Read a JSON spawn schedule: a list of step indices (repeats spawn several balls)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [int(s) for s in json.load(f)]
+
+
+def run_schedule(world, steps, schedule, step_dt=STEP_DT, on_step=None, spawn=None):
+    """Step ``world`` ``steps`` times, spawning a ball at each scheduled step.
+
+    ``spawn`` replaces ``world.spawn()`` (a click at the centre) as the
+    release at each scheduled step.
+    """
+    pending = sorted(schedule)
+    release = world.spawn if spawn is None else spawn
+    k = 0
+    for _ in range(steps):
+        while k < len(pending) and pending[k] <= world.steps:
+            release()
+            k += 1
+        world.step(step_dt)
+        if on_step is not None:
+            on_step(world)
+
+
+def report(world, elapsed):
+    """Format the throughput and per-phase breakdown of a finished run."""
+    phases = world.phase_time
+    total = sum(phases.values()) or 1.0
+    lines = [
+        f"Steps:        {world.steps} ({'adaptive' if world.adaptive else world.substeps} substeps each), "
+        f"{len(world.balls)} balls at the end",
+        f"Wall time:    {elapsed:.3f}s",
+        f"Steps/sec:    {world.steps / elapsed:,.1f}",
+        f"Ball-steps/s: {world.ball_steps / elapsed:,.1f}",
+    ]
+    if world.adaptive is not None:
+        lines.append(f"Substeps:     {world.adaptive.summary()}")
+    lines.append("Phases:")
+    for name in PHASES:
+        lines.append(f"  {name:<12}{phases[name]:>10.3f}s {100.0 * phases[name] / total:>6.1f}%")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the gpt-5 engine headlessly and report throughput")
+    parser.add_argument("--steps", type=int, default=2000, help="Physics steps to run")
+    parser.add_argument("--spawn-every", type=int, default=5, help="Steps between scripted clicks")
+    parser.add_argument("--spawn-total", type=int, default=200, help="Number of scripted clicks")
+    parser.add_argument("--schedule", type=str, help="JSON file with spawn steps (overrides --spawn-*)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--substeps", type=int, default=None)
+    parser.add_argument("--adaptive", action="store_true",
+                        help="Pick each frame's substeps from the fastest ball (up to --substeps, default 12)")
+    parser.add_argument("--contact-cache", action="store_true",
+                        help="Persistent warm-started contacts for the ball-ball and ball-wall phases")
+    parser.add_argument("--ccd", action="store_true", help="Use swept collision detection")
+    parser.add_argument("--broadphase", choices=["brute", "sap"], default="brute", help="Ball-ball pair search")
+    parser.add_argument("--contact-solver", choices=["sequential", "colored"], default="sequential",
+                        help="Ball-ball contact resolution")
+    parser.add_argument("--wall-collision", choices=["segments", "frame"], default="segments",
+                        help="Ball-wall collision in world space or each hexagon's rotating frame")
+    parser.add_argument("--backend", choices=["auto", "python", "numba"], default="auto",
+                        help="Compiled kernels (auto: when Numba is installed) or the reference path")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    if args.schedule:
+        schedule = load_schedule(args.schedule)
+    else:
+        schedule = spawn_schedule(args.spawn_every, args.spawn_total)
+
+    world = World(seed=args.seed, substeps=args.substeps, ccd=args.ccd, broadphase=args.broadphase,
+                  contact_solver=args.contact_solver, wall_collision=args.wall_collision,
+                  backend=args.backend)
+    if args.contact_cache:
+        from .contacts import ContactCache
+        ContactCache(world)
+    if args.adaptive:
+        from .adaptive import AdaptiveSubsteps
+        AdaptiveSubsteps(world, max_substeps=args.substeps or 12)
+    start = time.perf_counter()
+    run_schedule(world, args.steps, schedule)
+    elapsed = time.perf_counter() - start
+
+    if args.json:
+        print(json.dumps({
+            "steps": world.steps,
+            "balls": len(world.balls),
+            "seconds": elapsed,
+            "steps_per_sec": world.steps / elapsed,
+            "ball_steps_per_sec": world.ball_steps / elapsed,
+            "phases": world.phase_time,
+            **({"substeps": dict(world.adaptive.histogram)} if world.adaptive else {}),
+        }, indent=2))
+    else:
+        print(report(world, elapsed))
+
+
+if __name__ == "__main__":
+    main()
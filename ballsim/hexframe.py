@@ -0,0 +1,173 @@
+"""Ball-wall collision in each hexagon's rotating frame.
+
+gpt-5 rebuilds every hexagon's six vertices in world space each substep,
+then runs ``closest_point_on_segment`` and ``resolve_ball_segment`` for
+every ball against every present side, with a ``Vector2`` per intermediate.
+``frame`` walls work on floats in the hexagon's own frame instead:
+
+- a ball farther than ``R + r`` from the centre, or nearer than the apothem
+  minus ``r``, cannot touch the hexagon; that costs one squared distance,
+  and most balls stop there;
+- otherwise the ball's offset and velocity are rotated into the frame (one
+  cosine and sine per hexagon per substep). There side ``k`` is fixed: it
+  spans polar angles ``[k, k + 1] * 60°`` with precomputed outward normal
+  ``NORMALS[k]``, so the ball's sector picks its side and the two
+  neighbours (corner contacts); the missing side is skipped by index;
+- the wall's velocity at the contact point is ``ω × q`` in the frame too,
+  so the response is gpt-5's reflection of the relative normal velocity
+  plus the same 0.2 px push, rotated back only when something changed.
+
+Sides are visited own side first, then neighbours, rather than gpt-5's
+fixed 0..5 order, so trajectories are not bit-identical to ``segments``
+(gpt-5's loop), only equivalent.
+
+The benchmark reports the share of balls inside the outer shell, averaged
+over the run. With a click every 3 steps gpt-5's pair response pumps
+energy until most balls escape and stop at the radial reject, so the
+``--kept`` rows, released slowly enough that nearly all stay inside, give
+the speed-up for balls in the shell.
+
+    python -m ballsim.hexframe --balls 100 300 --kept 10 20
+"""
+import argparse
+import math
+
+from .headless import run_schedule, spawn_schedule
+
+SECTOR = math.pi / 3.0
+COS30 = math.cos(math.pi / 6.0)
+# Outward normal of side k, from vertex k to vertex k + 1, in the hexagon's frame
+NORMALS = [(math.cos((k + 0.5) * SECTOR), math.sin((k + 0.5) * SECTOR)) for k in range(6)]
+# Slop added to the push-out, as in resolve_ball_segment
+PUSH_SLOP = 0.2
+
+
+class SegmentWalls:
+    """gpt-5's world-space loop: every ball against every present side."""
+
+    name = "segments"
+
+    def collide(self, balls, hexes, center):
+        from .world import sim
+
+        closest = sim.closest_point_on_segment
+        resolve = sim.resolve_ball_segment
+        for b in balls:
+            for hx in hexes:
+                for p1, p2 in hx.sides():
+                    cp = closest(p1, p2, b.pos)
+                    resolve(b, p1, p2, hx.point_velocity(cp))
+
+
+class FrameWalls:
+    """Per-hexagon rotating-frame test with fixed sides and an early radial reject."""
+
+    name = "frame"
+
+    def collide(self, balls, hexes, center):
+        cx, cy = center.x, center.y
+        shells = [
+            (hx.R * COS30, hx.R, 0.5 * hx.R, math.cos(hx.angle), math.sin(hx.angle), hx.omega, hx.missing)
+            for hx in hexes
+        ]
+        normals = NORMALS
+        for b in balls:
+            pos, vel, r = b.pos, b.vel, b.r
+            r2 = r * r
+            for apothem, R, half, c, s, w, missing in shells:
+                dx = pos.x - cx
+                dy = pos.y - cy
+                d2 = dx * dx + dy * dy
+                inner = apothem - r
+                outer = R + r
+                if d2 > outer * outer or (inner > 0.0 and d2 < inner * inner):
+                    continue
+
+                lx = c * dx + s * dy
+                ly = c * dy - s * dx
+                k = int(math.atan2(ly, lx) // SECTOR) % 6
+                vx = c * vel.x + s * vel.y
+                vy = c * vel.y - s * vel.x
+                hit = False
+                for side in (k, (k + 1) % 6, (k + 5) % 6):
+                    if side == missing:
+                        continue
+                    nx, ny = normals[side]
+                    # Closest point of the side: apothem along n, clamped offset along the tangent (-ny, nx)
+                    t = ny * -lx + nx * ly
+                    t = -half if t < -half else half if t > half else t
+                    qx = apothem * nx - t * ny
+                    qy = apothem * ny + t * nx
+                    ex = lx - qx
+                    ey = ly - qy
+                    e2 = ex * ex + ey * ey
+                    if e2 > r2:
+                        continue
+                    if e2 > 1e-12:
+                        dist = math.sqrt(e2)
+                        mx, my = ex / dist, ey / dist
+                    else:
+                        # Centre on the side: gpt-5's degenerate normal, (-seg.y, seg.x), points inwards
+                        dist = 0.0
+                        mx, my = -nx, -ny
+                    vn = (vx + w * qy) * mx + (vy - w * qx) * my
+                    if vn < 0.0:
+                        vx -= 2.0 * vn * mx
+                        vy -= 2.0 * vn * my
+                    push = r - dist + PUSH_SLOP
+                    lx += push * mx
+                    ly += push * my
+                    hit = True
+                if hit:
+                    pos.x = cx + c * lx - s * ly
+                    pos.y = cy + s * lx + c * ly
+                    vel.x = c * vx - s * vy
+                    vel.y = s * vx + c * vy
+
+
+WALLS = {cls.name: cls for cls in (SegmentWalls, FrameWalls)}
+
+
+def make_walls(name):
+    """Ball-wall collision for a setting name (``segments`` or ``frame``)."""
+    try:
+        return WALLS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown wall collision '{name}', expected one of {sorted(WALLS)}") from None
+
+
+def main():
+    from .world import World
+
+    parser = argparse.ArgumentParser(description="Compare world-space segment and rotating-frame wall collision")
+    parser.add_argument("--balls", type=int, nargs="+", default=[100, 300], help="Balls released, one every 3 steps")
+    parser.add_argument("--kept", type=int, nargs="*", default=[10, 20],
+                        help="Balls released one every --kept-every steps, so most stay inside")
+    parser.add_argument("--kept-every", type=int, default=60, help="Steps between releases for --kept")
+    parser.add_argument("--steps", type=int, default=600, help="Timed steps after the last release")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    cases = [(count, 3) for count in args.balls] + [(count, args.kept_every) for count in args.kept]
+    print(f"{'balls':>6}{'every':>7}{'walls':>10}{'wall us/ball':>14}{'speed-up':>10}{'inside':>8}")
+    for count, every in cases:
+        schedule = spawn_schedule(every, count)
+        base = None
+        for name in WALLS:
+            world = World(seed=args.seed, wall_collision=name, backend="python")
+            shell = world.hexes[-1].R
+            inside = [0, 0]
+
+            def tally(w):
+                inside[0] += sum(1 for b in w.balls if (b.pos - w.center).length() < shell)
+                inside[1] += len(w.balls)
+
+            run_schedule(world, every * count + args.steps, schedule, on_step=tally)
+            per_ball = world.phase_time["ball_wall"] / (world.ball_steps * world.substeps)
+            base = base or per_ball
+            share = 100.0 * inside[0] / max(inside[1], 1)
+            print(f"{count:>6}{every:>7}{name:>10}{1e6 * per_ball:>14.2f}{base / per_ball:>9.1f}x{share:>7.0f}%")
+
+
+if __name__ == "__main__":
+    main()
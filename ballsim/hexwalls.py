@@ -0,0 +1,101 @@
+"""Persistent kinematic hexagons against per-step segment rebuilds in pymunk.
+
+``openrouter-horizon-alpha.py`` used to delete every wall segment and body
+and create new ones at the rotated positions before each ``space.step``.
+It now builds one kinematic body per hexagon once, with ``angular_velocity``
+set, and lets pymunk rotate it. :class:`RebuiltHexWalls` keeps the old
+scheme for comparison (adding each hexagon's body once per rebuild; the
+original added it once per segment, which pymunk 7 rejects).
+
+Both runs release balls at the centre the submission's way, one per frame,
+then time frames of two 1/120 s steps.
+
+    python -m ballsim.hexwalls --balls 500 1000
+"""
+import argparse
+import time
+
+import pymunk
+
+from .adapters import HorizonAlpha
+
+
+class RebuiltHexWalls:
+    """The old walls: fresh static-velocity segments at the current angle every step."""
+
+    def __init__(self, space, m):
+        self.space = space
+        self.m = m
+        self.rot_angles = [0.0 for _ in m.HEX_RADII]
+        self.bodies = []
+        self.rebuild_segments()
+
+    def update(self, dt):
+        for i, omega in enumerate(self.m.OMEGAS):
+            self.rot_angles[i] += omega * dt
+        self.rebuild_segments()
+
+    def rebuild_segments(self):
+        m = self.m
+        for body in self.bodies:
+            self.space.remove(body, *body.shapes)
+        self.bodies = []
+        for R, rot in zip(m.HEX_RADII, self.rot_angles):
+            verts = m.hex_vertices(m.CENTER, R, rot)
+            body = pymunk.Body(body_type=pymunk.Body.KINEMATIC)
+            segs = []
+            for e in range(6):
+                if e == m.MISSING_EDGE_INDEX:
+                    continue
+                seg = pymunk.Segment(body, verts[e], verts[(e + 1) % 6], 0.0)
+                seg.elasticity = m.WALL_ELASTICITY
+                seg.friction = m.WALL_FRICTION
+                segs.append(seg)
+            self.space.add(body, *segs)
+            self.bodies.append(body)
+
+
+class RebuiltHorizonAlpha(HorizonAlpha):
+    """horizon-alpha's adapter with the walls swapped for the per-step rebuild."""
+
+    def __init__(self, seed=0):
+        super().__init__(seed)
+        for body in self.walls.bodies:
+            self.space.remove(body, *body.shapes)
+        self.walls = RebuiltHexWalls(self.space, self.m)
+
+    def step(self):
+        for _ in range(self.per_frame):
+            self.walls.update(self.step_dt)
+            self.space.step(self.step_dt)
+
+
+def run_case(cls, balls, frames, seed):
+    adapter = cls(seed)
+    while adapter.ball_count < balls:
+        adapter.spawn()
+        adapter.step()
+    start = time.perf_counter()
+    for _ in range(frames):
+        adapter.step()
+    return (time.perf_counter() - start) / frames, adapter.lost()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare persistent kinematic hexagons with per-step segment rebuilds")
+    parser.add_argument("--balls", type=int, nargs="+", default=[500, 1000], help="Ball counts to measure")
+    parser.add_argument("--frames", type=int, default=120, help="Timed 1/60 s frames per case")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'balls':>6}{'walls':>12}{'ms/frame':>10}{'speed-up':>10}{'lost':>6}")
+    for count in args.balls:
+        base = None
+        for label, cls in (("rebuilt", RebuiltHorizonAlpha), ("persistent", HorizonAlpha)):
+            per_frame, lost = run_case(cls, count, args.frames, args.seed)
+            base = base or per_frame
+            print(f"{count:>6}{label:>12}{1000.0 * per_frame:>10.2f}{base / per_frame:>9.1f}x{lost:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,368 @@
+"""Flat-array substep kernels, compiled with Numba when it is installed.
+
+The kernels replay gpt-5's substep (hexagon rotation, gravity and
+integration, the O(n^2) ``resolve_ball_ball`` loop, ``resolve_ball_segment``
+against every side, screen clamp) over float64 arrays instead of ``Ball``
+and ``Vector2`` objects. Every arithmetic step follows the submission's
+operation order (pygame divides a vector by a scalar as a multiply by the
+reciprocal), so results match the reference path bit for bit; see
+``python -m ballsim.parity``. That includes gpt-5's behaviour as is, such as
+its pair response acting on separating pairs.
+
+With Numba the kernels are compiled on first use and cached on disk
+(``cache=True`` writes next to this file), so later launches skip the
+compile. Without Numba, ``World(backend="auto")`` keeps the reference
+path, and the kernels only run uncompiled for the parity check.
+
+    python -m ballsim.kernels --balls 200
+"""
+import argparse
+import itertools
+import math
+import time
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+BACKENDS = ("auto", "python", "numba")
+
+
+def _jit(fn):
+    return numba.njit(cache=True)(fn) if numba is not None else fn
+
+
+def closest_point(ax, ay, bx, by, px, py):
+    """gpt-5's ``closest_point_on_segment`` on scalars."""
+    abx = bx - ax
+    aby = by - ay
+    ab_len2 = abx * abx + aby * aby
+    if ab_len2 == 0:
+        return ax, ay
+    t = ((px - ax) * abx + (py - ay) * aby) / ab_len2
+    t = max(0.0, min(1.0, t))
+    return ax + t * abx, ay + t * aby
+
+
+def ball_ball(pos, vel, radius, i, j):
+    """gpt-5's ``resolve_ball_ball`` for balls ``i`` and ``j``."""
+    dx = pos[j, 0] - pos[i, 0]
+    dy = pos[j, 1] - pos[i, 1]
+    dist2 = dx * dx + dy * dy
+    r_sum = radius[i] + radius[j]
+    if dist2 == 0:
+        nx, ny = 1.0, 0.0
+        dist = 0.0
+    else:
+        dist = math.sqrt(dist2)
+        if dist >= r_sum:
+            return
+        inv = 1.0 / dist
+        nx, ny = dx * inv, dy * inv
+
+    rel_n = (vel[i, 0] - vel[j, 0]) * nx + (vel[i, 1] - vel[j, 1]) * ny
+    if not rel_n > 0:
+        jn = -rel_n
+        vel[i, 0] += -jn * nx
+        vel[i, 1] += -jn * ny
+        vel[j, 0] += jn * nx
+        vel[j, 1] += jn * ny
+
+    overlap = r_sum - dist if dist != 0 else r_sum
+    correction = 0.5 * overlap + 0.1
+    pos[i, 0] -= correction * nx
+    pos[i, 1] -= correction * ny
+    pos[j, 0] += correction * nx
+    pos[j, 1] += correction * ny
+
+
+def ball_segment(pos, vel, radius, i, p1x, p1y, p2x, p2y, ux, uy):
+    """gpt-5's ``resolve_ball_segment`` for ball ``i`` and a wall moving at (ux, uy)."""
+    px, py = pos[i, 0], pos[i, 1]
+    cx, cy = closest_point(p1x, p1y, p2x, p2y, px, py)
+    dx = px - cx
+    dy = py - cy
+    dist2 = dx * dx + dy * dy
+    r = radius[i]
+    if dist2 > r * r:
+        return
+
+    if dist2 > 1e-12:
+        inv = 1.0 / math.sqrt(dist2)
+        nx, ny = dx * inv, dy * inv
+    else:
+        sx = p2x - p1x
+        sy = p2y - p1y
+        if sx * sx + sy * sy == 0:
+            nx, ny = 0.0, -1.0
+        else:
+            length = math.sqrt(sy * sy + sx * sx)
+            nx, ny = -sy / length, sx / length
+            if dx * nx + dy * ny < 0:
+                nx, ny = -nx, -ny
+
+    vn = (vel[i, 0] - ux) * nx + (vel[i, 1] - uy) * ny
+    if vn < 0:
+        k = 2.0 * vn
+        vel[i, 0] = vel[i, 0] - k * nx
+        vel[i, 1] = vel[i, 1] - k * ny
+
+    penetration = r - math.sqrt(dist2) if dist2 > 1e-12 else r
+    push = penetration + 0.2
+    pos[i, 0] += push * nx
+    pos[i, 1] += push * ny
+
+
+def integrate(pos, vel, angle, omega, gravity, dt):
+    """Hexagon rotation, gravity and position update."""
+    for k in range(angle.shape[0]):
+        angle[k] += omega[k] * dt
+    g = gravity * dt
+    for i in range(pos.shape[0]):
+        vel[i, 1] += g
+        pos[i, 0] += vel[i, 0] * dt
+        pos[i, 1] += vel[i, 1] * dt
+
+
+def collide_balls(pos, vel, radius):
+    """All pairs in list order, like gpt-5's main loop."""
+    n = pos.shape[0]
+    for i in range(n):
+        for j in range(i + 1, n):
+            ball_ball(pos, vel, radius, i, j)
+
+
+def collide_walls(pos, vel, radius, hex_r, omega, angle, missing, cx, cy):
+    """Every ball against every present side of every hexagon."""
+    nh = hex_r.shape[0]
+    verts = np.empty((nh, 6, 2))
+    for k in range(nh):
+        for s in range(6):
+            theta = angle[k] + s * math.tau / 6.0
+            verts[k, s, 0] = cx + math.cos(theta) * hex_r[k]
+            verts[k, s, 1] = cy + math.sin(theta) * hex_r[k]
+
+    for i in range(pos.shape[0]):
+        for k in range(nh):
+            w = omega[k]
+            for s in range(6):
+                if s == missing[k]:
+                    continue
+                e = (s + 1) % 6
+                p1x, p1y = verts[k, s, 0], verts[k, s, 1]
+                p2x, p2y = verts[k, e, 0], verts[k, e, 1]
+                qx, qy = closest_point(p1x, p1y, p2x, p2y, pos[i, 0], pos[i, 1])
+                ball_segment(pos, vel, radius, i, p1x, p1y, p2x, p2y, -w * (qy - cy), w * (qx - cx))
+
+
+def clamp(pos, vel, lo, hi_x, hi_y):
+    """gpt-5's soft screen-edge clamp."""
+    for i in range(pos.shape[0]):
+        if pos[i, 0] < lo:
+            pos[i, 0] = lo
+            vel[i, 0] = abs(vel[i, 0])
+        elif pos[i, 0] > hi_x:
+            pos[i, 0] = hi_x
+            vel[i, 0] = -abs(vel[i, 0])
+        if pos[i, 1] < lo:
+            pos[i, 1] = lo
+            vel[i, 1] = abs(vel[i, 1])
+        elif pos[i, 1] > hi_y:
+            pos[i, 1] = hi_y
+            vel[i, 1] = -abs(vel[i, 1])
+
+
+def energy_sums(pos, vel):
+    """(sum of squared speeds, sum of y, momentum x, momentum y), for the energy monitor."""
+    v2 = ys = mx = my = 0.0
+    for i in range(pos.shape[0]):
+        vx, vy = vel[i, 0], vel[i, 1]
+        v2 += vx * vx + vy * vy
+        ys += pos[i, 1]
+        mx += vx
+        my += vy
+    return v2, ys, mx, my
+
+
+def fastest_reaching(pos, vel, radius, cx, cy, shell, dt):
+    """(largest squared speed, smallest radius) of the balls that can reach
+    the circle of radius ``shell`` within ``dt``, for adaptive substepping."""
+    v2max = 0.0
+    r_min = math.inf
+    for i in range(pos.shape[0]):
+        vx, vy = vel[i, 0], vel[i, 1]
+        s2 = vx * vx + vy * vy
+        dx, dy = pos[i, 0] - cx, pos[i, 1] - cy
+        if math.sqrt(dx * dx + dy * dy) - math.sqrt(s2) * dt > shell + radius[i]:
+            continue
+        if s2 > v2max:
+            v2max = s2
+        if radius[i] < r_min:
+            r_min = radius[i]
+    return v2max, r_min
+
+
+# Compiled variants; the helpers are compiled first so the phases can call them
+if numba is not None:
+    closest_point = _jit(closest_point)
+    ball_ball = _jit(ball_ball)
+    ball_segment = _jit(ball_segment)
+    fastest_reaching = _jit(fastest_reaching)
+    _compiled = tuple(_jit(fn) for fn in (integrate, collide_balls, collide_walls, clamp, energy_sums))
+else:
+    _compiled = None
+_python = (integrate, collide_balls, collide_walls, clamp, energy_sums)
+
+
+class KernelStepper:
+    """Runs a :class:`World`'s substeps through the array kernels.
+
+    Ball and hexagon state is gathered into arrays once per step and written
+    back afterwards; phase times still accumulate in ``world.phase_time``.
+    An attached energy monitor is fed from the arrays after every phase, by
+    a compiled reduction, so monitoring does not leave the kernel path.
+    The arrays of the last step are kept for :meth:`fastest`, which
+    adaptive substepping reads instead of walking the balls.
+    Without Numba the same kernels run as plain Python (for parity checks;
+    they are slower than the reference path).
+    """
+
+    def __init__(self):
+        self.compiled = _compiled is not None
+        self.phases = _compiled or _python
+        self._last = None
+
+    def fastest(self, world, shell, dt):
+        """:func:`fastest_reaching` over the last step's arrays, plus how many balls they cover.
+
+        None when they are stale: another step ran since, or balls were
+        removed or reordered (spawns only append, and the caller scans those).
+        """
+        if self._last is None:
+            return None
+        steps, roster, tail, pos, vel, radius = self._last
+        balls = world.balls
+        n = len(pos)
+        if steps != world.steps or roster != world.roster_version or len(balls) < n or (n and balls[n - 1] is not tail):
+            return None
+        cx, cy = float(world.center.x), float(world.center.y)
+        v2, r_min = fastest_reaching(pos, vel, radius, cx, cy, float(shell), float(dt))
+        return v2, r_min, n
+
+    def run(self, world, dt, substeps):
+        from .world import MARGIN
+
+        balls = world.balls
+        hexes = world.hexes
+        n = len(balls)
+        state = np.fromiter(
+            itertools.chain.from_iterable((b.pos.x, b.pos.y, b.vel.x, b.vel.y) for b in balls),
+            dtype=np.float64, count=4 * n,
+        ).reshape(n, 4)
+        pos = np.ascontiguousarray(state[:, :2])
+        vel = np.ascontiguousarray(state[:, 2:])
+        radius = np.fromiter((b.r for b in balls), dtype=np.float64, count=n)
+        hex_r = np.array([hx.R for hx in hexes], dtype=np.float64)
+        omega = np.array([hx.omega for hx in hexes], dtype=np.float64)
+        angle = np.array([hx.angle for hx in hexes], dtype=np.float64)
+        missing = np.array([hx.missing for hx in hexes], dtype=np.int64)
+        cx, cy = float(world.center.x), float(world.center.y)
+        lo, hi_x, hi_y = float(MARGIN), float(world.width - MARGIN), float(world.height - MARGIN)
+        gravity = float(world.gravity)
+
+        integrate_k, balls_k, walls_k, clamp_k, sums_k = self.phases
+        phase = world.phase_time
+        clock = time.perf_counter
+        mon = world.monitor if world.monitor is not None and world.monitor.due() else None
+        if mon is not None:
+            mon.begin(mon.measure_arrays(pos, vel, sums_k))
+        for _ in range(substeps):
+            t0 = clock()
+            integrate_k(pos, vel, angle, omega, gravity, dt)
+            t1 = clock()
+            if mon is not None:
+                mon.mark("integration", mon.measure_arrays(pos, vel, sums_k))
+                t1 = clock()
+            balls_k(pos, vel, radius)
+            t2 = clock()
+            if mon is not None:
+                mon.mark("ball_ball", mon.measure_arrays(pos, vel, sums_k))
+                t2 = clock()
+            walls_k(pos, vel, radius, hex_r, omega, angle, missing, cx, cy)
+            t3 = clock()
+            if mon is not None:
+                mon.mark("ball_wall", mon.measure_arrays(pos, vel, sums_k))
+                t3 = clock()
+            clamp_k(pos, vel, lo, hi_x, hi_y)
+            t4 = clock()
+            if mon is not None:
+                mon.mark("clamp", mon.measure_arrays(pos, vel, sums_k))
+                t4 = clock()
+            phase["integration"] += t1 - t0
+            phase["ball_ball"] += t2 - t1
+            phase["ball_wall"] += t3 - t2
+            phase["clamp"] += t4 - t3
+
+        for b, (x, y), (vx, vy) in zip(balls, pos.tolist(), vel.tolist()):
+            b.pos.update(x, y)
+            b.vel.update(vx, vy)
+        for hx, a in zip(hexes, angle.tolist()):
+            hx.angle = a
+        # World.step counts this step once the kernel returns
+        self._last = (world.steps + 1, world.roster_version, balls[-1] if n else None, pos, vel, radius)
+
+
+def make_kernel(backend, compatible=True):
+    """Kernel stepper for a ``World`` backend setting, or None for the reference path.
+
+    ``compatible`` is False when the world uses features the kernels do not
+    implement (swept collisions, another broadphase, contact solver or wall
+    collision).
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}', expected one of {list(BACKENDS)}")
+    if backend == "python":
+        return None
+    if backend == "numba":
+        if _compiled is None:
+            raise ValueError("backend='numba' needs Numba installed")
+        if not compatible:
+            raise ValueError("backend='numba' only supports the default brute/sequential/segments, non-CCD world")
+        return KernelStepper()
+    return KernelStepper() if _compiled is not None and compatible else None
+
+
+def main():
+    from .headless import run_schedule, spawn_schedule
+    from .world import World
+
+    parser = argparse.ArgumentParser(description="Compare the reference substep with the compiled kernels")
+    parser.add_argument("--balls", type=int, default=200, help="Balls released during the warm-up")
+    parser.add_argument("--steps", type=int, default=200, help="Timed physics steps")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if _compiled is None:
+        print("Numba is not installed; only the reference backend is available")
+        return
+
+    schedule = spawn_schedule(2, args.balls)
+    warmup = 2 * args.balls
+    timings = {}
+    for backend in ("python", "numba"):
+        world = World(seed=args.seed, backend=backend)
+        start = time.perf_counter()
+        run_schedule(world, warmup, schedule)
+        first = time.perf_counter() - start
+        start = time.perf_counter()
+        run_schedule(world, args.steps, ())
+        timings[backend] = (time.perf_counter() - start) / args.steps
+        print(f"{backend:<8}{1000.0 * timings[backend]:>10.3f} ms/step  ({len(world.balls)} balls, warm-up {first:.2f}s)")
+    print(f"Speed-up: {timings['python'] / timings['numba']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""Ball lifecycle: retire escaped balls, pool them for reuse, cap the count.
+
+In gpt-5 a ball that falls out through the missing sides of every hexagon
+lands on the screen-margin clamp and bounces there forever, still paying
+for integration, pair and wall work. A :class:`Lifecycle` attached to a
+:class:`World` checks every ``check_every`` steps for balls that have left
+for good: balls outside the outer hexagon's circumscribed circle (plus
+their radius), where no wall reaches them, at ``frames`` consecutive checks
+(one second by default). An energy test (apex below the shell) would be
+stricter, but gpt-5's pair response pumps energy into the balls piled in
+the screen corners, which end up at 1e5 px/s or more, pinned to the clamp.
+
+Retired balls leave ``world.balls`` (the order of the others is kept) and go
+to a free list; ``World.spawn`` takes a pooled ball and resets it instead
+of building a new ``Ball`` and its two ``Vector2``. With ``cap`` set, a
+spawn at the cap first evicts the least recently used ball: the one that
+has been slow (below ``ACTIVE_SPEED``) the longest, oldest first. Every
+removal bumps ``world.roster_version``, which tells the renderers to
+rebuild their per-ball caches.
+
+    python -m ballsim.lifecycle --steps 12000 --spawn-every 4 --cap 300
+"""
+import argparse
+import resource
+import sys
+import time
+
+from .headless import run_schedule, spawn_schedule
+from .world import World, sim
+
+ESCAPE_CHECKS = 12    # consecutive checks outside the shell before a ball is retired
+ACTIVE_SPEED = 15.0   # px/s; slower balls count as unused for eviction
+
+
+class Lifecycle:
+    """Retires escaped balls to a pool and enforces an optional ball cap."""
+
+    def __init__(self, world, cap=None, frames=ESCAPE_CHECKS, check_every=10, active_speed=ACTIVE_SPEED):
+        if world.sleep is not None:
+            raise ValueError("Lifecycle and SleepSystem cannot be combined")
+        if cap is not None and cap < 1:
+            raise ValueError(f"cap must be at least 1, got {cap}")
+        self.world = world
+        self.cap = cap
+        self.frames = frames
+        self.check_every = check_every
+        self.active_speed = active_speed
+        self.pool = []
+        # Per live ball: step it was last moving, step it was spawned, escaped checks in a row
+        self.last_used = {}
+        self.born = {}
+        self.escaping = {}
+        self.retired = 0
+        self.evicted = 0
+        self.reused = 0
+        for ball in world.balls:
+            self.last_used[ball] = self.born[ball] = world.steps
+        world.lifecycle = self
+
+    def acquire(self, pos, vel, radius, color):
+        """A ball for ``World.spawn``: from the pool when possible, after evicting at the cap."""
+        world = self.world
+        if self.cap is not None and len(world.balls) >= self.cap:
+            self.evict(len(world.balls) - self.cap + 1)
+        if self.pool:
+            ball = self.pool.pop()
+            ball.pos.update(pos)
+            ball.vel.update(vel)
+            ball.r = float(radius)
+            ball.color = color
+            self.reused += 1
+        else:
+            ball = sim.Ball(pos, vel, radius, color)
+        self.last_used[ball] = self.born[ball] = world.steps
+        return ball
+
+    def evict(self, count):
+        """Remove the ``count`` least recently used balls."""
+        last_used, born = self.last_used, self.born
+        victims = sorted(self.world.balls, key=lambda b: (last_used[b], born[b]))[:count]
+        self._remove(set(victims))
+        self.evicted += len(victims)
+
+    def update(self):
+        """Called by ``World.step``: refresh recency and retire escaped balls."""
+        world = self.world
+        if world.steps % self.check_every:
+            return
+        step = world.steps
+        cx, cy = world.center.x, world.center.y
+        shell = max((hx.R for hx in world.hexes), default=0.0)
+        active2 = self.active_speed * self.active_speed
+        last_used, escaping = self.last_used, self.escaping
+        gone = set()
+        for b in world.balls:
+            x, y = b.pos.x, b.pos.y
+            vx, vy = b.vel.x, b.vel.y
+            if vx * vx + vy * vy > active2:
+                last_used[b] = step
+            reach = shell + b.r
+            if (x - cx) ** 2 + (y - cy) ** 2 > reach * reach:
+                count = escaping.get(b, 0) + 1
+                if count >= self.frames:
+                    gone.add(b)
+                else:
+                    escaping[b] = count
+            elif b in escaping:
+                del escaping[b]
+        if gone:
+            self._remove(gone)
+            self.retired += len(gone)
+
+    def _remove(self, gone):
+        world = self.world
+        world.balls = [b for b in world.balls if b not in gone]
+        world.roster_version += 1
+        for b in gone:
+            del self.last_used[b], self.born[b]
+            self.escaping.pop(b, None)
+        self.pool.extend(gone)
+
+
+def _rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sustained clicking with and without ball lifecycle management")
+    parser.add_argument("--steps", type=int, default=12000, help="Physics steps to run")
+    parser.add_argument("--spawn-every", type=int, default=4, help="Steps between scripted clicks")
+    parser.add_argument("--cap", type=int, default=300, help="Ball cap with lifecycle management")
+    parser.add_argument("--report", type=int, default=2000, help="Steps per reported window")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    schedule = spawn_schedule(args.spawn_every, args.steps // args.spawn_every)
+    print(f"{'mode':<10}{'step':>7}{'balls':>7}{'ms/step':>9}{'retired':>9}{'evicted':>9}{'reused':>8}{'RSS MB':>8}")
+    for managed in (True, False):
+        world = World(seed=args.seed)
+        life = Lifecycle(world, cap=args.cap) if managed else None
+        label = "lifecycle" if managed else "plain"
+        done = 0
+        while done < args.steps:
+            window = min(args.report, args.steps - done)
+            start = time.perf_counter()
+            # Only the schedule entries inside this window, so earlier clicks are not replayed
+            run_schedule(world, window, [s for s in schedule if done <= s < done + window])
+            per_step = (time.perf_counter() - start) / window
+            done += window
+            counts = f"{life.retired:>9}{life.evicted:>9}{life.reused:>8}" if life else f"{'-':>9}{'-':>9}{'-':>8}"
+            print(f"{label:<10}{done:>7}{len(world.balls):>7}{1000.0 * per_step:>9.2f}{counts}{_rss_mb():>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Fixed-timestep driver that decouples physics from the render loop.
+
+Physics always advances in steps of ``step_dt`` no matter how long a frame
+took, so a run is fully determined by its seed and click schedule. Clicks are
+queued and applied at the start of the next physics step, and the step index
+is recorded so the same run can be replayed headlessly, bit for bit.
+
+    python -m ballsim.loop --steps 2400 --seed 7 --clicks 0 30 60 90
+"""
+import argparse
+import hashlib
+import struct
+import time
+
+from .headless import run_schedule
+from .lifecycle import Lifecycle
+from .world import STEP_DT, World
+
+# Spiral-of-death guard: physics steps allowed per rendered frame
+MAX_STEPS_PER_FRAME = 8
+
+
+class FixedStepLoop:
+    """Accumulator loop around a :class:`World` with render interpolation."""
+
+    def __init__(self, world, step_dt=STEP_DT, max_steps=MAX_STEPS_PER_FRAME):
+        self.world = world
+        self.step_dt = step_dt
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+        self.dropped = 0.0
+        self.clicks = []
+        self._queued = 0
+        self._prev_pos = []
+        self._prev_roster = world.roster_version
+        self._prev_angles = [hx.angle for hx in world.hexes]
+
+    def click(self):
+        """Queue a ball release for the next physics step."""
+        self._queued += 1
+
+    def step(self):
+        """Run exactly one physics step, applying queued clicks first."""
+        world = self.world
+        for _ in range(self._queued):
+            self.clicks.append(world.steps)
+            world.spawn()
+        self._queued = 0
+        self._prev_pos = [(b.pos.x, b.pos.y) for b in world.balls]
+        self._prev_roster = world.roster_version
+        self._prev_angles = [hx.angle for hx in world.hexes]
+        world.step(self.step_dt)
+
+    def advance(self, frame_dt):
+        """Consume ``frame_dt`` seconds of wall time; return the blend factor.
+
+        At most ``max_steps`` steps run per call; any backlog beyond that is
+        dropped (and added to ``dropped``) so a slow frame cannot snowball.
+        """
+        self.accumulator += frame_dt
+        steps = 0
+        while self.accumulator >= self.step_dt and steps < self.max_steps:
+            self.step()
+            self.accumulator -= self.step_dt
+            steps += 1
+        if self.accumulator >= self.step_dt:
+            backlog = self.accumulator - self.accumulator % self.step_dt
+            self.dropped += backlog
+            self.accumulator -= backlog
+        return self.accumulator / self.step_dt
+
+    def ball_positions(self, alpha):
+        """Ball centres blended between the last two physics states."""
+        # Balls removed during the step no longer line up with the saved ones
+        prev = self._prev_pos if self._prev_roster == self.world.roster_version else []
+        out = []
+        for i, b in enumerate(self.world.balls):
+            if i < len(prev):
+                px, py = prev[i]
+                out.append((px + (b.pos.x - px) * alpha, py + (b.pos.y - py) * alpha))
+            else:
+                out.append((b.pos.x, b.pos.y))
+        return out
+
+    def hex_angles(self, alpha):
+        """Hexagon angles blended between the last two physics states."""
+        return [a0 + (hx.angle - a0) * alpha for a0, hx in zip(self._prev_angles, self.world.hexes)]
+
+
+def run_headless(world, steps, clicks=(), step_dt=STEP_DT):
+    """Step ``world`` as fast as possible, releasing a ball at each click step.
+
+    Returns the hex digest of every state along the way.
+    """
+    digest = hashlib.sha256()
+    run_schedule(world, steps, clicks, step_dt, on_step=lambda w: digest.update(state_bytes(w)))
+    return digest.hexdigest()
+
+
+def state_bytes(world):
+    """Exact binary image of ball positions/velocities and hexagon angles."""
+    values = [hx.angle for hx in world.hexes]
+    for b in world.balls:
+        values.extend((b.pos.x, b.pos.y, b.vel.x, b.vel.y))
+    return struct.pack(f"<{len(values)}d", *values)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the fixed-timestep engine headlessly and print a trajectory digest")
+    parser.add_argument("--steps", type=int, default=2400, help="Physics steps to run")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for ball colours")
+    parser.add_argument("--clicks", type=int, nargs="*", default=[0, 30, 60, 90, 120], help="Steps at which a ball is released")
+    parser.add_argument("--substeps", type=int, default=None)
+    parser.add_argument("--ccd", action="store_true", help="Use swept collision detection")
+    parser.add_argument("--lifecycle", action="store_true", help="Retire escaped balls and reuse them for new clicks")
+    parser.add_argument("--cap", type=int, default=None, help="With --lifecycle, evict the least recently used ball above this count")
+    args = parser.parse_args()
+
+    world = World(seed=args.seed, substeps=args.substeps, ccd=args.ccd)
+    if args.lifecycle:
+        Lifecycle(world, cap=args.cap)
+    start = time.perf_counter()
+    digest = run_headless(world, args.steps, args.clicks)
+    elapsed = time.perf_counter() - start
+
+    sim_time = args.steps * STEP_DT
+    print(f"Simulated {sim_time:.2f}s in {elapsed:.2f}s ({sim_time / elapsed:.1f}x real time), {len(world.balls)} balls")
+    print(f"Trajectory digest: {digest}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,468 @@
+"""Domain-decomposed, multi-process engine for very large ball counts.
+
+The screen is split into angular sectors around ``CENTER``, one per worker
+process, each holding the same number of balls (the sector boundaries are
+re-balanced every step from the ball angles). Ball state lives in one
+shared-memory block, double-buffered. Every phase reads one buffer, writes
+its own balls into the other and ends at a barrier:
+
+1. each worker integrates the balls in its sector (gravity, motion);
+2. ``ITERATIONS`` times, each worker finds the contacts of its balls,
+   reading the *halo* (balls of other sectors near its wedge) without
+   writing it, and applies them; the last pass also applies its balls'
+   wall collisions and the screen clamp.
+
+Contacts use the coloured solver's conventional response (equal-mass
+impulse, inelastic below ``RESTING_SPEED``, overlap projection), evaluated
+Jacobi-style from the frozen buffer: a contact across a sector boundary is
+computed by both owners from the same inputs in the same (lower index,
+higher index) orientation, so each side applies exactly the opposite of the
+other. Per ball, contributions are summed in partner order. The merge is
+therefore deterministic, and the state after any step is bit-identical
+whatever the number of workers; the benchmark checks that. This is not
+gpt-5's sequential ``resolve_ball_ball``, which is order dependent and
+cannot be split.
+
+    python -m ballsim.parallel --balls 20000 50000 100000 --workers 1 2 4 8
+"""
+import argparse
+import hashlib
+import math
+import multiprocessing
+import os
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .solver import BETA, RESTING_SPEED, SLOP
+from .world import MARGIN, World, sim
+
+# Wall push-out beyond the contact point, as in gpt-5's resolve_ball_segment
+WALL_PUSH = 0.2
+
+# Jacobi contact passes per substep
+ITERATIONS = 3
+
+
+class Layout:
+    """Offsets of the arrays packed into the shared-memory block."""
+
+    def __init__(self, n, workers, n_hex):
+        self.n, self.workers, self.n_hex = n, workers, n_hex
+        self.shapes = {
+            "state": (2, n, 4),          # two buffers of x, y, vx, vy
+            "radius": (n,),
+            "bounds": (workers + 1,),    # sector boundaries (angles)
+            "angle": (n_hex,),           # hexagon angles at the start of the step
+            # Per buffer: each ball's sector, angle and distance around CENTER
+            "sector": (2, n),
+            "phi": (2, n),
+            "rho": (2, n),
+        }
+        self.offsets = {}
+        offset = 0
+        for name, shape in self.shapes.items():
+            self.offsets[name] = offset
+            offset += 8 * math.prod(shape)
+        self.nbytes = offset
+
+    def views(self, buf):
+        return {name: np.ndarray(shape, dtype=np.float64, buffer=buf, offset=self.offsets[name])
+                for name, shape in self.shapes.items()}
+
+
+def sector_bounds(pos, center, workers):
+    """Angles splitting the balls into ``workers`` sectors of equal count."""
+    phi = np.arctan2(pos[:, 1] - center[1], pos[:, 0] - center[0])
+    bounds = np.empty(workers + 1)
+    bounds[0], bounds[-1] = -math.pi, math.pi
+    if workers > 1:
+        bounds[1:-1] = np.quantile(phi, np.arange(1, workers) / workers)
+    return bounds
+
+
+def locate(pos, center, bounds):
+    """Sector, angle and distance from ``center`` of each ball."""
+    dx, dy = pos[:, 0] - center[0], pos[:, 1] - center[1]
+    phi = np.arctan2(dy, dx)
+    sector = np.clip(np.searchsorted(bounds, phi, side="right") - 1, 0, len(bounds) - 2)
+    return sector, phi, np.hypot(dx, dy)
+
+
+def publish(views, buf, own, center):
+    """Record where the balls ``own`` are in buffer ``buf``, for every worker's next phase."""
+    views["sector"][buf, own], views["phi"][buf, own], views["rho"][buf, own] = locate(
+        views["state"][buf, own, :2], center, views["bounds"])
+
+
+def halo_mask(rho, phi, lo, hi, reach):
+    """Balls within ``reach`` of the wedge between angles ``lo`` and ``hi``."""
+    # Outside the wedge the nearest point is on one of its two boundary rays
+    gap = np.minimum(np.abs((phi - lo + math.pi) % math.tau - math.pi),
+                     np.abs((phi - hi + math.pi) % math.tau - math.pi))
+    dist = np.where(gap < math.pi / 2, rho * np.sin(np.minimum(gap, math.pi / 2)), rho)
+    return dist < reach
+
+
+def halo_of(k, sector, phi, rho, bounds, reach):
+    """Balls of other sectors within ``reach`` of sector ``k``'s wedge.
+
+    Only the neighbouring sectors and, from the rest, balls close enough
+    to the centre are tested: any other sector is at least the narrower
+    neighbour's width away in angle.
+    """
+    workers = len(bounds) - 1
+    if workers > 3:
+        left, right = (k - 1) % workers, (k + 1) % workers
+        gap = min(bounds[left + 1] - bounds[left], bounds[right + 1] - bounds[right], math.pi / 2)
+        near = reach / math.sin(gap) if gap > 0.0 else math.inf
+        cand = np.flatnonzero((sector == left) | (sector == right) | ((sector != k) & (rho < near)))
+    else:
+        cand = np.flatnonzero(sector != k)
+    return cand[halo_mask(rho[cand], phi[cand], bounds[k], bounds[k + 1], reach)]
+
+
+def find_pairs(pos, radius, idx, cell):
+    """Overlapping pairs among balls ``idx`` as global (lower, higher) index arrays.
+
+    Uniform-grid hashing with a half stencil, all in NumPy: balls are sorted
+    by cell and each is matched against the runs of its own and four
+    neighbouring cells.
+    """
+    m = len(idx)
+    if m < 2:
+        return np.empty(0, np.intp), np.empty(0, np.intp)
+    xy = pos[idx]
+    c = np.floor(xy / cell).astype(np.int64)
+    c -= c.min(axis=0) - 1
+    rows = c[:, 1].max() + 2
+    key = c[:, 0] * rows + c[:, 1]
+    order = np.argsort(key, kind="stable")
+    skey = key[order]
+    own_i, own_j = [], []
+    for dx, dy in ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1)):
+        target = skey + dx * rows + dy
+        end = np.searchsorted(skey, target, side="right")
+        start = np.arange(1, m + 1) if dx == dy == 0 else np.searchsorted(skey, target, side="left")
+        counts = np.maximum(end - start, 0)
+        total = int(counts.sum())
+        if not total:
+            continue
+        i = np.repeat(np.arange(m), counts)
+        first = np.cumsum(counts) - counts
+        j = start[i] + (np.arange(total) - first[i])
+        own_i.append(i)
+        own_j.append(j)
+    if not own_i:
+        return np.empty(0, np.intp), np.empty(0, np.intp)
+    gi = idx[order[np.concatenate(own_i)]]
+    gj = idx[order[np.concatenate(own_j)]]
+    d = pos[gj] - pos[gi]
+    reach = radius[gi] + radius[gj]
+    hit = np.einsum("ij,ij->i", d, d) < reach * reach
+    gi, gj = gi[hit], gj[hit]
+    return np.minimum(gi, gj), np.maximum(gi, gj)
+
+
+def integrate(state_in, state_out, own, gravity, h):
+    s = state_in[own]
+    s[:, 3] += gravity * h
+    s[:, 0] += s[:, 2] * h
+    s[:, 1] += s[:, 3] * h
+    state_out[own] = s
+
+
+def resolve(state_in, state_out, radius, own, halo, walls=None):
+    """Contact pass for the balls ``own`` against own + halo, then walls and clamp.
+
+    ``walls`` is ``(hexes, angles, center, size)`` on a substep's last pass.
+    """
+    pos, vel = state_in[:, :2], state_in[:, 2:]
+    n = len(pos)
+    idx = np.concatenate((own, halo))
+    cell = 2.0 * float(radius[idx].max()) if len(idx) else 1.0
+    a, b = find_pairs(pos, radius, idx, cell)
+
+    # Contacts per ball; exact for every ball touching an owned one, since
+    # the halo reaches two contact distances out
+    count = np.bincount(np.concatenate((a, b)), minlength=n)
+    owned = np.zeros(n, dtype=bool)
+    owned[own] = True
+    keep = owned[a] | owned[b]
+    a, b = a[keep], b[keep]
+
+    s = state_in[own].copy()
+    # Counted at the lower-index end so boundary contacts count once
+    contacts = int(np.count_nonzero(owned[a]))
+    if len(a):
+        d = pos[b] - pos[a]
+        dist = np.hypot(d[:, 0], d[:, 1])
+        coincident = dist == 0.0
+        dist[coincident] = 1.0
+        normal = d / dist[:, None]
+        normal[coincident] = (1.0, 0.0)
+        closing = np.einsum("ij,ij->i", vel[a] - vel[b], normal)
+        bounce = np.where(closing > RESTING_SPEED, 1.0, 0.0)
+        # Jacobi: a ball hit by several contacts at once receives all of them,
+        # so the bounce is shared out or it would gain energy
+        share = 1.0 / np.maximum(count[a], count[b])
+        impulse = np.where(closing > 0.0, 0.5 * (1.0 + share * bounce) * closing, 0.0)[:, None] * normal
+        depth = radius[a] + radius[b] - np.where(coincident, 0.0, dist)
+        push = (0.5 * BETA * np.clip(depth - SLOP, 0.0, None))[:, None] * normal
+
+        # Each contact acts on its owned ends; sum per ball in partner order
+        side_a, side_b = owned[a], owned[b]
+        target = np.concatenate((a[side_a], b[side_b]))
+        partner = np.concatenate((b[side_a], a[side_b]))
+        dv = np.concatenate((-impulse[side_a], impulse[side_b]))
+        dp = np.concatenate((-push[side_a], push[side_b]))
+        order = np.lexsort((partner, target))
+        target, dv, dp = target[order], dv[order], dp[order]
+        slot = np.full(n, -1)
+        slot[own] = np.arange(len(own))
+        rows = slot[target]
+        m = len(own)
+        s[:, 0] += np.bincount(rows, dp[:, 0], m)
+        s[:, 1] += np.bincount(rows, dp[:, 1], m)
+        s[:, 2] += np.bincount(rows, dv[:, 0], m)
+        s[:, 3] += np.bincount(rows, dv[:, 1], m)
+
+    if walls is not None:
+        hexes, angles, center, size = walls
+        collide_walls(s, radius[own], hexes, angles, center)
+        lo = MARGIN
+        for axis, hi in ((0, size[0] - MARGIN), (1, size[1] - MARGIN)):
+            low, high = s[:, axis] < lo, s[:, axis] > hi
+            s[low, axis] = lo
+            s[low, axis + 2] = np.abs(s[low, axis + 2])
+            s[high, axis] = hi
+            s[high, axis + 2] = -np.abs(s[high, axis + 2])
+    state_out[own] = s
+    return contacts
+
+
+def collide_walls(s, r, hexes, angles, center):
+    """gpt-5's ``resolve_ball_segment`` for every present side, vectorized over balls."""
+    cx, cy = center
+    for (R, omega, missing), angle in zip(hexes, angles):
+        theta = angle + np.arange(7) * (math.tau / 6.0)
+        vx, vy = cx + np.cos(theta) * R, cy + np.sin(theta) * R
+        for side in range(6):
+            if side == missing:
+                continue
+            p1x, p1y, p2x, p2y = vx[side], vy[side], vx[side + 1], vy[side + 1]
+            sx, sy = p2x - p1x, p2y - p1y
+            t = np.clip(((s[:, 0] - p1x) * sx + (s[:, 1] - p1y) * sy) / (sx * sx + sy * sy), 0.0, 1.0)
+            qx, qy = p1x + t * sx, p1y + t * sy
+            dx, dy = s[:, 0] - qx, s[:, 1] - qy
+            dist2 = dx * dx + dy * dy
+            hit = np.flatnonzero(dist2 <= r * r)
+            if not len(hit):
+                continue
+            dist = np.sqrt(dist2[hit])
+            length = math.hypot(sx, sy)
+            nx = np.where(dist > 1e-6, dx[hit] / np.maximum(dist, 1e-6), -sy / length)
+            ny = np.where(dist > 1e-6, dy[hit] / np.maximum(dist, 1e-6), sx / length)
+            ux, uy = -omega * (qy[hit] - cy), omega * (qx[hit] - cx)
+            vn = (s[hit, 2] - ux) * nx + (s[hit, 3] - uy) * ny
+            k = np.where(vn < 0.0, 2.0 * vn, 0.0)
+            s[hit, 2] -= k * nx
+            s[hit, 3] -= k * ny
+            depth = r[hit] - dist + WALL_PUSH
+            s[hit, 0] += depth * nx
+            s[hit, 1] += depth * ny
+
+
+def step_region(k, views, hexes, center, size, gravity, substeps, iterations, h, reach, barrier=None):
+    """Run one step's substeps for sector ``k``; return its contacts on the last pass.
+
+    Every phase reads one buffer and writes the other, then waits at the
+    barrier; :func:`final_buffer` says which buffer holds the result. Each
+    worker also publishes the sector, angle and distance of the balls it
+    wrote, so every ball is located once per phase rather than once per
+    worker.
+    """
+    state, radius, bounds, angle0 = views["state"], views["radius"], views["bounds"], views["angle"]
+    sector, phi, rho = views["sector"], views["phi"], views["rho"]
+    omegas = np.array([omega for _, omega, _ in hexes])
+    angles = angle0.copy()
+    cur = 0
+    contacts = 0
+    for _ in range(substeps):
+        angles += omegas * h
+        own = np.flatnonzero(sector[cur] == k)
+        integrate(state[cur], state[1 - cur], own, gravity, h)
+        publish(views, 1 - cur, own, center)
+        cur = 1 - cur
+        if barrier is not None:
+            barrier.wait()
+
+        for it in range(iterations):
+            own = np.flatnonzero(sector[cur] == k)
+            halo = halo_of(k, sector[cur], phi[cur], rho[cur], bounds, 2.0 * reach)
+            walls = (hexes, angles, center, size) if it == iterations - 1 else None
+            contacts = resolve(state[cur], state[1 - cur], radius, own, halo, walls)
+            publish(views, 1 - cur, own, center)
+            cur = 1 - cur
+            if barrier is not None:
+                barrier.wait()
+    return contacts
+
+
+def final_buffer(substeps, iterations):
+    """Buffer holding the state after a step: each phase flips it."""
+    return (substeps * (1 + iterations)) % 2
+
+
+def _worker(k, shm_name, layout, hexes, center, size, gravity, barrier, conn):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        views = layout.views(shm.buf)
+        while True:
+            task = conn.recv()
+            if task is None:
+                break
+            substeps, iterations, h, reach = task
+            conn.send(step_region(k, views, hexes, center, size, gravity, substeps, iterations, h, reach, barrier))
+        del views
+    finally:
+        shm.close()
+
+
+class ParallelWorld:
+    """Balls in shared memory, stepped by ``workers`` sector processes.
+
+    Takes the hexagons, gravity and substeps of a :class:`World` and the
+    initial ball arrays. ``workers=1`` runs in this process without shared
+    memory or barriers.
+    """
+
+    def __init__(self, pos, vel, radius, workers=1, world=None, iterations=ITERATIONS):
+        world = world or World()
+        n = len(pos)
+        self.n = n
+        self.workers = workers
+        self.hexes = [(float(hx.R), float(hx.omega), int(hx.missing)) for hx in world.hexes]
+        self.center = (float(world.center.x), float(world.center.y))
+        self.size = (world.width, world.height)
+        self.gravity = world.gravity
+        self.substeps = world.substeps
+        self.iterations = iterations
+        self.steps = 0
+        self.contacts = 0
+        self.layout = Layout(n, workers, len(self.hexes))
+        self._procs, self._conns = [], []
+        if workers == 1:
+            self.shm = None
+            self.views = self.layout.views(bytearray(self.layout.nbytes))
+        else:
+            self.shm = shared_memory.SharedMemory(create=True, size=self.layout.nbytes)
+            self.views = self.layout.views(self.shm.buf)
+        self.views["state"][0, :, :2] = pos
+        self.views["state"][0, :, 2:] = vel
+        self.views["radius"][:] = radius
+        self.views["angle"][:] = [hx.angle for hx in world.hexes]
+        self.reach = 2.0 * float(np.max(radius)) if n else 0.0
+        if workers > 1:
+            self._start()
+
+    def _start(self):
+        ctx = multiprocessing.get_context("spawn")
+        # Kept on self: spawned children unpickle it after start() returns
+        barrier = self._barrier = ctx.Barrier(self.workers)
+        for k in range(self.workers):
+            parent, child = ctx.Pipe()
+            proc = ctx.Process(target=_worker, daemon=True, args=(
+                k, self.shm.name, self.layout, self.hexes, self.center, self.size, self.gravity, barrier, child))
+            proc.start()
+            self._procs.append(proc)
+            self._conns.append(parent)
+
+    @property
+    def state(self):
+        return self.views["state"][0]
+
+    def step(self, dt):
+        """Advance one frame of ``dt`` seconds in ``substeps`` substeps."""
+        h = dt / self.substeps
+        views = self.views
+        views["bounds"][:] = sector_bounds(views["state"][0, :, :2], self.center, self.workers)
+        publish(views, 0, slice(None), self.center)
+        if self.workers == 1:
+            self.contacts = step_region(0, views, self.hexes, self.center, self.size, self.gravity,
+                                        self.substeps, self.iterations, h, self.reach)
+        else:
+            for conn in self._conns:
+                conn.send((self.substeps, self.iterations, h, self.reach))
+            self.contacts = sum(conn.recv() for conn in self._conns)
+        if final_buffer(self.substeps, self.iterations):
+            views["state"][0] = views["state"][1]
+        views["angle"][:] += np.array([omega for _, omega, _ in self.hexes]) * h * self.substeps
+        self.steps += 1
+
+    def digest(self):
+        return hashlib.sha1(self.state.tobytes()).hexdigest()[:16]
+
+    def close(self):
+        for conn in self._conns:
+            try:
+                conn.send(None)
+            except OSError:
+                pass  # the worker already died; its error was printed
+        for proc in self._procs:
+            proc.join()
+        self._procs, self._conns = [], []
+        if self.shm is not None:
+            # Drop the NumPy views before releasing the buffer
+            self.views = None
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def scatter(count, radius, rng, size=(sim.W, sim.H)):
+    """Random positions over the screen inside the clamp margin, random velocities."""
+    pos = np.column_stack((rng.uniform(MARGIN, size[0] - MARGIN, count),
+                           rng.uniform(MARGIN, size[1] - MARGIN, count)))
+    vel = rng.uniform(-100.0, 100.0, (count, 2))
+    return pos, vel, np.full(count, float(radius))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scaling benchmark of the sector-decomposed multi-process engine")
+    parser.add_argument("--balls", type=int, nargs="+", default=[20000, 50000, 100000], help="Ball counts")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8], help="Worker counts")
+    parser.add_argument("--radius", type=float, default=1.0, help="Ball radius (gpt-5's 10 px cannot fit 20k balls)")
+    parser.add_argument("--steps", type=int, default=10, help="Timed steps per case")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPUs")
+    print(f"{'balls':>7}{'workers':>9}{'ms/step':>10}{'speed-up':>10}{'contacts':>10}{'same state':>12}")
+    for count in args.balls:
+        pos, vel, radius = scatter(count, args.radius, np.random.default_rng(args.seed))
+        base = ref = None
+        for workers in args.workers:
+            with ParallelWorld(pos, vel, radius, workers) as world:
+                world.step(1.0 / sim.FPS)  # worker start-up and first-touch outside the timing
+                start = time.perf_counter()
+                for _ in range(args.steps):
+                    world.step(1.0 / sim.FPS)
+                per_step = (time.perf_counter() - start) / args.steps
+                digest = world.digest()
+                contacts = world.contacts
+            base = base or per_step
+            ref = ref or digest
+            print(f"{count:>7}{workers:>9}{1000.0 * per_step:>10.1f}{base / per_step:>9.2f}x{contacts:>10}"
+                  f"{'yes' if digest == ref else 'NO':>12}")
+
+
+if __name__ == "__main__":
+    main()
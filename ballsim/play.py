@@ -0,0 +1,116 @@
+"""Interactive window for the headless engine, driven by the fixed-timestep loop.
+
+Physics runs at a fixed rate; the window only samples it (with interpolation),
+so the simulation behaves the same at 30 or 300 FPS. On exit the click
+schedule is printed so the run can be replayed with ``ballsim.loop``.
+Without a display the same run falls back to headless mode.
+
+    python -m ballsim.play --seed 7
+"""
+import argparse
+import os
+import sys
+
+import pygame
+
+from .lifecycle import Lifecycle
+from .loop import FixedStepLoop, run_headless
+from .profiler import NullProfiler, Profiler, ProfilerOverlay
+from .render import Renderer
+from .world import World, sim
+
+
+def has_display():
+    """Whether a window can be opened (X11/Wayland on Linux, always elsewhere)."""
+    if os.environ.get("SDL_VIDEODRIVER") in ("dummy", "offscreen"):
+        return False
+    if sys.platform.startswith("linux"):
+        return bool(os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"))
+    return True
+
+
+def replay_command(args, steps, clicks):
+    """``ballsim.loop`` command line that replays this run, with every physics option."""
+    cmd = f"python -m ballsim.loop --seed {args.seed} --steps {steps}"
+    if args.substeps is not None:
+        cmd += f" --substeps {args.substeps}"
+    if args.ccd:
+        cmd += " --ccd"
+    if args.lifecycle:
+        cmd += " --lifecycle"
+        if args.cap is not None:
+            cmd += f" --cap {args.cap}"
+    return cmd + f" --clicks {' '.join(map(str, clicks))}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play the hexagon simulation with a fixed physics timestep")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for ball colours")
+    parser.add_argument("--fps", type=int, default=sim.FPS, help="Render frame cap")
+    parser.add_argument("--substeps", type=int, default=None)
+    parser.add_argument("--ccd", action="store_true", help="Use swept collision detection")
+    parser.add_argument("--steps", type=int, default=2400, help="Steps to run when no display is available")
+    parser.add_argument("--clicks", type=int, nargs="*", default=[0, 30, 60, 90, 120], help="Click schedule for headless mode")
+    parser.add_argument("--lifecycle", action="store_true", help="Retire escaped balls and reuse them for new clicks")
+    parser.add_argument("--cap", type=int, default=None, help="With --lifecycle, evict the least recently used ball above this count")
+    parser.add_argument("--raster", action="store_true", help="Draw balls with the batch disc rasterizer (needs Numba)")
+    parser.add_argument("--profile", metavar="JSON", help="Show the frame-time overlay (F3 toggles) and dump it here on exit")
+    args = parser.parse_args()
+
+    world = World(seed=args.seed, substeps=args.substeps, ccd=args.ccd)
+    if args.lifecycle:
+        Lifecycle(world, cap=args.cap)
+
+    if not has_display():
+        digest = run_headless(world, args.steps, args.clicks)
+        print(f"No display: ran {args.steps} steps headlessly, {len(world.balls)} balls")
+        print(f"Trajectory digest: {digest}")
+        return
+
+    pygame.init()
+    screen = pygame.display.set_mode((world.width, world.height))
+    pygame.display.set_caption("旋转六边形盒子 - 固定步长物理")
+    clock = pygame.time.Clock()
+    renderer = Renderer(screen, tip="左键点击 从中心释放小球 | 固定物理步长 | 渲染插值", raster=args.raster)
+
+    profiler = Profiler() if args.profile else NullProfiler()
+    overlay = ProfilerOverlay(profiler) if args.profile else None
+
+    loop = FixedStepLoop(world)
+    running = True
+    while running:
+        frame_dt = clock.tick(args.fps) / 1000.0
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                loop.click()
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3 and overlay is not None:
+                if overlay.visible and overlay.rect is not None:
+                    renderer.invalidate(overlay.rect)
+                overlay.toggle()
+
+        with profiler.scope("physics"):
+            alpha = loop.advance(frame_dt)
+        profiler.sample_world(world)
+        with profiler.scope("draw"):
+            rects = renderer.draw(world, loop.ball_positions(alpha), loop.hex_angles(alpha))
+        if overlay is not None:
+            with profiler.scope("overlay"):
+                panel = overlay.draw(screen)
+            if panel is not None:
+                rects = rects + [panel]
+        with profiler.scope("present"):
+            pygame.display.update(rects)
+        profiler.end_frame()
+
+    pygame.quit()
+    if args.profile:
+        profiler.dump(args.profile)
+        print(profiler.report())
+    print(f"Steps: {world.steps}  dropped: {loop.dropped:.3f}s")
+    print(f"Replay: {replay_command(args, world.steps, loop.clicks)}")
+
+
+if __name__ == "__main__":
+    main()
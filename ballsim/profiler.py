@@ -0,0 +1,303 @@
+"""Frame-time profiler: per-phase rolling histograms, an overlay and a JSON dump.
+
+A :class:`Profiler` collects one sample per rendered frame for each scope:
+
+- the substep phases (integration, ball_ball, ball_wall, clamp) come from
+  the timers ``World`` already keeps around each phase, so the physics hot
+  path gains no extra calls (and the kernel backend is covered too);
+- anything else in the loop, such as drawing and presenting, is wrapped in
+  ``with profiler.scope(name):``, timed with ``perf_counter_ns``;
+- ``frame`` is the wall time between ``end_frame`` calls.
+
+The last ``window`` frames are kept per scope, which gives mean, p50, p95,
+max and a log-spaced histogram. :class:`NullProfiler` has the same interface
+and does nothing, so a loop instrumented with it costs one no-op context
+manager per scope per frame.
+
+    python -m ballsim.profiler --balls 200 --json profile.json
+    python -m ballsim.play --profile profile.json   (F3 toggles the overlay)
+"""
+import argparse
+import json
+import os
+import time
+from collections import deque
+
+import numpy as np
+import pygame
+
+from .world import PHASES, STEP_DT, World, sim
+
+# Frames kept per scope
+WINDOW = 240
+
+# Histogram bin edges in microseconds: 1 us to ~4 s in powers of two
+BIN_EDGES_US = [0] + [2 ** k for k in range(23)]
+
+# Overlay rows in display order; other scopes follow in first-seen order
+ORDER = PHASES + ("physics", "draw", "present", "overlay", "frame")
+
+
+class _Scope:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.add(self.name, time.perf_counter_ns() - self.start)
+
+
+class Profiler:
+    """Rolling per-frame timings for named scopes."""
+
+    enabled = True
+
+    def __init__(self, window=WINDOW):
+        self.window = window
+        self.samples = {}
+        self.frames = 0
+        self._scopes = {}
+        self._current = {}
+        self._phase_seen = None
+        self._frame_start = time.perf_counter_ns()
+
+    def scope(self, name):
+        """Context manager that adds its elapsed time to ``name`` for this frame."""
+        scope = self._scopes.get(name)
+        if scope is None:
+            scope = self._scopes[name] = _Scope(self, name)
+        return scope
+
+    def add(self, name, ns):
+        self._current[name] = self._current.get(name, 0) + ns
+
+    def sample_world(self, world):
+        """Add the time ``world`` spent in each substep phase since the last call."""
+        phase = world.phase_time
+        seen = self._phase_seen
+        if seen is not None:
+            for name in PHASES:
+                self.add(name, round((phase[name] - seen[name]) * 1e9))
+        self._phase_seen = dict(phase)
+
+    def end_frame(self):
+        """Close the frame: push this frame's totals (0 for idle scopes) into the windows."""
+        now = time.perf_counter_ns()
+        self.add("frame", now - self._frame_start)
+        self._frame_start = now
+        current = self._current
+        for name in current:
+            if name not in self.samples:
+                self.samples[name] = deque(maxlen=self.window)
+        for name, buf in self.samples.items():
+            buf.append(current.get(name, 0))
+        self._current = {}
+        self.frames += 1
+
+    def names(self):
+        known = [name for name in ORDER if name in self.samples]
+        return known + [name for name in self.samples if name not in ORDER]
+
+    def stats(self, name):
+        """Mean, p50, p95 and max of ``name`` over the window, in milliseconds."""
+        data = np.fromiter(self.samples[name], dtype=np.int64) / 1e6
+        if not len(data):
+            return dict(mean=0.0, p50=0.0, p95=0.0, max=0.0)
+        p50, p95 = np.percentile(data, (50, 95))
+        return dict(mean=float(data.mean()), p50=float(p50), p95=float(p95), max=float(data.max()))
+
+    def histogram(self, name):
+        """Counts of ``name``'s samples in ``BIN_EDGES_US`` bins (last bin open-ended)."""
+        data = np.fromiter(self.samples[name], dtype=np.int64) / 1e3
+        edges = np.asarray(BIN_EDGES_US + [np.inf])
+        return np.histogram(data, bins=edges)[0].tolist()
+
+    def to_dict(self):
+        return {
+            "window": self.window,
+            "frames": self.frames,
+            "bin_edges_us": BIN_EDGES_US,
+            "scopes": {
+                name: {
+                    **{k + "_ms": v for k, v in self.stats(name).items()},
+                    "histogram": self.histogram(name),
+                    "samples_ns": list(self.samples[name]),
+                }
+                for name in self.names()
+            },
+        }
+
+    def dump(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=1)
+
+    def report(self):
+        lines = [f"{'scope':<13}{'mean ms':>9}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}"]
+        for name in self.names():
+            s = self.stats(name)
+            lines.append(f"{name:<13}{s['mean']:>9.3f}{s['p50']:>9.3f}{s['p95']:>9.3f}{s['max']:>9.3f}")
+        return "\n".join(lines)
+
+
+class _NullScope:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+_NULL_SCOPE = _NullScope()
+
+
+class NullProfiler:
+    """Disabled profiler: every call is a no-op."""
+
+    enabled = False
+    frames = 0
+
+    def scope(self, name):
+        return _NULL_SCOPE
+
+    def add(self, name, ns):
+        pass
+
+    def sample_world(self, world):
+        pass
+
+    def end_frame(self):
+        pass
+
+
+class ProfilerOverlay:
+    """Opaque panel with one bar per scope and a frame-time histogram.
+
+    The panel is re-rendered every ``refresh`` frames and blitted in between,
+    so text rendering stays out of most frames. It is opaque because the
+    renderer only restores the rectangles it drew itself.
+    """
+
+    def __init__(self, profiler, topleft=(15, 40), refresh=15):
+        self.profiler = profiler
+        self.topleft = topleft
+        self.refresh = refresh
+        self.visible = True
+        self.font = pygame.font.SysFont(None, 18)
+        self.rect = None
+        self._panel = None
+        self._age = 0
+
+    def _build(self):
+        prof = self.profiler
+        names = prof.names()
+        row = 16
+        width, bar_x, bar_w = 300, 170, 120
+        hist_h = 40
+        height = 8 + row * (len(names) + 1) + hist_h + 8
+        panel = pygame.Surface((width, height)).convert()
+        panel.fill((0, 0, 0))
+        white, grey = (230, 230, 230), (150, 150, 150)
+
+        stats = {name: prof.stats(name) for name in names}
+        frame_p95 = max(stats.get("frame", {}).get("p95", 0.0), 1e-9)
+        panel.blit(self.font.render("scope", True, grey), (8, 6))
+        panel.blit(self.font.render("mean / p95 ms", True, grey), (90, 6))
+        for k, name in enumerate(names):
+            s = stats[name]
+            y = 6 + row * (k + 1)
+            panel.blit(self.font.render(name, True, white), (8, y))
+            panel.blit(self.font.render(f"{s['mean']:.2f} / {s['p95']:.2f}", True, white), (90, y))
+            share = min(1.0, s["mean"] / frame_p95)
+            pygame.draw.rect(panel, (90, 170, 250), (bar_x, y + 3, max(1, int(share * bar_w)), row - 6))
+
+        # Frame-time histogram over the window, one column per bin
+        counts = prof.histogram("frame") if "frame" in prof.samples else []
+        top = max(counts, default=0) or 1
+        base = height - 8
+        col = (width - 16) // max(1, len(counts))
+        for k, c in enumerate(counts):
+            h = int(hist_h * c / top)
+            if h:
+                pygame.draw.rect(panel, (250, 170, 90), (8 + k * col, base - h, col - 1, h))
+        return panel
+
+    def toggle(self):
+        self.visible = not self.visible
+
+    def draw(self, screen):
+        """Blit the panel; return its rectangle (None when hidden or empty)."""
+        if not self.visible or not self.profiler.samples:
+            return None
+        if self._panel is None or self._age >= self.refresh:
+            self._panel = self._build()
+            self._age = 0
+        self._age += 1
+        self.rect = screen.blit(self._panel, self.topleft)
+        return self.rect
+
+
+def run(world, steps, spawn_every, profiler, renderer=None):
+    """Headless loop instrumented the same way as ``ballsim.play``."""
+    for step in range(steps):
+        if step % spawn_every == 0:
+            world.spawn()
+        with profiler.scope("physics"):
+            world.step(STEP_DT)
+        profiler.sample_world(world)
+        if renderer is not None:
+            with profiler.scope("draw"):
+                rects = renderer.draw(world)
+            with profiler.scope("present"):
+                pygame.display.update(rects)
+        profiler.end_frame()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile the headless loop per phase and measure the profiler's overhead")
+    parser.add_argument("--balls", type=int, default=200, help="Balls released, one every --spawn-every steps")
+    parser.add_argument("--spawn-every", type=int, default=2)
+    parser.add_argument("--steps", type=int, default=600)
+    parser.add_argument("--render", action="store_true", help="Also draw each frame on SDL's dummy driver")
+    parser.add_argument("--json", help="Write the profile to this file")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    steps = max(args.steps, args.balls * args.spawn_every)
+    renderer = None
+    if args.render:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        from .render import Renderer
+
+        pygame.init()
+        screen = pygame.display.set_mode((sim.W, sim.H))
+
+    # Warm-up, so kernel compilation or cache loading is not timed
+    run(World(seed=args.seed), 10, args.spawn_every, NullProfiler())
+
+    timings = {}
+    for label, profiler in (("disabled", NullProfiler()), ("enabled", Profiler())):
+        world = World(seed=args.seed)
+        if args.render:
+            renderer = Renderer(screen)
+        start = time.perf_counter()
+        run(world, steps, args.spawn_every, profiler, renderer)
+        timings[label] = time.perf_counter() - start
+
+    print(profiler.report())
+    overhead = timings["enabled"] / timings["disabled"] - 1.0
+    print(f"{steps} frames: disabled {timings['disabled']:.2f}s, enabled {timings['enabled']:.2f}s ({100.0 * overhead:+.1f}%)")
+    if args.json:
+        profiler.dump(args.json)
+        print(f"Profile written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
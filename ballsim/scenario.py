@@ -0,0 +1,277 @@
+"""Declarative scenario files: shells, spawns, step budget and seed.
+
+A scenario is a TOML or JSON file (picked by extension)::
+
+    name = "gpt-5 defaults"
+    seed = 0
+    steps = 3600                 # physics steps of 1/120 s
+
+    [world]                      # all optional, gpt-5's constants otherwise
+    gravity = 800
+    substeps = 3
+    ball_radius = 10
+
+    [[shells]]                   # innermost first
+    radius = 90
+    omega = -0.8                 # rad/s
+    missing = 0                  # side index, -1 for closed; default gpt-5's
+    angle = 0.0                  # start angle; default gpt-5's i * 15°
+
+    [spawn]                      # every/total/start, or an explicit list
+    every = 5
+    total = 200
+    # steps = [0, 0, 30]         # repeats release several balls
+    # at = [450, 450]            # release point, default the centre
+    # velocity = [0, 0]
+
+:func:`load_scenario` validates the file and returns a :class:`Scenario`,
+whose :meth:`Scenario.build_world` builds the gpt-5 :class:`World`. The
+``run`` command replays a scenario at full speed on the gpt-5 engine or
+on another submission through its :mod:`ballsim.adapters` adapter. Adapters
+take the scenario's seed, clicks and duration (in 1/60 s frames); the
+geometry is applied where the submission's scene takes it as parameters
+(horizon-alpha: radii, speeds and gravity, one missing side for every
+shell) and otherwise stays the submission's own, which the report says.
+
+    python -m ballsim.scenario run ballsim/scenarios/default.toml
+    python -m ballsim.scenario run ballsim/scenarios/large.json --engine openrouter-horizon-alpha
+    python -m ballsim.scenario show ballsim/scenarios/large.json
+"""
+import argparse
+import json
+import math
+import time
+from pathlib import Path
+
+from .headless import load_schedule, report, run_schedule, spawn_schedule
+from .world import STEP_DT, World, sim
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+TOP_KEYS = {"name", "seed", "steps", "world", "shells", "spawn"}
+WORLD_KEYS = {"gravity", "substeps", "ball_radius", "broadphase", "contact_solver", "wall_collision", "backend"}
+SHELL_KEYS = {"radius", "omega", "missing", "angle"}
+SPAWN_KEYS = {"every", "total", "start", "steps", "file", "at", "velocity"}
+
+
+def _check_keys(table, allowed, where):
+    if not isinstance(table, dict):
+        raise ValueError(f"'{where}' must be a table")
+    unknown = set(table) - allowed
+    if unknown:
+        raise ValueError(f"Unknown keys in '{where}': {sorted(unknown)}, expected some of {sorted(allowed)}")
+
+
+def _read(path):
+    path = Path(path)
+    if path.suffix == ".toml":
+        if tomllib is None:
+            raise ValueError("TOML scenarios need Python 3.11+ or the tomli package; use JSON instead")
+        with open(path, "rb") as f:
+            return tomllib.load(f)
+    if path.suffix == ".json":
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    raise ValueError(f"Scenario files are .toml or .json, got '{path.name}'")
+
+
+class Scenario:
+    """A validated scenario: see the module docstring for the fields."""
+
+    def __init__(self, data, base=None):
+        _check_keys(data, TOP_KEYS, "scenario")
+        self.name = str(data.get("name", "unnamed"))
+        self.seed = int(data.get("seed", 0))
+        self.steps = int(data.get("steps", 1200))
+        if self.steps < 0:
+            raise ValueError(f"steps must be >= 0, got {self.steps}")
+
+        world = data.get("world", {})
+        _check_keys(world, WORLD_KEYS, "world")
+        self.world = dict(world)
+        if "substeps" in world and int(world["substeps"]) < 1:
+            raise ValueError(f"world.substeps must be >= 1, got {world['substeps']}")
+        if "ball_radius" in world and float(world["ball_radius"]) <= 0:
+            raise ValueError(f"world.ball_radius must be > 0, got {world['ball_radius']}")
+
+        shells = data.get("shells")
+        if shells is None:
+            start = [i * math.pi / 12 for i in range(len(sim.HEX_RADII))]
+            shells = [{"radius": R, "omega": w, "angle": a} for R, w, a in zip(sim.HEX_RADII, sim.OMEGAS, start)]
+        if not isinstance(shells, list):
+            raise ValueError("'shells' must be a list of tables")
+        self.shells = []
+        for i, shell in enumerate(shells):
+            _check_keys(shell, SHELL_KEYS, f"shells[{i}]")
+            if "radius" not in shell or "omega" not in shell:
+                raise ValueError(f"shells[{i}] needs 'radius' and 'omega'")
+            missing = int(shell.get("missing", sim.MISSING_SIDE_INDEX))
+            if not -1 <= missing <= 5:
+                raise ValueError(f"shells[{i}].missing must be -1 (closed) or a side 0..5, got {missing}")
+            self.shells.append({
+                "radius": float(shell["radius"]),
+                "omega": float(shell["omega"]),
+                "missing": missing,
+                "angle": float(shell.get("angle", i * math.pi / 12)),
+            })
+        radii = [s["radius"] for s in self.shells]
+        if radii != sorted(radii):
+            raise ValueError("shells must be listed innermost first")
+
+        spawn = data.get("spawn", {})
+        _check_keys(spawn, SPAWN_KEYS, "spawn")
+        if "file" in spawn:
+            schedule = load_schedule(Path(base or ".") / spawn["file"])
+        elif "steps" in spawn:
+            schedule = [int(s) for s in spawn["steps"]]
+        else:
+            every = int(spawn.get("every", 5))
+            if every < 1:
+                raise ValueError(f"spawn.every must be >= 1, got {every}")
+            schedule = spawn_schedule(every, int(spawn.get("total", 200)), int(spawn.get("start", 0)))
+        self.schedule = sorted(schedule)
+        for key in ("at", "velocity"):
+            if key in spawn and (not isinstance(spawn[key], (list, tuple)) or len(spawn[key]) != 2):
+                raise ValueError(f"spawn.{key} must be a pair [x, y], got {spawn[key]!r}")
+        self.at = tuple(float(v) for v in spawn["at"]) if "at" in spawn else None
+        self.velocity = tuple(float(v) for v in spawn.get("velocity", (0.0, 0.0)))
+
+    def build_world(self, **overrides):
+        """The gpt-5 :class:`World` for this scenario (``overrides`` replace ``[world]`` keys)."""
+        options = {**self.world, **overrides}
+        world = World(hex_radii=[s["radius"] for s in self.shells], omegas=[s["omega"] for s in self.shells],
+                      seed=self.seed, **options)
+        for hx, shell in zip(world.hexes, self.shells):
+            hx.missing = shell["missing"]
+            hx.angle = shell["angle"]
+        return world
+
+    def run(self, world, on_step=None):
+        """Replay the spawn schedule on ``world`` for ``steps`` steps."""
+        if self.at is None and self.velocity == (0.0, 0.0):
+            run_schedule(world, self.steps, self.schedule, on_step=on_step)
+            return
+        pending = self.schedule
+        k = 0
+        for _ in range(self.steps):
+            while k < len(pending) and pending[k] <= world.steps:
+                world.spawn(self.at, self.velocity)
+                k += 1
+            world.step(STEP_DT)
+            if on_step is not None:
+                on_step(world)
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "seed": self.seed,
+            "steps": self.steps,
+            "world": self.world,
+            "shells": self.shells,
+            "spawn": {"steps": self.schedule, **({"at": list(self.at)} if self.at else {}),
+                      "velocity": list(self.velocity)},
+        }
+
+
+def load_scenario(path):
+    """Read and validate a scenario file (relative spawn files resolve next to it)."""
+    return Scenario(_read(path), base=Path(path).parent)
+
+
+def adapt_geometry(adapter, scenario):
+    """Put the scenario's shells into an adapter's scene where it takes them; return whether it did."""
+    from .adapters import HorizonAlpha
+
+    if not isinstance(adapter, HorizonAlpha):
+        return False
+    missing = {s["missing"] for s in scenario.shells}
+    if len(missing) != 1:
+        raise ValueError("horizon-alpha takes one missing side for every shell")
+    m = adapter.m
+    for body in adapter.walls.bodies:
+        adapter.space.remove(body, *body.shapes)
+    adapter.walls = m.RotatingHexWalls(adapter.space, m.CENTER, [s["radius"] for s in scenario.shells],
+                                       [s["omega"] for s in scenario.shells], missing.pop())
+    if "gravity" in scenario.world:
+        adapter.space.gravity = (0, float(scenario.world["gravity"]))
+    return True
+
+
+def run_adapter(scenario, name):
+    """Replay ``scenario`` on a submission adapter; return (adapter, frames, seconds, geometry applied)."""
+    from .adapters import FRAME_DT, make_adapter
+
+    adapter = make_adapter(name, scenario.seed)
+    applied = adapt_geometry(adapter, scenario)
+    per_frame = round(FRAME_DT / STEP_DT)
+    frames = scenario.steps // per_frame
+    clicks = [s // per_frame for s in scenario.schedule]
+    k = 0
+    start = time.perf_counter()
+    for frame in range(frames):
+        while k < len(clicks) and clicks[k] <= frame:
+            adapter.spawn()
+            k += 1
+        adapter.step()
+    return adapter, frames, time.perf_counter() - start, applied
+
+
+def run(args):
+    scenario = load_scenario(args.path)
+    if args.engine == "gpt-5":
+        overrides = {"backend": args.backend} if args.backend else {}
+        world = scenario.build_world(**overrides)
+        start = time.perf_counter()
+        scenario.run(world)
+        elapsed = time.perf_counter() - start
+        result = {"scenario": scenario.name, "engine": "gpt-5", "steps": world.steps,
+                  "balls": len(world.balls), "seconds": elapsed, "geometry": "scenario",
+                  "steps_per_sec": world.steps / elapsed if elapsed else float("inf")}
+        text = report(world, elapsed)
+    else:
+        adapter, frames, elapsed, applied = run_adapter(scenario, args.engine)
+        result = {"scenario": scenario.name, "engine": args.engine, "frames": frames,
+                  "balls": adapter.ball_count, "lost": adapter.lost(), "seconds": elapsed,
+                  "geometry": "scenario" if applied else "submission",
+                  "frames_per_sec": frames / elapsed if elapsed else float("inf")}
+        text = (f"Frames:       {frames} of 1/60 s, {adapter.ball_count} balls at the end ({adapter.lost()} lost)\n"
+                f"Wall time:    {elapsed:.3f}s\n"
+                f"Frames/sec:   {result['frames_per_sec']:,.1f}\n"
+                f"Geometry:     the {result['geometry']}'s")
+    if args.json:
+        print(json.dumps(result))
+    else:
+        print(f"Scenario:     {scenario.name} on {result['engine']}")
+        print(text)
+
+
+def show(args):
+    print(json.dumps(load_scenario(args.path).to_dict(), indent=1))
+
+
+def main():
+    from .adapters import ADAPTERS
+
+    parser = argparse.ArgumentParser(description="Run or inspect declarative scenario files")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run_p = sub.add_parser("run", help="Replay a scenario headlessly at full speed")
+    run_p.add_argument("path", type=str)
+    run_p.add_argument("--engine", choices=sorted(ADAPTERS), default="gpt-5",
+                       help="gpt-5's World (default) or another submission's adapter")
+    run_p.add_argument("--backend", choices=["auto", "python", "numba"], default=None,
+                       help="Override the scenario's World backend")
+    run_p.add_argument("--json", action="store_true", help="Print the result as JSON")
+    show_p = sub.add_parser("show", help="Print a scenario with every default filled in")
+    show_p.add_argument("path", type=str)
+    args = parser.parse_args()
+    {"run": run, "show": show}[args.command](args)
+
+
+if __name__ == "__main__":
+    main()
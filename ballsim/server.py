@@ -0,0 +1,465 @@
+"""Server mode: step the physics headlessly and stream state to viewers.
+
+The gpt-5 core runs in an asyncio task, paced to real time by the
+fixed-step loop (or as fast as it can with ``--free``), and publishes
+compact binary messages. Each message is encoded once and shared by
+every viewer, so more viewers cost sockets, not physics. Two messages
+are sent, both little-endian:
+
+- ``TABL`` (``TABLE_HEAD``): roster version, screen size, centre, then
+  each hexagon (f32 radius, i32 missing side) and each ball (u8 r, g, b,
+  radius). It is sent to a viewer when it connects and again whenever
+  balls are added or removed.
+- ``FRAM`` (``FRAME_HEAD``): step, roster version, simulated time and ball
+  count, then each hexagon's angle (f32) and the ball centres as float32
+  ``x, y`` pairs. A viewer draws a frame against the last table.
+
+Each viewer has a mailbox holding at most one pending table and the latest
+frame. A slow viewer skips frames and never holds up the physics or the
+other viewers. One port speaks three protocols, picked by the first bytes
+the client sends:
+
+- ``GET`` with ``Upgrade: websocket`` gets a WebSocket with one binary
+  message per frame;
+- any other ``GET`` gets the HTML canvas viewer (``viewer.html``);
+- ``BSIM`` gets raw TCP with a u32 length before each message.
+
+Viewers send ``c`` (a WebSocket message, or one raw byte) to click, and
+the physics loop applies the click at its next step.
+
+    python -m ballsim.server serve --port 8765          # then open http://127.0.0.1:8765/
+    python -m ballsim.server view --port 8765           # pygame viewer
+    python -m ballsim.server bench --clients 0 1 4
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import struct
+import time
+from pathlib import Path
+
+import numpy as np
+
+from .headless import spawn_schedule
+from .loop import FixedStepLoop
+from .raster import positions_of
+from .world import STEP_DT, World, sim
+
+TABLE_HEAD = struct.Struct("<4sIHHffHxxI")   # tag, roster, width, height, cx, cy, hexes, balls
+FRAME_HEAD = struct.Struct("<4sIIfI")        # tag, step, roster, time, balls
+HELLO = b"BSIM"
+CLICK = b"c"
+WS_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+# Largest client WebSocket payload accepted: clients only send clicks, pings and closes
+MAX_CLIENT_FRAME = 4096
+VIEWER = Path(__file__).with_name("viewer.html")
+
+
+def table_message(world):
+    """The ``TABL`` message for the world's current balls."""
+    hexes = np.array([(hx.R, hx.missing) for hx in world.hexes], dtype=np.float64).reshape(-1, 2)
+    hex_rows = np.zeros(len(hexes), dtype=[("R", "<f4"), ("missing", "<i4")])
+    hex_rows["R"], hex_rows["missing"] = hexes[:, 0], hexes[:, 1]
+    balls = np.array([(*b.color, int(b.r)) for b in world.balls], dtype=np.uint8).reshape(-1, 4)
+    head = TABLE_HEAD.pack(b"TABL", world.roster_version, world.width, world.height,
+                           world.center.x, world.center.y, len(world.hexes), len(world.balls))
+    return head + hex_rows.tobytes() + balls.tobytes()
+
+
+def frame_message(world):
+    """The ``FRAM`` message for the world's current state."""
+    head = FRAME_HEAD.pack(b"FRAM", world.steps, world.roster_version, world.time, len(world.balls))
+    angles = np.array([hx.angle for hx in world.hexes], dtype="<f4")
+    return head + angles.tobytes() + positions_of(world.balls).astype("<f4").tobytes()
+
+
+def parse_table(data):
+    """(roster, size, centre, [(R, missing)], colours (n, 3) u8, radii (n,) u8) of a ``TABL`` message."""
+    _, roster, width, height, cx, cy, n_hex, n_balls = TABLE_HEAD.unpack_from(data)
+    offset = TABLE_HEAD.size
+    hexes = np.frombuffer(data, dtype=[("R", "<f4"), ("missing", "<i4")], count=n_hex, offset=offset)
+    offset += 8 * n_hex
+    balls = np.frombuffer(data, dtype=np.uint8, count=4 * n_balls, offset=offset).reshape(-1, 4)
+    return roster, (width, height), (cx, cy), hexes.tolist(), balls[:, :3], balls[:, 3]
+
+
+def parse_frame(data, n_hex):
+    """(step, roster, time, hexagon angles, ball centres (n, 2)) of a ``FRAM`` message."""
+    _, step, roster, t, n_balls = FRAME_HEAD.unpack_from(data)
+    offset = FRAME_HEAD.size
+    angles = np.frombuffer(data, dtype="<f4", count=n_hex, offset=offset)
+    xy = np.frombuffer(data, dtype="<f4", count=2 * n_balls, offset=offset + 4 * n_hex).reshape(-1, 2)
+    return step, roster, t, angles, xy
+
+
+def ws_accept(key):
+    return base64.b64encode(hashlib.sha1(key.encode("ascii") + WS_GUID).digest()).decode("ascii")
+
+
+def ws_frame(payload, opcode=0x2):
+    """One unmasked server-to-client WebSocket frame."""
+    n = len(payload)
+    if n < 126:
+        head = struct.pack("!BB", 0x80 | opcode, n)
+    elif n < 1 << 16:
+        head = struct.pack("!BBH", 0x80 | opcode, 126, n)
+    else:
+        head = struct.pack("!BBQ", 0x80 | opcode, 127, n)
+    return head + payload
+
+
+async def ws_read(reader):
+    """(opcode, payload) of the next client frame (clients always mask).
+
+    Frames longer than ``MAX_CLIENT_FRAME`` raise ``ConnectionError`` before
+    their payload is read, which drops the connection.
+    """
+    b0, b1 = await reader.readexactly(2)
+    n = b1 & 0x7F
+    if n == 126:
+        (n,) = struct.unpack("!H", await reader.readexactly(2))
+    elif n == 127:
+        (n,) = struct.unpack("!Q", await reader.readexactly(8))
+    if n > MAX_CLIENT_FRAME:
+        raise ConnectionError(f"client frame of {n} bytes, at most {MAX_CLIENT_FRAME} accepted")
+    mask = await reader.readexactly(4) if b1 & 0x80 else b"\0\0\0\0"
+    data = await reader.readexactly(n)
+    payload = (np.frombuffer(data, np.uint8) ^ np.resize(np.frombuffer(mask, np.uint8), n)).tobytes()
+    return b0 & 0x0F, payload
+
+
+class Viewer:
+    """One connected client: a mailbox of one pending table and the latest frame."""
+
+    def __init__(self, writer, websocket):
+        self.writer = writer
+        self.websocket = websocket
+        self.table = None
+        self.frame = None
+        # Key of the last table posted, so each viewer gets every change once
+        self.table_key = None
+        self.ready = asyncio.Event()
+        self.sent = 0
+        self.skipped = 0
+
+    def post(self, table, frame):
+        if table is not None:
+            self.table = table
+        if self.frame is not None:
+            self.skipped += 1
+        self.frame = frame
+        self.ready.set()
+
+    def _wrap(self, message):
+        return ws_frame(message) if self.websocket else struct.pack("<I", len(message)) + message
+
+    async def pump(self):
+        while True:
+            await self.ready.wait()
+            self.ready.clear()
+            table, frame = self.table, self.frame
+            self.table = self.frame = None
+            if table is not None:
+                self.writer.write(self._wrap(table))
+            if frame is not None:
+                self.writer.write(self._wrap(frame))
+                self.sent += 1
+            await self.writer.drain()
+
+
+class StateServer:
+    """Steps a :class:`World` and publishes its state to every attached viewer."""
+
+    def __init__(self, world, send_fps=60.0, free=False, schedule=()):
+        self.world = world
+        self.loop = FixedStepLoop(world)
+        self.send_dt = 1.0 / send_fps
+        self.free = free
+        self.schedule = sorted(schedule)
+        self.viewers = set()
+        self.published = 0
+        self._table = None
+        self._table_key = None
+
+    def click(self):
+        self.loop.click()
+
+    def current_table(self):
+        """The ``TABL`` message and its (roster, count) key, rebuilt only when the balls changed."""
+        world = self.world
+        key = (world.roster_version, len(world.balls))
+        if key != self._table_key:
+            self._table = table_message(world)
+            self._table_key = key
+        return self._table, key
+
+    def publish(self):
+        table, key = self.current_table()
+        frame = frame_message(self.world)
+        for viewer in self.viewers:
+            viewer.post(table if viewer.table_key != key else None, frame)
+            viewer.table_key = key
+        self.published += 1
+
+    def _scheduled_clicks(self):
+        world, pending = self.world, self.schedule
+        while pending and pending[0] <= world.steps:
+            pending.pop(0)
+            self.loop.click()
+
+    async def run(self, seconds=None):
+        """Step and publish until cancelled (or for ``seconds`` of wall time)."""
+        clock = time.perf_counter
+        start = last = next_send = clock()
+        while seconds is None or clock() - start < seconds:
+            now = clock()
+            self._scheduled_clicks()
+            if self.free:
+                self.loop.step()
+            else:
+                self.loop.advance(now - last)
+            last = now
+            if now >= next_send:
+                self.publish()
+                next_send = max(next_send + self.send_dt, now)
+            if self.free:
+                await asyncio.sleep(0)
+            else:
+                wake = min(next_send, now + STEP_DT)
+                await asyncio.sleep(max(0.0, wake - clock()))
+
+    async def handle(self, reader, writer):
+        try:
+            first = await reader.readexactly(4)
+            if first == HELLO:
+                await self._serve(reader, writer, websocket=False)
+            elif first == b"GET ":
+                request = first + await reader.readuntil(b"\r\n\r\n")
+                headers = {}
+                for line in request.decode("latin-1").split("\r\n")[1:]:
+                    name, _, value = line.partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                if headers.get("upgrade", "").lower() == "websocket":
+                    key = headers.get("sec-websocket-key")
+                    if not key:
+                        writer.write(b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+                        await writer.drain()
+                        return
+                    writer.write(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                                  f"Sec-WebSocket-Accept: {ws_accept(key)}\r\n\r\n").encode("ascii"))
+                    await self._serve(reader, writer, websocket=True)
+                else:
+                    page = VIEWER.read_bytes()
+                    writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/html; charset=utf-8\r\n"
+                                 + f"Content-Length: {len(page)}\r\nConnection: close\r\n\r\n".encode("ascii") + page)
+                    await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.LimitOverrunError):
+            pass
+        finally:
+            writer.close()
+
+    async def _serve(self, reader, writer, websocket):
+        viewer = Viewer(writer, websocket)
+        table, viewer.table_key = self.current_table()
+        viewer.post(table, frame_message(self.world))
+        self.viewers.add(viewer)
+        pump = asyncio.ensure_future(viewer.pump())
+        try:
+            while not pump.done():
+                if websocket:
+                    opcode, payload = await ws_read(reader)
+                    if opcode == 0x8:
+                        writer.write(ws_frame(payload[:2], opcode=0x8))
+                        break
+                    if opcode == 0x9:
+                        writer.write(ws_frame(payload, opcode=0xA))
+                    elif opcode in (0x1, 0x2) and payload == CLICK:
+                        self.click()
+                else:
+                    data = await reader.read(64)
+                    if not data:
+                        break
+                    for _ in range(data.count(CLICK)):
+                        self.click()
+        finally:
+            self.viewers.discard(viewer)
+            pump.cancel()
+
+
+async def read_messages(reader):
+    """Messages from a raw TCP connection, after the hello has been sent."""
+    while True:
+        (n,) = struct.unpack("<I", await reader.readexactly(4))
+        yield await reader.readexactly(n)
+
+
+def build_world(args):
+    if args.scenario:
+        from .scenario import load_scenario
+
+        scenario = load_scenario(args.scenario)
+        return scenario.build_world(), scenario.schedule
+    return World(seed=args.seed), spawn_schedule(args.spawn_every, args.spawn_total)
+
+
+def serve(args):
+    world, schedule = build_world(args)
+    server = StateServer(world, send_fps=args.send_fps, free=args.free, schedule=schedule)
+
+    async def main():
+        listener = await asyncio.start_server(server.handle, args.host, args.port)
+        print(f"Serving on {args.host}:{args.port}: open http://{args.host}:{args.port}/ "
+              f"or run python -m ballsim.server view --port {args.port}")
+        async with listener:
+            await server.run()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+    print(f"Steps: {world.steps}, {len(world.balls)} balls, {server.published} frames published")
+
+
+def view(args):
+    """pygame viewer: renders the streamed state, clicks go back to the server."""
+    import os
+
+    import pygame
+
+    from .render import Renderer
+
+    async def main():
+        reader, writer = await asyncio.open_connection(args.host, args.port)
+        writer.write(HELLO)
+        messages = read_messages(reader)
+        pygame.init()
+        screen = None
+        renderer = None
+        mirror = None
+        frames = 0
+        try:
+            async for data in messages:
+                if data[:4] == b"TABL":
+                    roster, size, centre, hexes, colors, radii = parse_table(data)
+                    if screen is None:
+                        screen = pygame.display.set_mode(size)
+                        pygame.display.set_caption("旋转六边形盒子 - 远程视图")
+                        renderer = Renderer(screen, tip="左键点击 向服务器发送点击 | 物理在服务器端运行", raster=args.raster)
+                    mirror = _Mirror(mirror, roster, centre, hexes, colors, radii)
+                    continue
+                if mirror is None:
+                    continue
+                _, _, _, angles, xy = parse_frame(data, len(mirror.hexes))
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT:
+                        return frames
+                    if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                        writer.write(CLICK)
+                n = min(len(xy), len(mirror.balls))
+                pygame.display.update(renderer.draw(mirror, xy[:n].tolist(), angles.tolist()))
+                frames += 1
+                if args.frames and frames >= args.frames:
+                    return frames
+        finally:
+            writer.close()
+            pygame.quit()
+        return frames
+
+    if os.environ.get("SDL_VIDEODRIVER") is None:
+        from .play import has_display
+
+        if not has_display():
+            os.environ["SDL_VIDEODRIVER"] = "dummy"
+    try:
+        frames = asyncio.run(main())
+    except (ConnectionError, asyncio.IncompleteReadError):
+        frames = None
+    print(f"Viewer closed after {frames} frames" if frames is not None else "Connection to the server lost")
+
+
+class _Mirror:
+    """Just enough of a :class:`World` for :class:`ballsim.render.Renderer`, rebuilt from tables."""
+
+    def __init__(self, previous, roster, centre, hexes, colors, radii):
+        self.roster_version = roster
+        self.center = sim.Vec2(centre)
+        self.hexes = [sim.RotatingHex(R, 0.0, missing) for R, missing in hexes]
+        balls = previous.balls if previous is not None and previous.roster_version == roster else []
+        balls = balls[:len(colors)]
+        for color, r in zip(colors[len(balls):].tolist(), radii[len(balls):].tolist()):
+            balls.append(sim.Ball((0.0, 0.0), (0.0, 0.0), r, tuple(color)))
+        self.balls = balls
+
+
+def bench(args):
+    """Free-running physics throughput with 0, 1, ... raw TCP viewers attached."""
+
+    async def drain(port, counts):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(HELLO)
+        try:
+            async for data in read_messages(reader):
+                if data[:4] == b"FRAM":
+                    counts.append(1)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def case(clients):
+        world = World(seed=args.seed)
+        server = StateServer(world, send_fps=args.send_fps, free=True,
+                             schedule=spawn_schedule(args.spawn_every, args.spawn_total))
+        listener = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        counts = [[] for _ in range(clients)]
+        tasks = [asyncio.ensure_future(drain(port, c)) for c in counts]
+        while len(server.viewers) < clients:
+            await asyncio.sleep(0.01)
+        start = time.perf_counter()
+        await server.run(args.seconds)
+        elapsed = time.perf_counter() - start
+        listener.close()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        received = min((len(c) for c in counts), default=0)
+        return world.steps / elapsed, server.published / elapsed, received / elapsed, len(world.balls)
+
+    print(f"{'viewers':>8}{'steps/s':>10}{'published/s':>13}{'received/s':>12}{'balls':>7}")
+    for clients in args.clients:
+        steps, published, received, balls = asyncio.run(case(clients))
+        print(f"{clients:>8}{steps:>10.0f}{published:>13.1f}{received:>12.1f}{balls:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream the headless physics to browser and pygame viewers")
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve_p = sub.add_parser("serve", help="Run the physics and accept viewers")
+    serve_p.add_argument("--host", default="127.0.0.1")
+    serve_p.add_argument("--port", type=int, default=8765)
+    serve_p.add_argument("--send-fps", type=float, default=60.0, help="State frames published per second")
+    serve_p.add_argument("--free", action="store_true", help="Step as fast as possible instead of in real time")
+    serve_p.add_argument("--scenario", type=str, help="Scenario file for the world and its scripted clicks")
+    serve_p.add_argument("--spawn-every", type=int, default=60, help="Steps between scripted clicks")
+    serve_p.add_argument("--spawn-total", type=int, default=0, help="Scripted clicks (viewers can click too)")
+    serve_p.add_argument("--seed", type=int, default=0)
+    view_p = sub.add_parser("view", help="pygame viewer for a running server")
+    view_p.add_argument("--host", default="127.0.0.1")
+    view_p.add_argument("--port", type=int, default=8765)
+    view_p.add_argument("--raster", action="store_true", help="Draw balls with the batch disc rasterizer (needs Numba)")
+    view_p.add_argument("--frames", type=int, default=0, help="Close after this many frames (0: on window close)")
+    bench_p = sub.add_parser("bench", help="Physics throughput with several raw TCP viewers attached")
+    bench_p.add_argument("--clients", type=int, nargs="+", default=[0, 1, 4])
+    bench_p.add_argument("--seconds", type=float, default=5.0)
+    bench_p.add_argument("--send-fps", type=float, default=60.0)
+    bench_p.add_argument("--spawn-every", type=int, default=5)
+    bench_p.add_argument("--spawn-total", type=int, default=200)
+    bench_p.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    {"serve": serve, "view": view, "bench": bench}[args.command](args)
+
+
+if __name__ == "__main__":
+    main()
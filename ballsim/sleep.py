@@ -0,0 +1,311 @@
+"""Sleeping islands for resting balls.
+
+Balls that stay slow for ``frames`` consecutive steps become candidates.
+Every ``check_every`` steps the candidates are grouped into islands of
+touching balls (union-find over a uniform grid); an island falls asleep when
+all of its members are candidates and it touches no moving ball and no
+moving wall.
+
+Sleeping balls are skipped by integration, pair, wall and clamp work. An
+island wakes as a whole the moment an awake ball touches its bounding box
+and one of its members, or a rotating hexagon's side comes within one
+step's sweep of a member (``|omega| * R * STEP_DT`` plus the contact
+margin). Islands inside a wall annulus may sleep until that happens, so
+per-step cost follows the awake ball count.
+
+Only balls that actually come to rest can sleep, and in gpt-5 few do: walls
+and clamp are perfectly elastic, each wall contact pushes the ball 0.2 px
+further out (a ball on a side bounces ever higher), and the pair response
+adds energy. The scenarios show where that leaves sleeping:
+
+- ``floor``: a row on the bottom clamp, the one place balls rest, plus a
+  few live balls. Sleeping skips the row (about 10x less per step here).
+- ``sweep``: the same row in the annulus of one large rotating hexagon
+  whose corners reach the floor. The row sleeps until a corner comes
+  round, which wakes it; the struck balls then never settle again.
+- ``clicks``: a clicked run in gpt-5's hexagons. No ball ever drops below
+  ``SLEEP_SPEED`` (with the ``colored`` solver the median is still some
+  hundreds of px/s), so nothing sleeps and the system only costs its
+  bookkeeping.
+
+    python -m ballsim.sleep floor --rest 40 --active 5
+    python -m ballsim.sleep sweep --radius 430 --omega 0.4
+    python -m ballsim.sleep clicks --clicks 150 --spawn-every 5 --steps 1500
+"""
+import argparse
+import math
+import time
+
+from .headless import run_schedule, spawn_schedule
+from .world import MARGIN, STEP_DT, World, sim
+
+SLEEP_SPEED = 15.0   # px/s
+SLEEP_FRAMES = 30    # steps below SLEEP_SPEED before a ball may sleep
+CONTACT_MARGIN = 1.0  # px of slack when deciding that two balls touch
+
+_COS30 = math.cos(math.pi / 6.0)
+
+
+class Island:
+    """A group of touching balls that sleep and wake together."""
+
+    __slots__ = ("balls", "walls", "x0", "y0", "x1", "y1")
+
+    def __init__(self, balls, walls=()):
+        self.balls = balls
+        # Rotating hexagons whose swept annulus the island lies in
+        self.walls = walls
+        self.x0 = min(b.pos.x - b.r for b in balls)
+        self.y0 = min(b.pos.y - b.r for b in balls)
+        self.x1 = max(b.pos.x + b.r for b in balls)
+        self.y1 = max(b.pos.y + b.r for b in balls)
+
+    def touches(self, ball, margin):
+        x, y, r = ball.pos.x, ball.pos.y, ball.r + margin
+        if x + r < self.x0 or x - r > self.x1 or y + r < self.y0 or y - r > self.y1:
+            return False
+        for b in self.balls:
+            reach = r + b.r
+            dx, dy = b.pos.x - x, b.pos.y - y
+            if dx * dx + dy * dy <= reach * reach:
+                return True
+        return False
+
+
+class SleepSystem:
+    """Tracks awake balls and sleeping islands for a :class:`World`."""
+
+    def __init__(self, world, speed=SLEEP_SPEED, frames=SLEEP_FRAMES, check_every=10):
+        if world.contacts is not None:
+            raise ValueError("ContactCache and SleepSystem cannot be combined")
+        self.world = world
+        self.speed = speed
+        self.frames = frames
+        self.check_every = check_every
+        self.awake = list(world.balls)
+        self.islands = []
+        self.calm = {}
+        self.wakeups = 0
+        self.wall_wakeups = 0
+        world.sleep = self
+
+    @property
+    def sleeping(self):
+        return sum(len(island.balls) for island in self.islands)
+
+    def add(self, ball):
+        self.awake.append(ball)
+
+    def wake_touched(self):
+        """Wake every island touched by an awake ball."""
+        if not self.islands:
+            return
+        woken = []
+        for island in self.islands:
+            for b in self.awake:
+                if island.touches(b, CONTACT_MARGIN):
+                    woken.append(island)
+                    break
+        for island in woken:
+            self.islands.remove(island)
+            self.awake.extend(island.balls)
+            self.wakeups += 1
+
+    def update(self):
+        """Per-step bookkeeping: wake islands a wall reaches, count calm steps, put islands to sleep."""
+        self._wake_by_walls()
+        limit2 = self.speed * self.speed
+        calm = self.calm
+        for b in self.awake:
+            key = id(b)
+            if b.vel.length_squared() < limit2:
+                calm[key] = calm.get(key, 0) + 1
+            else:
+                calm[key] = 0
+
+        if self.world.steps % self.check_every == 0:
+            self._form_islands()
+
+    def _swept(self, ball):
+        """Rotating hexagons whose annulus, widened by one step's sweep, reaches ``ball``."""
+        cx, cy = self.world.center.x, self.world.center.y
+        rho = math.hypot(ball.pos.x - cx, ball.pos.y - cy)
+        found = []
+        for hx in self.world.hexes:
+            if hx.omega == 0.0:
+                continue
+            reach = ball.r + CONTACT_MARGIN + abs(hx.omega) * hx.R * STEP_DT
+            if rho + reach >= hx.R * _COS30 and rho - reach <= hx.R:
+                found.append(hx)
+        return found
+
+    @staticmethod
+    def _wall_touches(hx, balls):
+        """Whether a present side of rotating ``hx`` is within one step's sweep of any of ``balls``."""
+        verts = hx.vertices()
+        sweep = CONTACT_MARGIN + abs(hx.omega) * hx.R * STEP_DT
+        for b in balls:
+            reach = b.r + sweep
+            for k in range(6):
+                if k == hx.missing:
+                    continue
+                cp = sim.closest_point_on_segment(verts[k], verts[(k + 1) % 6], b.pos)
+                if (b.pos - cp).length_squared() <= reach * reach:
+                    return True
+        return False
+
+    def _wake_by_walls(self):
+        woken = [island for island in self.islands
+                 if any(self._wall_touches(hx, island.balls) for hx in island.walls)]
+        for island in woken:
+            self.islands.remove(island)
+            self.awake.extend(island.balls)
+            self.wakeups += 1
+            self.wall_wakeups += 1
+
+    def _form_islands(self):
+        awake = self.awake
+        n = len(awake)
+        if n == 0:
+            return
+
+        # Uniform grid over awake balls; cells one ball diameter wide
+        cell = 2.0 * self.world.ball_radius + CONTACT_MARGIN
+        grid = {}
+        for i, b in enumerate(awake):
+            grid.setdefault((int(b.pos.x // cell), int(b.pos.y // cell)), []).append(i)
+
+        parent = list(range(n))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for (gx, gy), members in grid.items():
+            for ox in (-1, 0, 1):
+                for oy in (-1, 0, 1):
+                    others = grid.get((gx + ox, gy + oy))
+                    if not others:
+                        continue
+                    for i in members:
+                        bi = awake[i]
+                        for j in others:
+                            if j <= i:
+                                continue
+                            bj = awake[j]
+                            reach = bi.r + bj.r + CONTACT_MARGIN
+                            dx, dy = bj.pos.x - bi.pos.x, bj.pos.y - bi.pos.y
+                            if dx * dx + dy * dy <= reach * reach:
+                                ri, rj = find(i), find(j)
+                                if ri != rj:
+                                    parent[ri] = rj
+
+        groups = {}
+        for i in range(n):
+            groups.setdefault(find(i), []).append(i)
+
+        frames = self.frames
+        calm = self.calm
+        sleepers = set()
+        for members in groups.values():
+            if any(calm.get(id(awake[i]), 0) < frames for i in members):
+                continue
+            balls = [awake[i] for i in members]
+            walls = list({id(hx): hx for b in balls for hx in self._swept(b)}.values())
+            if any(self._wall_touches(hx, balls) for hx in walls):
+                continue
+            island = Island(balls, walls)
+            for b in island.balls:
+                b.vel.x = b.vel.y = 0.0
+                calm.pop(id(b), None)
+            self.islands.append(island)
+            sleepers.update(members)
+
+        if sleepers:
+            self.awake = [b for i, b in enumerate(awake) if i not in sleepers]
+
+
+def floor_pile(world, count):
+    """Lay ``count`` balls in staggered rows on the bottom clamp, just apart.
+
+    gpt-5's pair response cannot hold a stack (it separates touching balls
+    by adding energy), so only the bottom row stays at rest for long.
+    """
+    r = world.ball_radius
+    gap = 0.5
+    pitch = 2.0 * r + gap
+    per_row = int((world.width - 2 * MARGIN - r) // pitch)
+    for k in range(count):
+        row, col = divmod(k, per_row)
+        x = MARGIN + col * pitch + (r if row % 2 else 0.0)
+        y = world.height - MARGIN - row * 1.8 * r
+        world.spawn((x, y), (0.0, 0.0))
+
+
+def _compare(make, schedule, settle, steps):
+    """Time ``steps`` steps after ``settle`` with and without sleeping islands."""
+    for use_sleep in (False, True):
+        world = make()
+        system = SleepSystem(world) if use_sleep else None
+        run_schedule(world, settle, [s for s in schedule if s < settle])
+        start = time.perf_counter()
+        run_schedule(world, steps, [s for s in schedule if s >= settle])
+        elapsed = time.perf_counter() - start
+        label = "sleep" if use_sleep else "no sleep"
+        awake = len(system.awake) if system else len(world.balls)
+        slow = sum(1 for b in world.balls if b.vel.length() < SLEEP_SPEED)
+        print(f"{label:<10}{1000.0 * elapsed / steps:>9.2f} ms/step  {awake:>5} awake of {len(world.balls)}"
+              f" ({slow} below {SLEEP_SPEED:g} px/s)"
+              + (f", {len(system.islands)} islands, {system.wakeups} wake-ups ({system.wall_wakeups} by walls)"
+                 if system else ""))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare step time with and without sleeping islands")
+    sub = parser.add_subparsers(dest="scenario", required=True)
+    floor_p = sub.add_parser("floor", help="A resting row on the bottom clamp plus a few live balls")
+    floor_p.add_argument("--rest", type=int, default=40, help="Balls laid on the floor")
+    floor_p.add_argument("--active", type=int, default=5, help="Balls released from the centre")
+    floor_p.add_argument("--settle", type=int, default=120, help="Steps before timing starts")
+    floor_p.add_argument("--steps", type=int, default=300, help="Timed steps")
+    clicks_p = sub.add_parser("clicks", help="Balls clicked into the rotating hexagons")
+    clicks_p.add_argument("--clicks", type=int, default=150, help="Balls released from the centre")
+    clicks_p.add_argument("--spawn-every", type=int, default=5, help="Steps between clicks")
+    clicks_p.add_argument("--steps", type=int, default=1500, help="Steps in all")
+    clicks_p.add_argument("--measure", type=int, default=300, help="Timed steps at the end")
+    clicks_p.add_argument("--contact-solver", choices=["sequential", "colored"], default="sequential",
+                          help="Ball-ball contact resolution")
+    sweep_p = sub.add_parser("sweep", help="The floor row inside the annulus of one large rotating hexagon")
+    sweep_p.add_argument("--rest", type=int, default=40, help="Balls laid on the floor")
+    sweep_p.add_argument("--radius", type=float, default=430.0, help="Hexagon circumradius (its corners reach the floor)")
+    sweep_p.add_argument("--omega", type=float, default=0.4, help="Hexagon angular velocity, rad/s")
+    sweep_p.add_argument("--settle", type=int, default=120, help="Steps before timing starts")
+    sweep_p.add_argument("--steps", type=int, default=600, help="Timed steps")
+    for p in (floor_p, clicks_p, sweep_p):
+        p.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.scenario == "floor":
+        def make():
+            world = World(seed=args.seed, backend="python")
+            floor_pile(world, args.rest)
+            return world
+        _compare(make, spawn_schedule(3, args.active, start=args.settle), args.settle, args.steps)
+    elif args.scenario == "sweep":
+        def make():
+            world = World(hex_radii=[args.radius], omegas=[args.omega], missing=-1, seed=args.seed, backend="python")
+            floor_pile(world, args.rest)
+            return world
+        _compare(make, (), args.settle, args.steps)
+    else:
+        def make():
+            return World(seed=args.seed, contact_solver=args.contact_solver,
+                         broadphase="sap" if args.contact_solver == "colored" else "brute", backend="python")
+        _compare(make, spawn_schedule(args.spawn_every, args.clicks),
+                 args.steps - args.measure, args.measure)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""Snapshots of a whole :class:`World`, restored in milliseconds.
+
+File layout (little-endian)::
+
+    b"BSNP" | u32 meta length | meta JSON | zero padding to 64 bytes
+    u32[625] Mersenne Twister key       (``random.getstate()``)
+    ball records                        (``BALL_DTYPE``, one per ball, in order)
+
+The meta JSON holds the step counter, simulated time, ball-step count,
+the world's settings (gravity, substeps, ball radius, broadphase, contact
+solver, wall collision, swept collisions), every hexagon's radius, speed,
+missing side and angle, and the rest of the RNG state. Ball records keep
+x, y, vx, vy and radius as float64, so a restored world continues exactly
+like the original; ``make`` checks that by stepping both and comparing
+digests.
+
+:func:`read_balls` memory-maps the ball records without copying;
+:func:`load_snapshot` builds the ``Ball`` objects from them. Attached
+systems (energy monitor, sleeping islands, lifecycle) are not saved.
+
+    python -m ballsim.snapshot make pile.bsnp --balls 5000 --radius 4 --settle 240
+    python -m ballsim.snapshot info pile.bsnp
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import time
+
+import numpy as np
+
+from .headless import run_schedule
+from .loop import state_bytes
+from .world import World, sim
+
+MAGIC = b"BSNP"
+VERSION = 1
+ALIGN = 64
+RNG_WORDS = 625
+
+BALL_DTYPE = np.dtype([
+    ("x", "<f8"), ("y", "<f8"), ("vx", "<f8"), ("vy", "<f8"), ("radius", "<f8"), ("color", "u1", (3,)),
+])
+
+
+def _pad(n):
+    return -n % ALIGN
+
+
+def save_snapshot(world, path):
+    """Write ``world``'s complete state to ``path``; return the file size."""
+    version, key, gauss = world.rng.getstate()
+    solver = world.solver
+    meta = {
+        "version": VERSION,
+        "steps": world.steps,
+        "time": world.time,
+        "ball_steps": world.ball_steps,
+        "roster_version": world.roster_version,
+        "balls": len(world.balls),
+        "gravity": world.gravity,
+        "substeps": world.substeps,
+        "ball_radius": world.ball_radius,
+        "broadphase": world.broadphase.name,
+        "contact_solver": solver.name,
+        "solver_options": {k: getattr(solver, k) for k in ("iterations", "restitution") if hasattr(solver, k)},
+        "wall_collision": world.walls.name,
+        "ccd": world.ccd is not None,
+        "hexes": [{"R": hx.R, "omega": hx.omega, "missing": hx.missing, "angle": hx.angle} for hx in world.hexes],
+        "rng": {"version": version, "gauss": gauss},
+    }
+    balls = np.empty(len(world.balls), dtype=BALL_DTYPE)
+    if len(balls):
+        balls["x"], balls["y"], balls["vx"], balls["vy"], balls["radius"] = np.array(
+            [(b.pos.x, b.pos.y, b.vel.x, b.vel.y, b.r) for b in world.balls]).T
+        balls["color"] = [b.color for b in world.balls]
+    blob = json.dumps(meta).encode("utf-8")
+    head = MAGIC + struct.pack("<I", len(blob)) + blob
+    with open(path, "wb") as f:
+        f.write(head + bytes(_pad(len(head))))
+        f.write(np.asarray(key, dtype="<u4").tobytes())
+        f.write(bytes(_pad(4 * RNG_WORDS)))
+        f.write(balls.tobytes())
+        return f.tell()
+
+
+class SnapshotFile:
+    """A memory-mapped snapshot: ``meta``, ``rng_key`` and ``balls`` are views of the file."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        mm = self._mm
+        if mm[:4] != MAGIC:
+            raise ValueError(f"{path} is not a snapshot file")
+        (size,) = struct.unpack_from("<I", mm, 4)
+        self.meta = json.loads(mm[8:8 + size].decode("utf-8"))
+        if self.meta["version"] != VERSION:
+            raise ValueError(f"Unsupported snapshot version {self.meta['version']}")
+        offset = 8 + size
+        offset += _pad(offset)
+        self.rng_key = np.frombuffer(mm, dtype="<u4", count=RNG_WORDS, offset=offset)
+        offset += 4 * RNG_WORDS
+        offset += _pad(offset)
+        self.balls = np.frombuffer(mm, dtype=BALL_DTYPE, count=self.meta["balls"], offset=offset)
+
+    def close(self):
+        # Drop the views before unmapping
+        self.rng_key = self.balls = None
+        self._mm.close()
+
+
+def read_balls(path):
+    """Ball records of a snapshot as a read-only structured array over the mapped file."""
+    return SnapshotFile(path).balls
+
+
+def load_snapshot(path, backend="auto"):
+    """A :class:`World` in exactly the saved state (``backend`` is not part of the state)."""
+    snap = SnapshotFile(path)
+    try:
+        meta = snap.meta
+        hexes = meta["hexes"]
+        world = World(hex_radii=[h["R"] for h in hexes], omegas=[h["omega"] for h in hexes], missing=0,
+                      gravity=meta["gravity"], substeps=meta["substeps"], ball_radius=meta["ball_radius"],
+                      ccd=meta["ccd"], broadphase=meta["broadphase"], contact_solver=meta["contact_solver"],
+                      wall_collision=meta["wall_collision"], backend=backend)
+        for name, value in meta["solver_options"].items():
+            setattr(world.solver, name, value)
+        for hx, h in zip(world.hexes, hexes):
+            hx.missing = h["missing"]
+            hx.angle = h["angle"]
+        rng = meta["rng"]
+        world.rng.setstate((rng["version"], tuple(snap.rng_key.tolist()), rng["gauss"]))
+        world.steps = meta["steps"]
+        world.time = meta["time"]
+        world.ball_steps = meta["ball_steps"]
+        world.roster_version = meta["roster_version"]
+
+        balls = snap.balls
+        columns = [balls[name].tolist() for name in BALL_DTYPE.names]
+        del balls
+        # Built directly rather than through spawn(), which would draw colours from the RNG
+        ball = sim.Ball
+        world.balls = [ball((x, y), (vx, vy), r, tuple(color)) for x, y, vx, vy, r, color in zip(*columns)]
+    finally:
+        snap.close()
+    return world
+
+
+def make(args):
+    from .solver import box_pile
+
+    world = World(seed=args.seed, ball_radius=args.radius, broadphase=args.broadphase,
+                  contact_solver=args.contact_solver)
+    box_pile(world, args.balls)
+    start = time.perf_counter()
+    run_schedule(world, args.settle, ())
+    settle = time.perf_counter() - start
+    print(f"Settled {len(world.balls)} balls for {args.settle} steps in {settle:.1f}s")
+
+    start = time.perf_counter()
+    size = save_snapshot(world, args.path)
+    saved = time.perf_counter() - start
+    start = time.perf_counter()
+    restored = load_snapshot(args.path)
+    loaded = time.perf_counter() - start
+    print(f"Snapshot: {size / 1e6:.2f} MB, saved in {1000.0 * saved:.1f} ms, restored in {1000.0 * loaded:.1f} ms")
+
+    # The restored world must continue exactly like the original
+    digests = []
+    for w in (world, restored):
+        run_schedule(w, args.verify, ())
+        digests.append(state_bytes(w))
+    print(f"After {args.verify} more steps the restored run is {'identical' if digests[0] == digests[1] else 'DIFFERENT'}")
+
+
+def info(args):
+    snap = SnapshotFile(args.path)
+    meta = snap.meta
+    print(f"{meta['balls']} balls at step {meta['steps']} ({meta['time']:.2f}s), {len(meta['hexes'])} hexagons, "
+          f"{meta['broadphase']}/{meta['contact_solver']}/{meta['wall_collision']}, {os.path.getsize(args.path) / 1e6:.2f} MB")
+    snap.close()
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        load_snapshot(args.path)
+        timings.append(time.perf_counter() - start)
+    print(f"Restore: {1000.0 * min(timings):.1f} ms best of {args.repeat}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Save, inspect and time world snapshots")
+    sub = parser.add_subparsers(dest="command", required=True)
+    mk = sub.add_parser("make", help="Settle a floor pile, snapshot it and check the restore")
+    mk.add_argument("path", type=str)
+    mk.add_argument("--balls", type=int, default=5000)
+    mk.add_argument("--radius", type=float, default=4.0, help="Ball radius (5,000 of gpt-5's 10 px do not fit)")
+    mk.add_argument("--settle", type=int, default=240, help="Steps to run before saving")
+    mk.add_argument("--broadphase", choices=["brute", "sap"], default="sap")
+    mk.add_argument("--contact-solver", choices=["sequential", "colored"], default="colored",
+                    help="gpt-5's sequential response cannot hold a pile at rest")
+    mk.add_argument("--verify", type=int, default=30, help="Steps run on both worlds after restoring")
+    mk.add_argument("--seed", type=int, default=0)
+    inf = sub.add_parser("info", help="Summarise a snapshot and time restoring it")
+    inf.add_argument("path", type=str)
+    inf.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    {"make": make, "info": info}[args.command](args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Tunnelling stress test: fire fast balls inside closed hexagons and count escapes.
+
+The hexagons are closed (no missing side), so any ball found outside the
+innermost hexagon must have tunnelled through a wall. Compares the discrete
+engine at several substep counts against the swept (CCD) engine.
+
+A second, crowded case packs more balls at a higher speed into the 90 px
+hexagon. There gpt-5's ball-ball response keeps adding energy until speeds
+run away, every CCD substep spends its whole impact budget, and what keeps
+the balls in is the stepper's fallback past the cap: wall-only sweeps for
+the rest of the substep, and sweeps over the discrete pass's pushes.
+
+    python -m ballsim.stress --balls 12 --speed 4000 --steps 600
+    python -m ballsim.stress --crowd-balls 30 --crowd-speed 8000 --crowd-steps 120
+"""
+import argparse
+import math
+import random
+import time
+
+from .world import World
+
+
+def fire(world, count, speed, seed):
+    """Spawn ``count`` balls near the centre with random headings at ``speed`` px/s."""
+    rng = random.Random(seed)
+    cx, cy = world.center.x, world.center.y
+    for _ in range(count):
+        heading = rng.uniform(0.0, math.tau)
+        jitter = rng.uniform(0.0, 30.0)
+        pos = (cx + jitter * math.cos(heading + 1.0), cy + jitter * math.sin(heading + 1.0))
+        vel = (speed * math.cos(heading), speed * math.sin(heading))
+        world.spawn(pos, vel)
+
+
+def run_case(substeps, ccd, balls, speed, steps, args):
+    """Run one configuration and return (escaped balls, seconds, stepper)."""
+    world = World(missing=-1, substeps=substeps, ccd=ccd, seed=args.seed)
+    fire(world, balls, speed, args.seed)
+
+    escaped = set()
+    dt = 1.0 / args.fps
+    start = time.perf_counter()
+    for _ in range(steps):
+        world.step(dt)
+        for idx, b in enumerate(world.balls):
+            if idx not in escaped and world.hex_index_of(b.pos) > 0:
+                escaped.add(idx)
+    elapsed = time.perf_counter() - start
+    return len(escaped), elapsed, world.ccd
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Count high-velocity balls tunnelling out of closed hexagons")
+    parser.add_argument("--balls", type=int, default=12, help="Balls fired from the centre")
+    parser.add_argument("--speed", type=float, default=4000.0, help="Launch speed in px/s")
+    parser.add_argument("--steps", type=int, default=600, help="Frames to simulate")
+    parser.add_argument("--fps", type=float, default=120.0, help="Frame rate (frame dt = 1/fps)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--substeps", type=int, nargs="+", default=[1, 3, 8], help="Discrete substep counts to compare")
+    parser.add_argument("--crowd-balls", type=int, default=30, help="Balls in the crowded case (0 skips it)")
+    parser.add_argument("--crowd-speed", type=float, default=8000.0, help="Launch speed of the crowded case")
+    parser.add_argument("--crowd-steps", type=int, default=120, help="Frames of the crowded case")
+    args = parser.parse_args()
+
+    failures = 0
+    runs = [(args.balls, args.speed, args.steps, args.substeps)]
+    if args.crowd_balls:
+        runs.append((args.crowd_balls, args.crowd_speed, args.crowd_steps, [3]))
+    for balls, speed, steps, substeps_list in runs:
+        print(f"{balls} balls at {speed:.0f} px/s, {steps} frames at {args.fps:.0f} FPS")
+        print(f"{'engine':<22}{'escaped':>9}{'seconds':>10}{'impacts':>10}")
+        cases = [(n, False) for n in substeps_list] + [(1, True)]
+        for substeps, ccd in cases:
+            escaped, elapsed, stepper = run_case(substeps, ccd, balls, speed, steps, args)
+            label = f"{'ccd' if ccd else 'discrete'} x{substeps}"
+            impacts = f"{stepper.events}" if stepper else "-"
+            print(f"{label:<22}{escaped:>9}{elapsed:>10.2f}{impacts:>10}")
+            if ccd:
+                if stepper.capped:
+                    print(f"  warning: {stepper.capped} substeps hit the impact cap, "
+                          f"{stepper.overflowed} the wall budget too")
+                failures += escaped
+        print()
+
+    if failures:
+        raise SystemExit(f"CCD let {failures} balls escape")
+
+
+if __name__ == "__main__":
+    main()
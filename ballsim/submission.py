@@ -0,0 +1,29 @@
+"""Import one-shot python-ball submissions as regular modules."""
+import importlib.util
+from pathlib import Path
+
+SUBMISSION_DIR = Path(__file__).resolve().parent.parent / "one-shot" / "python-ball"
+
+_loaded = {}
+
+
+def submission_path(name):
+    """Return the path of ``one-shot/python-ball/<name>.py``."""
+    return SUBMISSION_DIR / f"{name}.py"
+
+
+def load_submission(name):
+    """Load a submission by file stem (e.g. ``"gpt-5"``), caching the module."""
+    if name in _loaded:
+        return _loaded[name]
+
+    path = submission_path(name)
+    if not path.exists():
+        raise FileNotFoundError(f"Submission not found: {path}")
+
+    module_name = "python_ball_" + name.replace("-", "_").replace(".", "_")
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    _loaded[name] = module
+    return module
@@ -0,0 +1,293 @@
+"""Parameter sweeps of the hexagon simulation across a process pool.
+
+A grid file lists values for the hexagon radii, angular velocities, substep
+count and gravity; every combination is run headlessly for each seed. The
+seed places each release: clicks land at a random point within
+``spawn_jitter`` px (default 2) of the centre, so replicates differ in
+their dynamics and not only in ball colours. The geometry table (radii +
+omegas per combination) is placed in shared memory once and each worker
+reads its row from there.
+
+Results stream to a columnar directory: one raw little-endian file per
+column plus ``schema.json``. Rerunning the same command resumes: finished
+run ids are read back and skipped, and a half-written trailing row is
+truncated away.
+
+    python -m ballsim.sweep run ballsim/grids/example.json results/example
+    python -m ballsim.sweep show results/example
+"""
+import argparse
+import itertools
+import json
+import math
+import os
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+from pathlib import Path
+
+import numpy as np
+
+from .headless import run_schedule, spawn_schedule
+from .world import Vec2, World
+
+COLUMNS = [
+    ("run_id", "<i8"),
+    ("geometry", "<i8"),
+    ("substeps", "<i8"),
+    ("gravity", "<f8"),
+    ("seed", "<i8"),
+    ("balls", "<i8"),
+    ("escaped", "<i8"),
+    ("escape_rate", "<f8"),
+    ("energy_ref", "<f8"),
+    ("energy_end", "<f8"),
+    ("energy_drift", "<f8"),
+    ("max_speed", "<f8"),
+    ("seconds", "<f8"),
+]
+
+# Rows buffered before each flush to disk
+FLUSH_EVERY = 32
+
+# Per-worker state set up by _init_worker
+_shm = None
+_geometry = None
+_run_config = None
+
+
+def load_grid(path):
+    """Read and validate a grid file."""
+    with open(path, 'r', encoding='utf-8') as f:
+        grid = json.load(f)
+
+    for key in ("hex_radii", "omegas", "substeps", "gravity"):
+        if not grid.get(key):
+            raise ValueError(f"Grid is missing values for '{key}'")
+    sizes = {len(v) for v in grid["hex_radii"]} | {len(v) for v in grid["omegas"]}
+    if len(sizes) != 1:
+        raise ValueError("All hex_radii and omegas entries must have the same number of hexagons")
+
+    seeds = grid.get("seeds", 1)
+    grid["seeds"] = list(range(seeds)) if isinstance(seeds, int) else list(seeds)
+    grid.setdefault("steps", 1200)
+    grid.setdefault("spawn_every", 10)
+    grid.setdefault("spawn_total", 50)
+    grid.setdefault("spawn_jitter", 2.0)
+    if grid["spawn_jitter"] < 0:
+        raise ValueError(f"spawn_jitter must be >= 0, got {grid['spawn_jitter']}")
+    return grid
+
+
+def geometry_table(grid):
+    """One row per (radii, omegas) combination: radii followed by omegas."""
+    rows = [list(r) + list(w) for r, w in itertools.product(grid["hex_radii"], grid["omegas"])]
+    return np.asarray(rows, dtype=np.float64)
+
+
+def expand_runs(grid, n_geometry):
+    """All (run_id, geometry, substeps, gravity, seed) tuples in a stable order."""
+    combos = itertools.product(range(n_geometry), grid["substeps"], grid["gravity"], grid["seeds"])
+    return [(run_id, g, int(n), float(grav), int(seed)) for run_id, (g, n, grav, seed) in enumerate(combos)]
+
+
+def _init_worker(shm_name, shape, config):
+    global _geometry, _run_config, _shm
+    # Workers share the parent's resource tracker, which unlinks the block once
+    _shm = shared_memory.SharedMemory(name=shm_name)
+    _geometry = np.ndarray(shape, dtype=np.float64, buffer=_shm.buf)
+    _run_config = config
+
+
+def run_one(task):
+    """Worker entry point: simulate one grid point and return its summary row."""
+    run_id, geom, substeps, gravity, seed = task
+    row = _geometry[geom]
+    k = len(row) // 2
+    world = World(hex_radii=row[:k].tolist(), omegas=row[k:].tolist(),
+                  gravity=gravity, substeps=substeps, seed=seed)
+
+    cfg = _run_config
+    schedule = spawn_schedule(cfg["spawn_every"], cfg["spawn_total"])
+    last_spawn = schedule[-1] + 1 if schedule else 0
+    rng = random.Random(seed)
+
+    def click():
+        # Uniform over the disc of radius spawn_jitter around the centre
+        rho = cfg["spawn_jitter"] * math.sqrt(rng.random())
+        phi = rng.uniform(0.0, math.tau)
+        world.spawn(world.center + Vec2(rho * math.cos(phi), rho * math.sin(phi)))
+
+    start = time.perf_counter()
+    run_schedule(world, min(last_spawn, cfg["steps"]), schedule, spawn=click)
+    energy_ref = world.energy()
+    run_schedule(world, cfg["steps"] - world.steps, ())
+    elapsed = time.perf_counter() - start
+
+    energy_end = world.energy()
+    outside = len(world.hexes)
+    escaped = sum(1 for b in world.balls if world.hex_index_of(b.pos) == outside)
+    balls = len(world.balls)
+    return {
+        "run_id": run_id,
+        "geometry": geom,
+        "substeps": substeps,
+        "gravity": gravity,
+        "seed": seed,
+        "balls": balls,
+        "escaped": escaped,
+        "escape_rate": escaped / balls if balls else 0.0,
+        "energy_ref": energy_ref,
+        "energy_end": energy_end,
+        "energy_drift": (energy_end - energy_ref) / abs(energy_ref) if energy_ref else 0.0,
+        "max_speed": max((b.vel.length() for b in world.balls), default=0.0),
+        "seconds": elapsed,
+    }
+
+
+class ColumnStore:
+    """Append-only columnar results directory."""
+
+    def __init__(self, path, grid):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        schema_file = self.path / "schema.json"
+        schema = {"columns": COLUMNS, "grid": grid}
+        if schema_file.exists():
+            with open(schema_file, 'r', encoding='utf-8') as f:
+                existing = json.load(f)
+            if existing["grid"] != grid:
+                raise ValueError(f"{self.path} holds results for a different grid")
+        else:
+            with open(schema_file, 'w', encoding='utf-8') as f:
+                json.dump(schema, f, indent=2)
+        self._truncate_to_complete_rows()
+        self.buffer = []
+
+    def _column_file(self, name):
+        return self.path / f"{name}.bin"
+
+    def _truncate_to_complete_rows(self):
+        lengths = []
+        for name, dtype in COLUMNS:
+            f = self._column_file(name)
+            lengths.append(f.stat().st_size // np.dtype(dtype).itemsize if f.exists() else 0)
+        rows = min(lengths)
+        for name, dtype in COLUMNS:
+            f = self._column_file(name)
+            if f.exists():
+                os.truncate(f, rows * np.dtype(dtype).itemsize)
+
+    def done_ids(self):
+        f = self._column_file("run_id")
+        if not f.exists():
+            return set()
+        return set(np.fromfile(f, dtype="<i8").tolist())
+
+    def append(self, row):
+        self.buffer.append(row)
+        if len(self.buffer) >= FLUSH_EVERY:
+            self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+        for name, dtype in COLUMNS:
+            values = np.asarray([r[name] for r in self.buffer], dtype=dtype)
+            with open(self._column_file(name), 'ab') as f:
+                values.tofile(f)
+        self.buffer = []
+
+
+def load_results(path):
+    """Read a results directory back as a dict of column arrays."""
+    path = Path(path)
+    with open(path / "schema.json", 'r', encoding='utf-8') as f:
+        schema = json.load(f)
+    columns = {name: np.fromfile(path / f"{name}.bin", dtype=dtype) for name, dtype in schema["columns"]}
+    rows = min(len(v) for v in columns.values())
+    return {name: v[:rows] for name, v in columns.items()}
+
+
+def run_sweep(grid_path, out_dir, workers=None):
+    grid = load_grid(grid_path)
+    table = geometry_table(grid)
+    runs = expand_runs(grid, len(table))
+    store = ColumnStore(out_dir, grid)
+    done = store.done_ids()
+    todo = [task for task in runs if task[0] not in done]
+    workers = workers or os.cpu_count() or 1
+    print(f"{len(runs)} runs in grid, {len(done)} already done, {len(todo)} to go on {workers} workers")
+    if not todo:
+        return
+
+    shm = shared_memory.SharedMemory(create=True, size=max(table.nbytes, 1))
+    try:
+        np.ndarray(table.shape, dtype=table.dtype, buffer=shm.buf)[:] = table
+        config = {k: grid[k] for k in ("steps", "spawn_every", "spawn_total", "spawn_jitter")}
+        start = time.perf_counter()
+        finished = 0
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(shm.name, table.shape, config)) as executor:
+            # Keep a bounded number of runs in flight so huge grids stay light
+            tasks = iter(todo)
+            in_flight = set()
+            for task in itertools.islice(tasks, 4 * workers):
+                in_flight.add(executor.submit(run_one, task))
+            while in_flight:
+                completed, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in completed:
+                    store.append(future.result())
+                    finished += 1
+                    nxt = next(tasks, None)
+                    if nxt is not None:
+                        in_flight.add(executor.submit(run_one, nxt))
+                if finished % 50 == 0 or not in_flight:
+                    rate = finished / (time.perf_counter() - start)
+                    print(f"  {finished}/{len(todo)} runs ({rate:.2f} runs/s)")
+    finally:
+        store.flush()
+        shm.close()
+        shm.unlink()
+
+
+def show(out_dir):
+    """Print mean escape rate and energy drift per parameter combination."""
+    cols = load_results(out_dir)
+    with open(Path(out_dir) / "schema.json", 'r', encoding='utf-8') as f:
+        grid = json.load(f)["grid"]
+    table = geometry_table(grid)
+    k = table.shape[1] // 2
+
+    keys = np.stack([cols["geometry"], cols["substeps"], cols["gravity"]], axis=1)
+    uniq = np.unique(keys, axis=0)
+    print(f"{len(cols['run_id'])} runs")
+    print(f"{'radii':<24}{'omegas':<28}{'sub':>4}{'gravity':>9}{'runs':>6}{'escape':>9}{'drift':>12}")
+    for g, n, grav in uniq:
+        mask = (cols["geometry"] == g) & (cols["substeps"] == n) & (cols["gravity"] == grav)
+        radii = ",".join(f"{v:g}" for v in table[int(g), :k])
+        omegas = ",".join(f"{v:g}" for v in table[int(g), k:])
+        print(f"{radii:<24}{omegas:<28}{int(n):>4}{grav:>9g}{int(mask.sum()):>6}"
+              f"{cols['escape_rate'][mask].mean():>9.3f}{cols['energy_drift'][mask].mean():>12.3e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run parameter sweeps of the hexagon simulation")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run_p = sub.add_parser("run", help="Run (or resume) a sweep")
+    run_p.add_argument("grid", type=str, help="Grid JSON file")
+    run_p.add_argument("out", type=str, help="Results directory")
+    run_p.add_argument("-j", "--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    show_p = sub.add_parser("show", help="Summarise a results directory")
+    show_p.add_argument("out", type=str)
+    args = parser.parse_args()
+
+    if args.command == "run":
+        run_sweep(args.grid, args.out, args.workers)
+    else:
+        show(args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,392 @@
+"""Compact binary trajectories: record a run once, replay and scrub it later.
+
+File layout (little-endian)::
+
+    b"BTRJ" | u32 meta length | meta JSON
+    chunk*                    | one per ``chunk_frames`` recorded frames
+    spawn table               | step, radius, colour of every ball, in order
+    chunk index               | offset, size and first frame of every chunk
+    footer                    | index offset, spawn offset, chunk count, frame count, b"BTRJ"
+
+A chunk is ``u32 k | i64 steps[k] | u32 balls[k] | payload``. The payload
+holds, per frame, the hexagon angles followed by x, y, vx, vy of every ball
+as separate float32 runs (struct of arrays). With delta compression each
+frame's words are XORed with the previous frame's (balls only ever get
+appended, so the leading runs line up), the chunk's bytes are shuffled into
+four byte planes and the result is zlib-compressed; slowly changing values
+then share their high bytes and compress well.
+
+A ball's spawn step is ``world.steps`` after the first step it took part
+in, the same numbering as the frames. The recorder notes it in
+:meth:`TrajectoryRecorder.on_step`, which runs after every step, so it is
+exact whatever ``every`` is; balls only seen by a direct
+:meth:`~TrajectoryRecorder.capture` get that capture's step.
+
+Frame ``f`` lives in chunk ``f // chunk_frames``, so seeking costs one index
+lookup plus decoding at most one chunk, whatever the file length. The file
+is memory-mapped; uncompressed frames are returned as zero-copy views.
+
+    python -m ballsim.trajectory record run.btrj --steps 3600 --spawn-total 300
+    python -m ballsim.trajectory info run.btrj
+    python -m ballsim.trajectory play run.btrj
+"""
+import argparse
+import itertools
+import json
+import mmap
+import os
+import struct
+import time
+import zlib
+
+import numpy as np
+
+from .headless import run_schedule, spawn_schedule
+from .world import STEP_DT, World
+
+MAGIC = b"BTRJ"
+VERSION = 1
+CHUNK_FRAMES = 64
+FOOTER = struct.Struct("<QQQQ4s")
+
+SPAWN_DTYPE = np.dtype([("step", "<i8"), ("radius", "<f4"), ("color", "u1", (3,))])
+INDEX_DTYPE = np.dtype([("offset", "<u8"), ("nbytes", "<u8"), ("first", "<u8")])
+
+
+def _shuffle(words):
+    """Group the bytes of 32-bit words into four planes (low bytes first)."""
+    return np.ascontiguousarray(words.view(np.uint8).reshape(-1, 4).T).tobytes()
+
+
+def _unshuffle(data, count):
+    planes = np.frombuffer(data, dtype=np.uint8).reshape(4, count)
+    return np.ascontiguousarray(planes.T).view(np.uint32).reshape(-1)
+
+
+class Frame:
+    """One recorded frame: step index, hexagon angles and SoA ball state."""
+
+    __slots__ = ("step", "angles", "x", "y", "vx", "vy")
+
+    def __init__(self, step, angles, x, y, vx, vy):
+        self.step = step
+        self.angles = angles
+        self.x, self.y, self.vx, self.vy = x, y, vx, vy
+
+    def __len__(self):
+        return len(self.x)
+
+
+class TrajectoryRecorder:
+    """Appends the state of ``world`` to a trajectory file every ``every`` steps.
+
+    Pass :meth:`on_step` as ``run_schedule``'s ``on_step`` hook (or call it
+    after each step). New balls are noticed by the growth of
+    ``world.balls`` and logged in the spawn table, so balls must only
+    ever be appended: a world whose balls get retired (see
+    :mod:`ballsim.lifecycle`) cannot be recorded. Call :meth:`close` to
+    finish the file.
+    """
+
+    def __init__(self, world, path, every=1, chunk_frames=CHUNK_FRAMES, delta=True):
+        self.world = world
+        self.every = every
+        self.chunk_frames = chunk_frames
+        self.delta = delta
+        self.frames = 0
+        self.raw_bytes = 0
+        self._f = open(path, 'wb')
+        self._index = []
+        self._spawns = []
+        self._pending = []
+
+        meta = {
+            "version": VERSION,
+            "step_dt": STEP_DT,
+            "every": every,
+            "chunk_frames": chunk_frames,
+            "delta": delta,
+            "width": world.width,
+            "height": world.height,
+            "hexes": [{"R": hx.R, "omega": hx.omega, "missing": hx.missing} for hx in world.hexes],
+        }
+        blob = json.dumps(meta).encode("utf-8")
+        self._f.write(MAGIC + struct.pack("<I", len(blob)) + blob)
+
+    def on_step(self, world=None):
+        # Spawns are noted every step, so their steps do not depend on ``every``
+        self._note_spawns()
+        if self.world.steps % self.every == 0:
+            self.capture()
+
+    def _note_spawns(self):
+        world = self.world
+        if world.roster_version:
+            raise ValueError("Balls were removed from the world; trajectories need append-only balls")
+        for b in world.balls[len(self._spawns):]:
+            self._spawns.append((world.steps, b.r, b.color))
+
+    def capture(self):
+        """Record the current state as the next frame."""
+        world = self.world
+        self._note_spawns()
+        balls = world.balls
+        n = len(balls)
+        soa = np.fromiter(
+            itertools.chain.from_iterable((b.pos.x, b.pos.y, b.vel.x, b.vel.y) for b in balls),
+            dtype=np.float32, count=4 * n,
+        ).reshape(n, 4).T.copy()
+        angles = np.array([hx.angle for hx in world.hexes], dtype=np.float32)
+        self._pending.append((world.steps, angles, soa))
+        self.frames += 1
+        self.raw_bytes += angles.nbytes + soa.nbytes
+        if len(self._pending) == self.chunk_frames:
+            self._flush()
+
+    def _flush(self):
+        frames = self._pending
+        if not frames:
+            return
+        k = len(frames)
+        steps = np.array([s for s, _, _ in frames], dtype="<i8")
+        counts = np.array([soa.shape[1] for _, _, soa in frames], dtype="<u4")
+
+        parts = []
+        prev = None
+        for _, angles, soa in frames:
+            words = soa.view(np.uint32)
+            ang = angles.view(np.uint32)
+            if self.delta and prev is not None:
+                p_ang, p_words = prev
+                m = p_words.shape[1]
+                ang = ang ^ p_ang
+                words = words.copy()
+                words[:, :m] ^= p_words
+            prev = (angles.view(np.uint32), soa.view(np.uint32))
+            parts.append(ang)
+            parts.append(words.reshape(-1))
+        payload = np.concatenate(parts)
+        if self.delta:
+            body = zlib.compress(_shuffle(payload), 6)
+        else:
+            body = payload.astype("<u4", copy=False).tobytes()
+
+        offset = self._f.tell()
+        self._f.write(struct.pack("<I", k) + steps.tobytes() + counts.tobytes() + body)
+        self._index.append((offset, self._f.tell() - offset, self.frames - k))
+        self._pending = []
+
+    def close(self):
+        self._flush()
+        f = self._f
+        spawns = np.array([(s, r, c) for s, r, c in self._spawns], dtype=SPAWN_DTYPE)
+        spawn_offset = f.tell()
+        f.write(spawns.tobytes())
+        index_offset = f.tell()
+        f.write(np.array(self._index, dtype=INDEX_DTYPE).tobytes())
+        f.write(FOOTER.pack(index_offset, spawn_offset, len(self._index), self.frames, MAGIC))
+        f.close()
+
+
+class TrajectoryReader:
+    """Memory-mapped access to a trajectory file."""
+
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        self.mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        mm = self.mm
+        if mm[:4] != MAGIC or mm[-4:] != MAGIC:
+            raise ValueError(f"{path} is not a trajectory file")
+        (length,) = struct.unpack_from("<I", mm, 4)
+        self.meta = json.loads(mm[8:8 + length].decode("utf-8"))
+        index_offset, spawn_offset, chunks, self.frames = FOOTER.unpack_from(mm, len(mm) - FOOTER.size)[:4]
+        self.index = np.frombuffer(mm, dtype=INDEX_DTYPE, count=chunks, offset=index_offset)
+        self.spawns = np.frombuffer(mm, dtype=SPAWN_DTYPE, count=(index_offset - spawn_offset) // SPAWN_DTYPE.itemsize,
+                                    offset=spawn_offset)
+        self.n_hex = len(self.meta["hexes"])
+        self.chunk_frames = self.meta["chunk_frames"]
+        self._cached = (None, None)
+
+    def __len__(self):
+        return self.frames
+
+    def close(self):
+        self.index = self.spawns = None
+        self._cached = (None, None)
+        try:
+            self.mm.close()
+        except BufferError:
+            # Zero-copy frames handed out still view the map; it goes with them
+            pass
+        self._file.close()
+
+    def _chunk(self, c):
+        if self._cached[0] == c:
+            return self._cached[1]
+        offset, nbytes, _ = self.index[c]
+        offset = int(offset)
+        mm = self.mm
+        (k,) = struct.unpack_from("<I", mm, offset)
+        steps = np.frombuffer(mm, dtype="<i8", count=k, offset=offset + 4)
+        counts = np.frombuffer(mm, dtype="<u4", count=k, offset=offset + 4 + 8 * k)
+        body = offset + 4 + 12 * k
+        sizes = self.n_hex + 4 * counts.astype(np.int64)
+        starts = np.concatenate(([0], np.cumsum(sizes)))
+        total = int(starts[-1])
+
+        if self.meta["delta"]:
+            words = _unshuffle(zlib.decompress(mm[body:offset + int(nbytes)]), total)
+            # Undo the XOR chain frame by frame
+            prev = None
+            for f in range(k):
+                ang = words[starts[f]:starts[f] + self.n_hex]
+                soa = words[starts[f] + self.n_hex:starts[f + 1]].reshape(4, -1)
+                if prev is not None:
+                    p_ang, p_soa = prev
+                    ang ^= p_ang
+                    soa[:, :p_soa.shape[1]] ^= p_soa
+                prev = (ang, soa)
+        else:
+            words = np.frombuffer(mm, dtype="<u4", count=total, offset=body)
+        values = words.view(np.float32)
+
+        chunk = []
+        for f in range(k):
+            ang = values[starts[f]:starts[f] + self.n_hex]
+            soa = values[starts[f] + self.n_hex:starts[f + 1]].reshape(4, -1)
+            chunk.append(Frame(int(steps[f]), ang, soa[0], soa[1], soa[2], soa[3]))
+        self._cached = (c, chunk)
+        return chunk
+
+    def frame(self, f):
+        """Frame ``f`` (negative counts from the end)."""
+        if f < 0:
+            f += self.frames
+        if not 0 <= f < self.frames:
+            raise IndexError(f"frame {f} out of range 0..{self.frames - 1}")
+        c = f // self.chunk_frames
+        return self._chunk(c)[f - int(self.index[c]["first"])]
+
+    def playback_world(self):
+        """A :class:`World` with the recorded geometry and every ball, for rendering."""
+        hexes = self.meta["hexes"]
+        world = World(hex_radii=[h["R"] for h in hexes], omegas=[h["omega"] for h in hexes],
+                      missing=0, backend="python")
+        for hx, h in zip(world.hexes, hexes):
+            hx.missing = h["missing"]
+        for spawn in self.spawns:
+            ball = world.spawn()
+            ball.color = tuple(int(c) for c in spawn["color"])
+            ball.r = float(spawn["radius"])
+        return world
+
+
+def record(args):
+    world = World(seed=args.seed)
+    recorder = TrajectoryRecorder(world, args.path, every=args.every, delta=not args.raw)
+    schedule = spawn_schedule(args.spawn_every, args.spawn_total)
+    start = time.perf_counter()
+    run_schedule(world, args.steps, schedule, on_step=recorder.on_step)
+    recorder.close()
+    elapsed = time.perf_counter() - start
+
+    size = os.path.getsize(args.path)
+    ball_frames = recorder.raw_bytes / 16.0
+    print(f"Recorded {recorder.frames} frames of up to {len(world.balls)} balls in {elapsed:.1f}s")
+    print(f"File: {size / 1e6:.2f} MB ({recorder.raw_bytes / 1e6:.2f} MB raw float32, "
+          f"{size / ball_frames:.2f} bytes per ball-frame)")
+    # 10 minutes of 2,000 balls at the recording rate
+    frames = 600.0 / (STEP_DT * args.every)
+    print(f"At this rate 10 min x 2,000 balls would take {frames * 2000 * size / ball_frames / 1e6:,.0f} MB")
+
+
+def info(args):
+    reader = TrajectoryReader(args.path)
+    print(f"{len(reader)} frames, {len(reader.spawns)} balls, {len(reader.index)} chunks, "
+          f"delta={'on' if reader.meta['delta'] else 'off'}, every {reader.meta['every']} steps")
+    rng = np.random.default_rng(0)
+    picks = rng.integers(0, len(reader), size=200)
+    start = time.perf_counter()
+    for f in picks:
+        reader.frame(int(f))
+    seek = (time.perf_counter() - start) / len(picks)
+    start = time.perf_counter()
+    for f in range(len(reader)):
+        reader.frame(f)
+    sequential = (time.perf_counter() - start) / max(len(reader), 1)
+    print(f"Random seek: {1000.0 * seek:.3f} ms/frame, sequential: {1000.0 * sequential:.3f} ms/frame "
+          f"({1.0 / sequential if sequential else float('inf'):,.0f} frames/s)")
+    reader.close()
+
+
+def play(args):
+    import pygame
+
+    from .play import has_display
+    from .render import Renderer
+
+    reader = TrajectoryReader(args.path)
+    if not has_display():
+        print("No display; use 'info' to inspect the file")
+        return
+    world = reader.playback_world()
+    pygame.init()
+    screen = pygame.display.set_mode((world.width, world.height))
+    pygame.display.set_caption("轨迹回放")
+    renderer = Renderer(screen, tip="空格 暂停 | ←/→ 跳转 1 秒 | Home/End 首尾")
+    clock = pygame.time.Clock()
+    rate = 1.0 / (reader.meta["step_dt"] * reader.meta["every"])
+    second = max(1, int(rate))
+    position = 0.0
+    paused = False
+    running = True
+    while running:
+        dt = clock.tick(args.fps) / 1000.0
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_SPACE:
+                    paused = not paused
+                elif event.key == pygame.K_RIGHT:
+                    position += second
+                elif event.key == pygame.K_LEFT:
+                    position -= second
+                elif event.key == pygame.K_HOME:
+                    position = 0.0
+                elif event.key == pygame.K_END:
+                    position = len(reader) - 1
+        if not paused:
+            position += dt * rate * args.speed
+        position = min(max(position, 0.0), len(reader) - 1)
+
+        frame = reader.frame(int(position))
+        positions = list(zip(frame.x.tolist(), frame.y.tolist()))
+        pygame.display.update(renderer.draw(world, positions, frame.angles.tolist()))
+    pygame.quit()
+    reader.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record, inspect and replay binary trajectories")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rec = sub.add_parser("record", help="Run the simulation headlessly and record it")
+    rec.add_argument("path", type=str)
+    rec.add_argument("--steps", type=int, default=3600)
+    rec.add_argument("--spawn-every", type=int, default=5)
+    rec.add_argument("--spawn-total", type=int, default=300)
+    rec.add_argument("--seed", type=int, default=0)
+    rec.add_argument("--every", type=int, default=2, help="Record every Nth step (2 = 60 frames/s)")
+    rec.add_argument("--raw", action="store_true", help="Store frames uncompressed")
+    inf = sub.add_parser("info", help="Summarise a file and time seeking")
+    inf.add_argument("path", type=str)
+    ply = sub.add_parser("play", help="Replay a file in a window")
+    ply.add_argument("path", type=str)
+    ply.add_argument("--fps", type=int, default=60)
+    ply.add_argument("--speed", type=float, default=1.0, help="Playback speed factor")
+    args = parser.parse_args()
+    {"record": record, "info": info, "play": play}[args.command](args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""Headless simulation world built on the gpt-5 python-ball engine."""
+import math
+import random
+import time
+
+from .submission import load_submission
+
+sim = load_submission("gpt-5")
+Vec2 = sim.Vec2
+
+# Physics step of the fixed-timestep driver (gpt-5 renders at FPS = 120)
+STEP_DT = 1.0 / sim.FPS
+
+# Soft screen-edge clamp used by gpt-5's main loop
+MARGIN = 20
+
+# Substep phases timed by World.substep, in execution order
+PHASES = ("integration", "ball_ball", "ball_wall", "clamp")
+
+
+class World:
+    """The hexagons, balls and substep loop of ``gpt-5.py`` without a window.
+
+    Parameters default to the module constants of the submission. Pass
+    ``missing=-1`` for closed hexagons (no side is skipped). ``broadphase``
+    picks the ball-ball pair search: ``"brute"`` (gpt-5's loop) or ``"sap"``;
+    ``contact_solver`` picks how contacts are resolved: ``"sequential"``
+    (gpt-5's ``resolve_ball_ball``) or ``"colored"``; ``wall_collision``
+    picks ``"segments"`` (gpt-5's world-space sides) or ``"frame"`` (each
+    hexagon's rotating frame, see :mod:`ballsim.hexframe`). ``backend="auto"``
+    runs plain worlds through the compiled array kernels when Numba is
+    installed (``"python"`` forces the reference path); worlds with sleeping
+    islands or a contact cache always take the reference path.
+    """
+
+    def __init__(self, hex_radii=None, omegas=None, missing=None, gravity=None,
+                 substeps=None, ball_radius=None, seed=None, ccd=False, broadphase="brute",
+                 contact_solver="sequential", wall_collision="segments", backend="auto"):
+        hex_radii = sim.HEX_RADII if hex_radii is None else hex_radii
+        omegas = sim.OMEGAS if omegas is None else omegas
+        missing = sim.MISSING_SIDE_INDEX if missing is None else missing
+
+        # Same staggered start angles as gpt-5's main()
+        self.hexes = [
+            sim.RotatingHex(R, w, missing, init_angle=i * math.pi / 12)
+            for i, (R, w) in enumerate(zip(hex_radii, omegas))
+        ]
+        self.balls = []
+        self.gravity = sim.GRAVITY if gravity is None else float(gravity)
+        self.substeps = sim.SUBSTEPS if substeps is None else int(substeps)
+        self.ball_radius = sim.BALL_RADIUS if ball_radius is None else float(ball_radius)
+        self.width, self.height = sim.W, sim.H
+        self.center = sim.CENTER
+        self.rng = random.Random(seed)
+        self.steps = 0
+        self.time = 0.0
+        self.ball_steps = 0
+        self.phase_time = dict.fromkeys(PHASES, 0.0)
+        # Optional EnergyMonitor, sampled after every phase of its sampled steps
+        self.monitor = None
+        # Optional SleepSystem; when set only its awake balls are simulated
+        self.sleep = None
+        # Optional Lifecycle: escaped balls are retired, spawns reuse pooled balls
+        self.lifecycle = None
+        # Optional AdaptiveSubsteps; when set it picks each frame's substep count
+        self.adaptive = None
+        # Optional ContactCache; when set it replaces the ball-ball and ball-wall phases
+        self.contacts = None
+        # Bumped whenever balls are removed, so caches that assume balls are
+        # only ever appended know to start over
+        self.roster_version = 0
+
+        from .broadphase import make_broadphase
+        from .hexframe import make_walls
+        from .solver import make_solver
+        self.broadphase = make_broadphase(broadphase)
+        self.solver = make_solver(contact_solver)
+        self.walls = make_walls(wall_collision)
+
+        from .kernels import make_kernel
+        plain = (not ccd and broadphase == "brute" and contact_solver == "sequential"
+                 and wall_collision == "segments")
+        self.kernel = make_kernel(backend, compatible=plain)
+
+        if ccd:
+            from .ccd import SweptStepper
+            self.ccd = SweptStepper(self.center)
+        else:
+            self.ccd = None
+
+    def rand_color(self):
+        """Seeded counterpart of gpt-5's ``rand_color``."""
+        rng = self.rng
+        return (rng.randint(40, 255), rng.randint(40, 255), rng.randint(40, 255))
+
+    def spawn(self, pos=None, vel=(0, 0)):
+        """Release a ball (at the centre by default, like a mouse click)."""
+        pos = self.center if pos is None else pos
+        if self.lifecycle is not None:
+            ball = self.lifecycle.acquire(pos, vel, self.ball_radius, self.rand_color())
+        else:
+            ball = sim.Ball(pos, vel, self.ball_radius, self.rand_color())
+        self.balls.append(ball)
+        if self.sleep is not None:
+            self.sleep.add(ball)
+        return ball
+
+    @property
+    def active(self):
+        """Balls that take part in the simulation this step."""
+        return self.balls if self.sleep is None else self.sleep.awake
+
+    def step(self, dt):
+        """Advance one frame of ``dt`` seconds split into ``substeps`` (or the adaptive count)."""
+        n = self.substeps if self.adaptive is None else self.adaptive.choose(dt)
+        h = dt / n
+        sampled = self.monitor is not None and self.monitor.due()
+        if self.kernel is not None and self.sleep is None and self.contacts is None:
+            # The kernel stepper samples an attached monitor from its own arrays
+            self.kernel.run(self, h, n)
+        else:
+            if sampled:
+                self.monitor.begin()
+            for _ in range(n):
+                self.substep(h)
+        self.steps += 1
+        self.ball_steps += len(self.balls)
+        self.time += dt
+        if self.sleep is not None:
+            self.sleep.update()
+        if self.lifecycle is not None:
+            self.lifecycle.update()
+        if sampled:
+            self.monitor.record()
+
+    def substep(self, dt):
+        """One physics substep, in the same phase order as gpt-5's main loop."""
+        balls = self.active
+        mon = self.monitor if self.monitor is not None and self.monitor.due() else None
+        clock = time.perf_counter
+        t0 = clock()
+
+        if self.ccd is not None:
+            self.ccd.advance(self.hexes, balls, dt, self.gravity)
+        else:
+            for hx in self.hexes:
+                hx.update(dt)
+            g = self.gravity * dt
+            for b in balls:
+                b.vel.y += g
+                b.pos += b.vel * dt
+        t1 = clock()
+        if mon is not None:
+            mon.mark("integration")
+        if self.ccd is not None:
+            before = [(b.pos.x, b.pos.y) for b in balls]
+            self.collide_balls(dt)
+            self.ccd.contain(self.hexes, balls, before)
+        else:
+            self.collide_balls(dt)
+        t2 = clock()
+        if mon is not None:
+            mon.mark("ball_ball")
+        self.collide_walls(dt)
+        t3 = clock()
+        if mon is not None:
+            mon.mark("ball_wall")
+        self.clamp()
+        t4 = clock()
+        if mon is not None:
+            mon.mark("clamp")
+
+        phase = self.phase_time
+        phase["integration"] += t1 - t0
+        phase["ball_ball"] += t2 - t1
+        phase["ball_wall"] += t3 - t2
+        phase["clamp"] += t4 - t3
+
+    def collide_balls(self, dt=None):
+        if self.contacts is not None:
+            self.contacts.solve_balls(self.active, dt)
+            return
+        if self.sleep is not None:
+            self.sleep.wake_touched()
+        self.solver.solve(self.active, self.broadphase)
+
+    def collide_walls(self, dt=None):
+        if self.contacts is not None:
+            self.contacts.solve_walls(self.active, self.hexes, self.center, dt)
+            return
+        self.walls.collide(self.active, self.hexes, self.center)
+
+    def clamp(self):
+        lo, hi_x, hi_y = MARGIN, self.width - MARGIN, self.height - MARGIN
+        for b in self.active:
+            if b.pos.x < lo:
+                b.pos.x = lo
+                b.vel.x = abs(b.vel.x)
+            elif b.pos.x > hi_x:
+                b.pos.x = hi_x
+                b.vel.x = -abs(b.vel.x)
+            if b.pos.y < lo:
+                b.pos.y = lo
+                b.vel.y = abs(b.vel.y)
+            elif b.pos.y > hi_y:
+                b.pos.y = hi_y
+                b.vel.y = -abs(b.vel.y)
+
+    def energy(self):
+        """Total kinetic plus potential energy (unit mass, height above the screen bottom)."""
+        g, h = self.gravity, self.height
+        total = 0.0
+        for b in self.balls:
+            total += 0.5 * b.vel.length_squared() + g * (h - b.pos.y)
+        return total
+
+    def hex_index_of(self, pos):
+        """Index of the innermost hexagon whose polygon contains ``pos``, or len(hexes)."""
+        dx, dy = pos[0] - self.center.x, pos[1] - self.center.y
+        rho = math.hypot(dx, dy)
+        phi = math.atan2(dy, dx)
+        for i, hx in enumerate(self.hexes):
+            # Distance to the boundary along the sextant's apothem direction
+            rel = (phi - hx.angle) % (math.tau / 6.0) - math.pi / 6.0
+            if rho * math.cos(rel) <= hx.R * math.cos(math.pi / 6.0):
+                return i
+        return len(self.hexes)
@@ -50,43 +50,27 @@ class RotatingHexWalls:
         self.radii = radii
         self.omegas = omegas
         self.missing_edge_index = missing_edge_index
-        self.rot_angles = [0.0 for _ in radii]
-        # we will rebuild segments each frame; store current segments to remove
-        self.current_segments = []
-
-    def update(self, dt):
-        # advance rotation angles
-        for i in range(len(self.rot_angles)):
-            self.rot_angles[i] += self.omegas[i] * dt
-        # rebuild walls
-        self.rebuild_segments()
-
-    def rebuild_segments(self):
-        # remove old segments from space
-        for seg in self.current_segments:
-            self.space.remove(seg, seg.body)
-        self.current_segments = []
-
-        # create new segments for each hexagon, omitting one edge
-        for i, R in enumerate(self.radii):
-            rot = self.rot_angles[i]
-            verts = hex_vertices(self.center, R, rot)
-
-            # body for kinematic segments
+        # one persistent kinematic body per hexagon, pivoting about the center;
+        # pymunk advances its angle and gives contacts the true wall velocity
+        self.bodies = []
+        self.segments = []
+        for R, omega in zip(radii, omegas):
             body = pymunk.Body(body_type=pymunk.Body.KINEMATIC)
-            body.position = (0, 0)  # we'll use world coords directly
-            # create 5 segments
+            body.position = center
+            body.angular_velocity = omega
+            # vertices in body-local coordinates
+            verts = hex_vertices((0, 0), R, 0.0)
+            segs = []
             for e in range(6):
                 if e == self.missing_edge_index:
                     continue
-                a = verts[e]
-                b = verts[(e + 1) % 6]
-                seg = pymunk.Segment(body, a, b, 0.0)
+                seg = pymunk.Segment(body, verts[e], verts[(e + 1) % 6], 0.0)
                 seg.elasticity = WALL_ELASTICITY
                 seg.friction = WALL_FRICTION
-                # group or layers can be left default so balls collide with them
-                self.space.add(body, seg)
-                self.current_segments.append(seg)
+                segs.append(seg)
+            self.space.add(body, *segs)
+            self.bodies.append(body)
+            self.segments.extend(segs)
 
 # ---------------- Main ----------------
 def main():
@@ -103,7 +87,6 @@ def main():
 
     # Rotating hex walls
     walls = RotatingHexWalls(space, CENTER, HEX_RADII, OMEGAS, MISSING_EDGE_INDEX)
-    walls.rebuild_segments()
 
     balls = []  # list of (body, shape, color)
 
@@ -133,7 +116,7 @@ def main():
         frame_dt = clock.tick(FPS) / 1000.0
         accumulator += frame_dt
         while accumulator >= dt_fixed:
-            walls.update(dt_fixed)
+            # walls rotate inside space.step via their angular velocity
             space.step(dt_fixed)
             accumulator -= dt_fixed
 